@@ -1,16 +1,16 @@
 from app.models.api.github import GitHubToken
 from fastapi import APIRouter, HTTPException, Response, Depends, status
 from fastapi.responses import StreamingResponse, JSONResponse
-from app.services.github_service import GitHubService
-from app.core.auth import get_current_user, require_claim
+from app.services.github_service import github_service
+from app.core.auth import get_current_user, get_firebase_app, require_claim
 from app.core.logging import logger
+from app.core.profiling import current_profile
 from app.tasks.github import download_github_repo
+from app.tasks.routing import route_repo_download
 import io
-from firebase_admin import auth as firebase_auth
 from typing import Optional
 
 router = APIRouter()
-github_service = GitHubService()
 
 @router.get("/auth-url")
 async def get_github_auth_url():
@@ -47,12 +47,22 @@ async def download_repository(
 ):
     """Download repository as zip file using Celery background task"""
     try:
+        # The caller is waiting on this download, so small repos take the interactive queue
+        metadata = await github_service.get_repository_metadata(
+            current_user['github_access_token'], owner, repo
+        )
+        route = route_repo_download(metadata.get("size") if metadata else None, interactive=True)
+
         # Start the Celery task
-        task = download_github_repo.delay(
-            owner=owner,
-            repo=repo,
-            ref=ref,
-            access_token=current_user['github_access_token']
+        task = download_github_repo.apply_async(
+            kwargs={
+                "owner": owner,
+                "repo": repo,
+                "ref": ref,
+                "access_token": current_user['github_access_token'],
+                "profile": current_profile() is not None
+            },
+            **route
         )
         
         return JSONResponse({
@@ -80,14 +90,18 @@ async def store_github_token(
             detail="User must be authenticated to store GitHub token"
         )
         
-    logger.info(f"Storing GitHub token for user {current_user['uid']}")
-    logger.info(f"Token data: {token_data}")
+    logger.info("Storing GitHub token for user %s", current_user["uid"])
+    from firebase_admin import auth as firebase_auth
+
     try:
         # Set custom claims for the user - this is a sync operation
         firebase_auth.set_custom_user_claims(
             current_user["uid"],
-            {"github_access_token": token_data.token}
+            {"github_access_token": token_data.token},
+            app=get_firebase_app()
         )
+        # Resolve the login now so the user's first search doesn't pay for it
+        await github_service.prefetch_username(token_data.token)
         return {"message": "GitHub token stored successfully"}
     except Exception as e:
         logger.error(f"Error storing GitHub token: {str(e)}")
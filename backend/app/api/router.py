@@ -3,10 +3,14 @@ from app.api.routes.users.users import router as users_router
 from app.api.routes.repos.repos import router as repos_router
 from app.api.github import router as github_router
 from app.api.tasks import router as tasks_router
+from app.api.routes.analyse.analyse import router as analyse_router
+from app.api.routes.profiles.profiles import router as profiles_router
 
 router = APIRouter()
 
 router.include_router(users_router, prefix="/users", tags=["users"])
 router.include_router(repos_router, prefix="/repos", tags=["repos"])
 router.include_router(github_router, prefix="/github", tags=["github"])
-router.include_router(tasks_router, prefix="/tasks", tags=["tasks"])
\ No newline at end of file
+router.include_router(tasks_router, prefix="/tasks", tags=["tasks"])
+router.include_router(analyse_router, prefix="/analyze", tags=["analysis"])
+router.include_router(profiles_router, prefix="/profiles", tags=["profiles"])
\ No newline at end of file
@@ -1,22 +1,46 @@
-from fastapi import APIRouter, UploadFile, File, Form, HTTPException
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Depends, Query, Request
+from sqlmodel.ext.asyncio.session import AsyncSession
 from app.services.analyzer import analyze_repository
+from app.services.analysis_store import AnalysisStore
+from app.services.analysis_serializer import analysis_json_response, analysis_to_compact
+from app.core.responses import negotiated_response
+from app.services.repo_service import RepoService
+from app.core.database import get_async_session
+from app.core.dependencies import get_current_db_user
 from app.core.logging import logger
-from app.models.api.analysis import AnalysisResponse
-from typing import Optional, Set
+from app.core.profiling import current_profile
+from app.models.api.analysis import (
+    AnalysisResponse,
+    AnalysisSummary,
+    AnalysisSummaryListResponse,
+    GraphNeighborsResponse,
+    GraphTraversalResponse,
+    GraphPathResponse,
+    GraphSubgraphResponse,
+    GraphCyclesResponse
+)
+from app.services.graph_index import DependencyGraphIndex
+from app.models.domain.analysis import RepositoryAnalysis
+from db.models.user import User
+from typing import Literal, Optional, Set
 
 router = APIRouter()
 
 @router.post("/", response_model=AnalysisResponse)
 async def analyze_repo(
     zip_file: UploadFile = File(..., description="Zip file containing the repository to analyze"),
-    ignore_patterns: Optional[Set[str]] = Form(None, description="Patterns of files to ignore during analysis")
+    ignore_patterns: Optional[Set[str]] = Form(None, description="Patterns of files to ignore during analysis"),
+    repo_id: Optional[int] = Form(None, description="Tracked repo to attach the stored analysis to"),
+    session: AsyncSession = Depends(get_async_session),
+    current_user: User = Depends(get_current_db_user)
 ) -> AnalysisResponse:
     """
-    Analyze a repository from a zip file.
+    Analyze a repository from a zip file and store the result.
     
     Args:
         zip_file: The zip file containing the repository
         ignore_patterns: Optional set of patterns to ignore during analysis
+        repo_id: Optional tracked repo the analysis belongs to
         
     Returns:
         AnalysisResponse containing the repository analysis results
@@ -36,12 +60,21 @@ async def analyze_repo(
         # Log content type for debugging
         logger.debug(f"File content type: {zip_file.content_type}")
         
+        if repo_id is not None:
+            await RepoService(session).get_authorized_repo(repo_id, current_user.firebase_uid)
+
         # Analyze repository
         analysis = await analyze_repository(zip_file, ignore_patterns)
         
         logger.info("Analysis completed successfully")
-        return AnalysisResponse(
-            analysis=analysis,
+        profile = current_profile()
+        if profile is not None:
+            # Artifacts are written once the request finishes
+            analysis.metadata["profile"] = profile.metadata()
+        stored = await AnalysisStore(session).save(analysis, current_user.id, repo_id)
+        return analysis_json_response(
+            analysis,
+            analysis_id=stored.id,
             message="Analysis completed successfully"
         )
         
@@ -52,4 +85,129 @@ async def analyze_repo(
         raise HTTPException(
             status_code=500,
             detail=f"Error analyzing repository: {str(e)}"
-        ) 
\ No newline at end of file
+        ) 
+
+@router.get("/results", response_model=AnalysisSummaryListResponse)
+async def list_analyses(
+    repo_id: Optional[int] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=500),
+    session: AsyncSession = Depends(get_async_session),
+    current_user: User = Depends(get_current_db_user)
+):
+    """List stored analysis summaries, newest first, optionally for a single repo."""
+    results, next_cursor = await AnalysisStore(session).list_results(current_user.id, repo_id, cursor, limit)
+    return AnalysisSummaryListResponse(
+        analyses=results,
+        limit=limit,
+        next_cursor=next_cursor
+    )
+
+@router.get("/results/{analysis_id}", response_model=AnalysisSummary)
+async def read_analysis_summary(
+    analysis_id: int,
+    session: AsyncSession = Depends(get_async_session),
+    current_user: User = Depends(get_current_db_user)
+):
+    """Get the summary metrics of a stored analysis."""
+    return await AnalysisStore(session).get_result(analysis_id, current_user.id)
+
+@router.get("/results/{analysis_id}/full", response_model=RepositoryAnalysis)
+async def read_full_analysis(
+    request: Request,
+    analysis_id: int,
+    format: Literal["full", "compact"] = "full",
+    session: AsyncSession = Depends(get_async_session),
+    current_user: User = Depends(get_current_db_user)
+):
+    """
+    Get the full stored analysis, including the dependency graph.
+
+    format=compact returns a path table with integer edge lists and columnar
+    metrics instead, as JSON or as MessagePack with Accept: application/msgpack.
+    """
+    analysis = await AnalysisStore(session).load_analysis(analysis_id, current_user.id)
+    if format == "compact":
+        return negotiated_response(request, analysis_to_compact(analysis))
+    return analysis_json_response(analysis)
+
+def require_file(index: DependencyGraphIndex, file: str) -> None:
+    """404 if a file isn't part of the analysed graph."""
+    if file not in index:
+        raise HTTPException(status_code=404, detail=f"File not in analysis: {file}")
+
+@router.get("/results/{analysis_id}/graph/neighbors", response_model=GraphNeighborsResponse)
+async def graph_neighbors(
+    analysis_id: int,
+    file: str,
+    session: AsyncSession = Depends(get_async_session),
+    current_user: User = Depends(get_current_db_user)
+):
+    """Get the files a file imports and the files importing it."""
+    index = await AnalysisStore(session).load_graph_index(analysis_id, current_user.id)
+    require_file(index, file)
+    return GraphNeighborsResponse(
+        file=file,
+        dependencies=index.dependencies(file),
+        dependents=index.dependents(file)
+    )
+
+@router.get("/results/{analysis_id}/graph/transitive", response_model=GraphTraversalResponse)
+async def graph_transitive(
+    analysis_id: int,
+    file: str,
+    direction: Literal["dependencies", "dependents"] = "dependencies",
+    depth: int = Query(3, ge=1, le=50),
+    session: AsyncSession = Depends(get_async_session),
+    current_user: User = Depends(get_current_db_user)
+):
+    """Get transitive dependencies or dependents of a file up to a depth."""
+    index = await AnalysisStore(session).load_graph_index(analysis_id, current_user.id)
+    require_file(index, file)
+    return GraphTraversalResponse(
+        file=file,
+        direction=direction,
+        depth=depth,
+        files=index.traverse(file, reverse=direction == "dependents", max_depth=depth)
+    )
+
+@router.get("/results/{analysis_id}/graph/path", response_model=GraphPathResponse)
+async def graph_path(
+    analysis_id: int,
+    source: str,
+    target: str,
+    session: AsyncSession = Depends(get_async_session),
+    current_user: User = Depends(get_current_db_user)
+):
+    """Get the shortest import chain from one file to another."""
+    index = await AnalysisStore(session).load_graph_index(analysis_id, current_user.id)
+    require_file(index, source)
+    require_file(index, target)
+    return GraphPathResponse(source=source, target=target, path=index.shortest_path(source, target))
+
+@router.get("/results/{analysis_id}/graph/subgraph", response_model=GraphSubgraphResponse)
+async def graph_subgraph(
+    analysis_id: int,
+    directory: str = "",
+    session: AsyncSession = Depends(get_async_session),
+    current_user: User = Depends(get_current_db_user)
+):
+    """Get the dependency graph restricted to files under a directory."""
+    index = await AnalysisStore(session).load_graph_index(analysis_id, current_user.id)
+    return GraphSubgraphResponse(directory=directory, dependencies=index.subgraph(directory))
+
+@router.get("/results/{analysis_id}/graph/cycles", response_model=GraphCyclesResponse)
+async def graph_cycles(
+    analysis_id: int,
+    file: str,
+    session: AsyncSession = Depends(get_async_session),
+    current_user: User = Depends(get_current_db_user)
+):
+    """Get the cycles a file is part of."""
+    index = await AnalysisStore(session).load_graph_index(analysis_id, current_user.id)
+    require_file(index, file)
+    return GraphCyclesResponse(
+        file=file,
+        component=index.component(file),
+        cycles=index.cycles_containing(file)
+    )
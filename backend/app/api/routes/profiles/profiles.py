@@ -0,0 +1,29 @@
+import re
+from typing import Optional
+from fastapi import APIRouter, Header, HTTPException, status
+from fastapi.responses import FileResponse
+from app.core.profiling import ARTIFACTS, PROFILE_HEADER, profile_directory, profiling_authorized
+
+router = APIRouter()
+
+PROFILE_ID_PATTERN = re.compile(r"\d{8}T\d{6}-[0-9a-f]{8}")
+
+@router.get("/{profile_id}/{artifact}")
+async def read_profile_artifact(
+    profile_id: str,
+    artifact: str,
+    profile_token: Optional[str] = Header(None, alias=PROFILE_HEADER)
+):
+    """Download a profiling artifact; needs the same X-Koden-Profile header that produced it."""
+    if not profiling_authorized(profile_token):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Profiling is not enabled for this token"
+        )
+    path = profile_directory(profile_id) / artifact
+    if artifact not in ARTIFACTS or not PROFILE_ID_PATTERN.fullmatch(profile_id) or not path.is_file():
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Profile artifact not found"
+        )
+    return FileResponse(path, filename=f"{profile_id}-{artifact}")
@@ -1,27 +1,31 @@
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlmodel import Session, select, func
-from app.core.database import get_session
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlmodel import select, func
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.core.database import get_async_session
+from app.core.auth import get_current_user
 from app.core.dependencies import get_current_db_user
+from app.core.pagination import keyset_page, page_results, cached_count, invalidate_count
 from db.models.user import User
 from db.models.repos import Repo
-from app.models.api.repos import RepoCreate, RepoUpdate, RepoResponse, RepoListResponse
+from app.services.repo_service import RepoService
+from app.models.api.repos import RepoCreate, RepoUpdate, RepoResponse, RepoDetailResponse, RepoListResponse
 
 router = APIRouter()
 
 @router.post("/", response_model=RepoResponse, status_code=status.HTTP_201_CREATED)
 async def create_repo(
     repo: RepoCreate,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_db_user)
 ):
     """Create a new repo for the current user."""
     # Check if repo already exists for this user
-    existing_repo = session.exec(
+    existing_repo = (await session.exec(
         select(Repo)
         .where(Repo.user_id == current_user.id)
         .where(Repo.github_url == str(repo.github_url))
-    ).first()
+    )).first()
     
     if existing_repo:
         raise HTTPException(
@@ -37,80 +41,62 @@ async def create_repo(
     )
 
     session.add(db_repo)
-    session.commit()
-    session.refresh(db_repo)
+    await session.commit()
+    await session.refresh(db_repo)
+    await invalidate_count(f"repos:{current_user.id}")
     return db_repo
 
 @router.get("/", response_model=RepoListResponse)
 async def read_repos(
-    skip: int = 0,
-    limit: int = 100,
-    session: Session = Depends(get_session),
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=500),
+    session: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_db_user)
 ):
-    """Get all repos for the current user with pagination."""
-    repos = session.exec(
-        select(Repo)
-        .where(Repo.user_id == current_user.id)
-        .offset(skip)
-        .limit(limit)
-    ).all()
-    
-    total = session.exec(
+    """Get the current user's repos, newest first, with cursor pagination."""
+    rows = (await session.exec(
+        keyset_page(select(Repo).where(Repo.user_id == current_user.id), Repo, cursor, limit)
+    )).all()
+    repos, next_cursor = page_results(rows, limit)
+
+    total = await cached_count(
+        session,
+        f"repos:{current_user.id}",
         select(func.count()).select_from(Repo).where(Repo.user_id == current_user.id)
-    ).first()
+    )
     
     return RepoListResponse(
         repos=repos,
         total=total,
-        skip=skip,
-        limit=limit
+        limit=limit,
+        next_cursor=next_cursor
     )
 
-@router.get("/{repo_id}", response_model=RepoResponse)
+@router.get("/{repo_id}", response_model=RepoDetailResponse)
 async def read_repo(
     repo_id: int,
-    session: Session = Depends(get_session),
-    current_user: User = Depends(get_current_db_user)
+    include_tasks: bool = False,
+    session: AsyncSession = Depends(get_async_session),
+    firebase_user: dict = Depends(get_current_user)
 ):
-    """Get a specific repo by ID."""
-    repo = session.get(Repo, repo_id)
-    if not repo:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Repo not found"
-        )
-    
-    # Check if the repo belongs to the current user
-    if repo.user_id != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to access this repo"
-        )
-    
-    return repo
+    """Get a specific repo by ID, optionally with its download tasks."""
+    repo = await RepoService(session).get_authorized_repo(
+        repo_id, firebase_user["uid"], with_download_tasks=include_tasks
+    )
+    return RepoDetailResponse(
+        **RepoResponse.model_validate(repo).model_dump(),
+        download_tasks=repo.download_tasks if include_tasks else None
+    )
 
 @router.patch("/{repo_id}", response_model=RepoResponse)
 async def update_repo(
     repo_id: int,
     repo_update: RepoUpdate,
-    session: Session = Depends(get_session),
-    current_user: User = Depends(get_current_db_user)
+    session: AsyncSession = Depends(get_async_session),
+    firebase_user: dict = Depends(get_current_user)
 ):
     """Update a repo."""
-    repo = session.get(Repo, repo_id)
-    if not repo:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Repo not found"
-        )
-    
-    # Check if the repo belongs to the current user
-    if repo.user_id != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to update this repo"
-        )
+    repo = await RepoService(session).get_authorized_repo(repo_id, firebase_user["uid"], action="update")
     
     # Update repo fields
     update_data = repo_update.model_dump(exclude_unset=True)
@@ -121,31 +107,24 @@ async def update_repo(
         setattr(repo, key, value)
     
     session.add(repo)
-    session.commit()
-    session.refresh(repo)
+    await session.commit()
+    await session.refresh(repo)
     return repo
 
 @router.delete("/{repo_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_repo(
     repo_id: int,
-    session: Session = Depends(get_session),
-    current_user: User = Depends(get_current_db_user)
+    session: AsyncSession = Depends(get_async_session),
+    firebase_user: dict = Depends(get_current_user)
 ):
-    """Delete a repo."""
-    repo = session.get(Repo, repo_id)
-    if not repo:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Repo not found"
-        )
-    
-    # Check if the repo belongs to the current user
-    if repo.user_id != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to delete this repo"
-        )
+    """Delete a repo and its download tasks."""
+    # Tasks are loaded up front so the cascade doesn't lazy-load them
+    repo = await RepoService(session).get_authorized_repo(
+        repo_id, firebase_user["uid"], action="delete", with_download_tasks=True
+    )
     
-    session.delete(repo)
-    session.commit()
-    return None 
\ No newline at end of file
+    await session.delete(repo)
+    await session.commit()
+    await invalidate_count(f"repos:{repo.user_id}")
+    await invalidate_count(f"download_tasks:{repo_id}")
+    return None
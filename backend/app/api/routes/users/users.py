@@ -1,9 +1,12 @@
-from typing import List
+from typing import List, Optional
 from db.models.user import User
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlmodel import Session, select
-from app.core.database import get_session
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlmodel import select, func
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.core.database import get_async_session
 from app.core.auth import get_current_user
+from app.core.dependencies import invalidate_cached_user
+from app.core.pagination import keyset_page, page_results, estimated_count
 from app.models.api.users import UserCreate, UserUpdate, UserResponse, UserListResponse
 
 router = APIRouter()
@@ -11,12 +14,12 @@ router = APIRouter()
 @router.post("/", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
 async def create_user(
     user: UserCreate,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     firebase_user: dict = Depends(get_current_user)
 ):
     """Create a new user."""
     # Check if user with email already exists
-    existing_user = session.exec(select(User).where(User.email == user.email)).first()
+    existing_user = (await session.exec(select(User).where(User.email == user.email))).first()
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -31,36 +34,37 @@ async def create_user(
     )
     
     session.add(db_user)
-    session.commit()
-    session.refresh(db_user)
+    await session.commit()
+    await session.refresh(db_user)
     return db_user
 
 @router.get("/", response_model=UserListResponse)
 async def read_users(
-    skip: int = 0,
-    limit: int = 100,
-    session: Session = Depends(get_session),
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=500),
+    session: AsyncSession = Depends(get_async_session),
     firebase_user: dict = Depends(get_current_user)
 ):
-    """Get all users with pagination."""
-    users = session.exec(select(User).offset(skip).limit(limit)).all()
-    total = session.exec(select(User)).count()
+    """Get all users, newest first, with cursor pagination and an estimated total."""
+    rows = (await session.exec(keyset_page(select(User), User, cursor, limit))).all()
+    users, next_cursor = page_results(rows, limit)
+    total = await estimated_count(session, User)
     return UserListResponse(
         users=users,
         total=total,
-        skip=skip,
-        limit=limit
+        limit=limit,
+        next_cursor=next_cursor
     )
 
 @router.get("/me", response_model=UserResponse)
 async def read_current_user(
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     firebase_user: dict = Depends(get_current_user)
 ):
     """Get the current user's profile."""
-    user = session.exec(
+    user = (await session.exec(
         select(User).where(User.firebase_uid == firebase_user["uid"])
-    ).first()
+    )).first()
     
     if not user:
         raise HTTPException(
@@ -73,11 +77,11 @@ async def read_current_user(
 @router.get("/{user_id}", response_model=UserResponse)
 async def read_user(
     user_id: int,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     firebase_user: dict = Depends(get_current_user)
 ):
     """Get a specific user by ID."""
-    user = session.get(User, user_id)
+    user = await session.get(User, user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -89,11 +93,11 @@ async def read_user(
 async def update_user(
     user_id: int,
     user_update: UserUpdate,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     firebase_user: dict = Depends(get_current_user)
 ):
     """Update a user."""
-    user = session.get(User, user_id)
+    user = await session.get(User, user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -109,9 +113,9 @@ async def update_user(
     
     # Check if email is being updated and if it's already taken
     if user_update.email and user_update.email != user.email:
-        existing_user = session.exec(
+        existing_user = (await session.exec(
             select(User).where(User.email == user_update.email)
-        ).first()
+        )).first()
         if existing_user:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -124,18 +128,19 @@ async def update_user(
         setattr(user, key, value)
     
     session.add(user)
-    session.commit()
-    session.refresh(user)
+    await session.commit()
+    await session.refresh(user)
+    invalidate_cached_user(user.firebase_uid)
     return user
 
 @router.delete("/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_user(
     user_id: int,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     firebase_user: dict = Depends(get_current_user)
 ):
     """Delete a user."""
-    user = session.get(User, user_id)
+    user = await session.get(User, user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -149,7 +154,8 @@ async def delete_user(
             detail="Not authorized to delete this user"
         )
     
-    session.delete(user)
-    session.commit()
+    await session.delete(user)
+    await session.commit()
+    invalidate_cached_user(user.firebase_uid)
     return None
 
@@ -1,16 +1,22 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlmodel import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlmodel.ext.asyncio.session import AsyncSession
+from typing import List, Optional
 from db.models.tasks import Task, RepoDownloadTask, Repo
 from app.services.task_service import TaskService
+from app.services.repo_service import RepoService
+from app.models.api.tasks import RepoDownloadTaskListResponse
 from app.core.auth import get_current_user
-from app.core.database import get_session
-from app.core.logging import logger
+from app.core.database import get_async_session
+from app.core.logging import get_logger
+from app.core.profiling import current_profile
 from app.celery_app import celery_app
 from app.tasks.github import download_github_repo
+from app.tasks.routing import route_repo_download
+from app.services.github_service import github_service
 from urllib.parse import urlparse
 
 router = APIRouter()
+logger = get_logger("api.tasks")
 
 def parse_github_url(url: str) -> tuple[str, str]:
     """Parse GitHub URL to get owner and repo name."""
@@ -27,11 +33,11 @@ def parse_github_url(url: str) -> tuple[str, str]:
 async def get_task(
     task_id: str,
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_session)
+    db: AsyncSession = Depends(get_async_session)
 ):
     """Get a task by its ID."""
     task_service = TaskService(db)
-    task = task_service.get_task(task_id)
+    task = await task_service.get_task(task_id)
     if not task:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -39,60 +45,60 @@ async def get_task(
         )
     return task
 
-@router.get("/repos/{repo_id}/download-tasks", response_model=List[RepoDownloadTask])
+@router.get("/repos/{repo_id}/download-tasks", response_model=RepoDownloadTaskListResponse)
 async def get_repo_download_tasks(
     repo_id: int,
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=500),
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_session)
+    db: AsyncSession = Depends(get_async_session)
 ):
-    """Get all download tasks for a repository."""
+    """Get download tasks for a repository, newest first, with cursor pagination."""
     task_service = TaskService(db)
-    return task_service.get_repo_download_tasks(repo_id)
+    tasks, next_cursor = await task_service.get_repo_download_tasks(repo_id, cursor, limit)
+    return RepoDownloadTaskListResponse(
+        tasks=tasks,
+        total=await task_service.count_repo_download_tasks(repo_id),
+        limit=limit,
+        next_cursor=next_cursor
+    )
 
 @router.post("/repos/{repo_id}/download", response_model=RepoDownloadTask)
 async def create_repo_download_task(
     repo_id: int,
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_session)
+    db: AsyncSession = Depends(get_async_session)
 ):
     """Create a new repository download task."""
     task_service = TaskService(db)
     
-    # Get repo details from the database
-    repo = db.get(Repo, repo_id)
-    if not repo:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Repository not found"
-        )
+    # Get repo details from the database, scoped to the caller
+    repo = await RepoService(db).get_authorized_repo(repo_id, current_user["uid"])
     
     try:
         # Parse GitHub URL to get owner and repo name
         owner, repo_name = parse_github_url(repo.github_url)
-        logger.info(f"Creating download task for {owner}/{repo_name}")
+        logger.info("Creating download task for %s/%s", owner, repo_name)
         
-        # Create Celery task with explicit queue
+        # Route by repo size so large downloads don't block small ones
+        access_token = current_user.get("github_access_token")
+        metadata = await github_service.get_repository_metadata(access_token, owner, repo_name)
+        route = route_repo_download(metadata.get("size") if metadata else None)
+
         celery_task = download_github_repo.apply_async(
-            args=[owner, repo_name, repo.branch or "main", current_user.get("github_access_token")],
-            queue='default',
-            routing_key='default'
+            args=[owner, repo_name, repo.branch or "main", access_token],
+            # A profiled request profiles the download it starts too
+            kwargs={"profile": current_profile() is not None},
+            **route
+        )
+        logger.info(
+            "Celery task created with ID: %s on queue %s (priority %s)",
+            celery_task.id, route["queue"], route["priority"]
         )
-        logger.info(f"Celery task created with ID: {celery_task.id}")
         
         # Create task record in database
-        task = task_service.create_download_task(repo_id, celery_task.id)
-        logger.info(f"Database task record created: {task}")
-        
-        # Verify task is in Redis
-        task_in_redis = celery_app.AsyncResult(celery_task.id)
-        logger.info(f"Task in Redis status: {task_in_redis.status}, ready: {task_in_redis.ready()}")
-        
-        # Check if task is in the queue
-        i = celery_app.control.inspect()
-        active = i.active()
-        reserved = i.reserved()
-        scheduled = i.scheduled()
-        logger.info(f"Task queues status - Active: {active}, Reserved: {reserved}, Scheduled: {scheduled}")
+        task = await task_service.create_download_task(repo_id, celery_task.id)
+        logger.debug("Database task record created: %s", task)
         
         return task
     except ValueError as e:
@@ -112,18 +118,19 @@ async def create_repo_download_task(
 async def get_task_status(
     task_id: str,
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_session)
+    db: AsyncSession = Depends(get_async_session)
 ):
     """Get the current status of a task."""
     task_service = TaskService(db)
     
     # Get task from database
-    task = task_service.get_task(task_id)
-    logger.info(f"Task status from DB: {task}")
+    task = await task_service.get_task(task_id)
+    logger.debug("Task status from DB: %s", task)
     
-    # Get Celery task status
+    # Get Celery task status; each property read is a result backend round trip
     celery_task = celery_app.AsyncResult(task_id)
-    logger.info(f"Celery task status: {celery_task.status}, ready: {celery_task.ready()}, result: {celery_task.result}")
+    celery_state = celery_task.status
+    logger.debug("Celery task %s status: %s", task_id, celery_state)
     
     # Map Celery states to our states
     celery_status_map = {
@@ -134,19 +141,19 @@ async def get_task_status(
         'RETRY': 'processing',
         'REVOKED': 'failed'
     }
-    celery_status = celery_status_map.get(celery_task.status, 'failed')
+    celery_status = celery_status_map.get(celery_state, 'failed')
     
     # If task doesn't exist in DB but exists in Redis
     if not task and celery_status != 'pending':
         # Create task record in database
-        task = task_service.create_download_task(
+        task = await task_service.create_download_task(
             repo_id=0,  # We don't know the repo_id at this point
             task_id=task_id,
             status=celery_status,
             output_path=celery_task.result if celery_status == "completed" else None,
             error_message=str(celery_task.result) if celery_status == "failed" else None
         )
-        logger.info(f"Created missing task record: {task}")
+        logger.info("Created missing task record: %s", task)
     elif not task:
         # Task doesn't exist in either place
         raise HTTPException(
@@ -156,8 +163,8 @@ async def get_task_status(
     
     # If task exists in Redis/Celery but status has changed
     if celery_status != task.status:
-        logger.info(f"Updating task status from {task.status} to {celery_status}")
-        updated_task = task_service.update_task_status(
+        logger.info("Updating task %s status from %s to %s", task_id, task.status, celery_status)
+        updated_task = await task_service.update_task_status(
             task_id=task_id,
             status=celery_status,
             output_path=celery_task.result if celery_status == "completed" else None,
@@ -165,7 +172,7 @@ async def get_task_status(
         )
         if updated_task:
             task = updated_task
-            logger.info(f"Updated task status: {task}")
+            logger.debug("Updated task status: %s", task)
     
     return {
         "status": task.status,
@@ -177,13 +184,13 @@ async def get_task_status(
 async def delete_task(
     task_id: str,
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_session)
+    db: AsyncSession = Depends(get_async_session)
 ):
     """Delete a task and its associated Celery task."""
     task_service = TaskService(db)
     
     # First try to find it in repo_download_tasks
-    task = db.query(RepoDownloadTask).filter(RepoDownloadTask.task_id == task_id).first()
+    task = await task_service.get_task(task_id)
     if not task:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -195,12 +202,11 @@ async def delete_task(
         celery_task = celery_app.AsyncResult(task_id)
         if celery_task.state in ['PENDING', 'STARTED']:
             celery_app.control.revoke(task_id, terminate=True)
-            logger.info(f"Revoked Celery task {task_id}")
+            logger.info("Revoked Celery task %s", task_id)
         
         # Delete the task from the database
-        db.delete(task)
-        db.commit()
-        logger.info(f"Deleted task {task_id} from database")
+        await task_service.delete_task(task)
+        logger.info("Deleted task %s from database", task_id)
         
         return {"message": "Task deleted successfully"}
     except Exception as e:
@@ -1,4 +1,5 @@
 from celery import Celery
+from celery.signals import worker_ready
 from app.core.config import settings
 from app.core.logging import logger
 
@@ -21,8 +22,24 @@ celery_app.conf.update(
     worker_prefetch_multiplier=1,  # Process one task at a time
     task_acks_late=True,     # Only acknowledge task after it's completed
     task_reject_on_worker_lost=True,  # Requeue task if worker dies
-    task_default_queue='default',  # Explicitly set default queue
+    task_default_queue='small',  # Unrouted work goes to the small pool
     task_queues={
+        # Latency-sensitive jobs a user is actively waiting on
+        'interactive': {
+            'exchange': 'interactive',
+            'routing_key': 'interactive',
+        },
+        # Regular repos, kept away from large downloads
+        'small': {
+            'exchange': 'small',
+            'routing_key': 'small',
+        },
+        # Monorepos and other large archives
+        'large': {
+            'exchange': 'large',
+            'routing_key': 'large',
+        },
+        # Kept so tasks already enqueued before the split still drain
         'default': {
             'exchange': 'default',
             'routing_key': 'default',
@@ -30,16 +47,28 @@ celery_app.conf.update(
     },
     task_routes={
         'download_github_repo': {
-            'queue': 'default',
-            'routing_key': 'default',
+            'queue': 'small',
+            'routing_key': 'small',
         },
     },
+    # Redis emulates priorities with one list per step; 0 is the highest priority
+    broker_transport_options={
+        'priority_steps': list(range(settings.CELERY_MAX_PRIORITY + 1)),
+        'queue_order_strategy': 'priority',
+    },
+    task_default_priority=settings.CELERY_MAX_PRIORITY // 2,
     worker_send_task_events=True,
     task_send_sent_event=True,
 )
 
-# Make sure tasks are registered
-celery_app.autodiscover_tasks(['app.tasks'])
+# Task timing and queue wait metrics; publishers need it too, to stamp messages
+import app.tasks.monitoring  # noqa: E402,F401
+
+# Every worker sweeps the artifact store of its host
+import app.tasks.artifacts  # noqa: E402,F401
 
-# Log registered tasks
-logger.info(f"Registered tasks: {celery_app.tasks.keys()}") 
\ No newline at end of file
+@worker_ready.connect
+def log_registered_tasks(sender=None, **kwargs):
+    """Log the registered tasks once, from the worker, instead of in every importer."""
+    names = sorted(name for name in sender.app.tasks if not name.startswith("celery."))
+    logger.info("Registered tasks: %s", ", ".join(names)) 
\ No newline at end of file
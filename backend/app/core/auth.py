@@ -1,38 +1,106 @@
-from typing import Optional, Dict, Any
-import firebase_admin
-from firebase_admin import credentials, auth
+from typing import Callable, Optional, Dict, Any, Tuple
+from collections import OrderedDict
+import hashlib
+import importlib
+import os
+import threading
+import time
 from fastapi import Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from app.core.config import settings
 from app.core.logging import logger
+from app.core.metrics import record_cache
+from app.core.timing import timed
 
-# Initialize Firebase Admin
-cred = credentials.Certificate({
-    "type": "service_account",
-    "project_id": settings.FIREBASE_PROJECT_ID,
-    "private_key_id": settings.FIREBASE_PRIVATE_KEY_ID,
-    "private_key": settings.FIREBASE_PRIVATE_KEY.replace('\\n', '\n'),
-    "client_email": settings.FIREBASE_CLIENT_EMAIL,
-    "client_id": settings.FIREBASE_CLIENT_ID,
-    "auth_uri": settings.FIREBASE_AUTH_URI,
-    "token_uri": settings.FIREBASE_TOKEN_URI,
-    "auth_provider_x509_cert_url": settings.FIREBASE_AUTH_PROVIDER_X509_CERT_URL,
-    "client_x509_cert_url": settings.FIREBASE_CLIENT_X509_CERT_URL
-})
-
-try:
-    firebase_admin.initialize_app(cred)
-except ValueError:
-    # App already initialized
-    pass
+# Fail at startup rather than on the first request
+if settings.AUTH_TOKEN_VERIFIER and os.getenv("ENV", "development") == "production":
+    raise RuntimeError("AUTH_TOKEN_VERIFIER must not be set in production")
+
+_init_lock = threading.Lock()
+_token_verifier: Optional[Callable[[str], Dict[str, Any]]] = None
+
+def get_firebase_app():
+    """
+    The default Firebase Admin app, initialized on first use.
+
+    firebase_admin pulls in google-auth and the crypto stack, so it is only
+    imported once a token actually needs verifying.
+    """
+    import firebase_admin
+    from firebase_admin import credentials
+
+    with _init_lock:
+        try:
+            return firebase_admin.get_app()
+        except ValueError:
+            pass
+        cred = credentials.Certificate({
+            "type": "service_account",
+            "project_id": settings.FIREBASE_PROJECT_ID,
+            "private_key_id": settings.FIREBASE_PRIVATE_KEY_ID,
+            "private_key": settings.FIREBASE_PRIVATE_KEY.replace('\\n', '\n'),
+            "client_email": settings.FIREBASE_CLIENT_EMAIL,
+            "client_id": settings.FIREBASE_CLIENT_ID,
+            "auth_uri": settings.FIREBASE_AUTH_URI,
+            "token_uri": settings.FIREBASE_TOKEN_URI,
+            "auth_provider_x509_cert_url": settings.FIREBASE_AUTH_PROVIDER_X509_CERT_URL,
+            "client_x509_cert_url": settings.FIREBASE_CLIENT_X509_CERT_URL
+        })
+        logger.info("Initializing Firebase Admin")
+        return firebase_admin.initialize_app(cred)
+
+def _load_token_verifier() -> Callable[[str], Dict[str, Any]]:
+    """Firebase's verify_id_token, unless AUTH_TOKEN_VERIFIER names a stand-in."""
+    if not settings.AUTH_TOKEN_VERIFIER:
+        from firebase_admin import auth
+        get_firebase_app()
+        return auth.verify_id_token
+    module, name = settings.AUTH_TOKEN_VERIFIER.split(":")
+    logger.warning("Verifying ID tokens with %s instead of Firebase", settings.AUTH_TOKEN_VERIFIER)
+    return getattr(importlib.import_module(module), name)
+
+def verify_id_token(token: str) -> Dict[str, Any]:
+    """Verify an ID token, loading the verifier on the first call."""
+    global _token_verifier
+    if _token_verifier is None:
+        _token_verifier = _load_token_verifier()
+    return _token_verifier(token)
 
 security = HTTPBearer()
 
+# sha256(token) -> (decoded claims, exp), most recently used last
+_verified_tokens: "OrderedDict[str, Tuple[Dict[str, Any], float]]" = OrderedDict()
+
+async def verify_token_cached(token: str) -> Dict[str, Any]:
+    """
+    Verify a Firebase ID token, reusing the decoded claims until the token expires.
+
+    Verification is an RSA signature check (plus the occasional certificate
+    fetch), so misses run in the thread pool instead of on the event loop.
+    """
+    key = hashlib.sha256(token.encode()).hexdigest()
+    cached = _verified_tokens.get(key)
+    if cached is not None:
+        if cached[1] > time.time():
+            _verified_tokens.move_to_end(key)
+            record_cache("auth_token", True)
+            return cached[0]
+        del _verified_tokens[key]
+    record_cache("auth_token", False)
+
+    with timed("auth"):
+        decoded_token = await run_in_threadpool(verify_id_token, token)
+    _verified_tokens[key] = (decoded_token, float(decoded_token["exp"]))
+    if len(_verified_tokens) > settings.AUTH_TOKEN_CACHE_SIZE:
+        _verified_tokens.popitem(last=False)
+    return decoded_token
+
 async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> Dict[str, Any]:
     """Verify Firebase ID token and return the decoded token."""
     try:
         token = credentials.credentials
-        decoded_token = auth.verify_id_token(token)
+        decoded_token = await verify_token_cached(token)
         # logger.info(decoded_token)
         return {**decoded_token, "token": token}
     except Exception as e:
@@ -38,9 +38,90 @@ class Settings(BaseSettings):
     FIREBASE_APP_ID: str = os.getenv("FIREBASE_APP_ID", "")
     FIREBASE_MEASUREMENT_ID: str = os.getenv("FIREBASE_MEASUREMENT_ID", "")
 
+    # Dotted path ("module:function") to a replacement for Firebase ID token
+    # verification, e.g. loadtest.auth_stub:verify_token. Never set in production.
+    AUTH_TOKEN_VERIFIER: str = os.getenv("AUTH_TOKEN_VERIFIER", "")
+
+    # Verified Firebase ID tokens kept in memory (entries expire with the token)
+    AUTH_TOKEN_CACHE_SIZE: int = 10000
+
+    # Resolved DB users kept in memory per Firebase UID
+    USER_CACHE_TTL: int = 30                     # Seconds
+    USER_CACHE_SIZE: int = 10000
+
     # GitHub OAuth settings (optional since we're using Firebase)
     GITHUB_CLIENT_ID: Optional[str] = os.getenv("GITHUB_CLIENT_ID")
     GITHUB_CLIENT_SECRET: Optional[str] = os.getenv("GITHUB_CLIENT_SECRET")
+    GITHUB_API_URL: str = os.getenv("GITHUB_API_URL", "https://api.github.com")  # Point at a fake for load tests
+
+    # GitHub HTTP connection pool
+    GITHUB_HTTP_POOL_SIZE: int = 100
+    GITHUB_HTTP_LIMIT_PER_HOST: int = 30
+    GITHUB_HTTP_DNS_CACHE_TTL: int = 300         # Seconds
+    GITHUB_HTTP_KEEPALIVE_TIMEOUT: float = 60.0  # Seconds an idle connection stays open
+    GITHUB_HTTP_TIMEOUT: float = 300.0           # Total per request, zipballs can be large
+    GITHUB_HTTP_CONNECT_TIMEOUT: float = 10.0
+
+    # GitHub API rate limiting
+    GITHUB_RATE_LIMIT_RESERVE: int = 50          # Requests held back from each token's quota
+    GITHUB_RATE_LIMIT_BURST: int = 20            # Token bucket capacity per GitHub token
+    GITHUB_RATE_LIMIT_MAX_RATE: float = 10.0     # Upper bound on requests/second per token
+    GITHUB_RATE_LIMIT_MAX_WAIT: float = 10.0     # Longest in-process wait before rescheduling
+    GITHUB_RATE_LIMIT_MAX_RETRIES: int = 10
+
+    # GitHub response cache (entries are revalidated with ETags, TTL only bounds storage)
+    GITHUB_RESPONSE_CACHE_TTL: int = 24 * 3600
+
+    # GitHub username cache (token fingerprint -> login)
+    GITHUB_USERNAME_CACHE_TTL: int = 3600
+    GITHUB_USERNAME_CACHE_SIZE: int = 10000
+
+    # Redis (shared caches and rate limiter state)
+    REDIS_URL: str = "redis://localhost:6379/1"
+
+    # Metrics
+    WORKER_METRICS_PORT: int = 9540    # Prometheus port for Celery workers, 0 disables
+
+    # Request timing
+    SERVER_TIMING_HEADER: bool = True       # Send the per-stage breakdown as Server-Timing
+    SLOW_REQUEST_THRESHOLD_MS: int = 1000   # Log requests slower than this
+
+    # On-demand profiling (X-Koden-Profile header); an empty token disables it
+    PROFILING_TOKEN: str = os.getenv("PROFILING_TOKEN", "")
+    PROFILE_ARTIFACT_DIR: str = "profiles"
+    PROFILE_SAMPLE_INTERVAL: float = 0.005    # Seconds between stack samples
+    PROFILE_TRACEMALLOC_FRAMES: int = 10
+    PROFILE_TOP_ALLOCATIONS: int = 50
+
+    # Response compression
+    RESPONSE_COMPRESSION_MIN_SIZE: int = 1024    # Bytes
+    RESPONSE_BROTLI_QUALITY: int = 5             # 0-11, higher is smaller but slower
+
+    # Archive guards, checked against the zip's central directory before extraction
+    ARCHIVE_MAX_MEMBERS: int = 100000                    # More entries rejects the archive
+    ARCHIVE_MAX_UNCOMPRESSED_BYTES: int = 1024 ** 3      # 1GB in total rejects the archive
+    ARCHIVE_MAX_PATH_DEPTH: int = 32                     # Deeper paths are skipped
+    ARCHIVE_MAX_FILE_BYTES: int = 5 * 1024 * 1024        # Larger files are skipped
+    ANALYSIS_PARSE_TIME_BUDGET: float = 2.0              # Seconds per file before it's skipped
+
+    # Downloaded zipballs, keyed by owner/repo@sha and shared between tasks
+    ARTIFACT_STORE_BACKEND: str = os.getenv("ARTIFACT_STORE_BACKEND", "local")  # local or s3
+    ARTIFACT_STORE_DIR: str = "artifacts"                # Local backend root
+    ARTIFACT_STORE_MAX_BYTES: int = 10 * 1024 ** 3      # 10GB, least recently used evicted past this
+    ARTIFACT_STORE_LEASE_SECONDS: int = 3600             # How long a job's hold protects an archive
+    ARTIFACT_SWEEP_INTERVAL: int = 300                   # Seconds between sweeps of each store namespace
+    ARTIFACT_S3_BUCKET: str = os.getenv("ARTIFACT_S3_BUCKET", "koden-artifacts")
+    ARTIFACT_S3_ENDPOINT_URL: Optional[str] = os.getenv("ARTIFACT_S3_ENDPOINT_URL")  # e.g. MinIO at http://localhost:9000
+    ARTIFACT_S3_ACCESS_KEY: Optional[str] = os.getenv("ARTIFACT_S3_ACCESS_KEY")
+    ARTIFACT_S3_SECRET_KEY: Optional[str] = os.getenv("ARTIFACT_S3_SECRET_KEY")
+    ARTIFACT_S3_REGION: Optional[str] = os.getenv("ARTIFACT_S3_REGION")
+
+    # Stored analyses
+    ANALYSIS_ZSTD_LEVEL: int = 9
+    GRAPH_INDEX_CACHE_SIZE: int = 32             # Decoded graph indexes kept per process
+
+    # Cached list totals (invalidated on writes, TTL bounds drift)
+    COUNT_CACHE_TTL: int = 300
 
     # Other settings
     STRIPE_API_KEY: str = os.getenv("STRIPE_API_KEY", "")
@@ -50,6 +131,11 @@ class Settings(BaseSettings):
     CELERY_BROKER_URL: str = "redis://localhost:6379/0"
     CELERY_RESULT_BACKEND: str = "redis://localhost:6379/0"
 
+    # Queue routing (GitHub reports repo size in KB)
+    CELERY_INTERACTIVE_MAX_REPO_KB: int = 5 * 1024      # 5MB
+    CELERY_SMALL_MAX_REPO_KB: int = 100 * 1024          # 100MB
+    CELERY_MAX_PRIORITY: int = 9
+
     class Config:
         case_sensitive = True
         env_file = ".env"
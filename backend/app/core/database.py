@@ -1,9 +1,14 @@
+from typing import AsyncGenerator, Optional
 from sqlmodel import SQLModel, create_engine, Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 from sqlalchemy.engine import Engine
+from sqlalchemy.engine.url import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine, async_sessionmaker
 from sqlalchemy.pool import StaticPool
 import os
 from dotenv import load_dotenv
 import sys
+from app.core.timing import instrument_engine
 
 # Add the parent directory to the Python path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
@@ -30,15 +35,70 @@ def get_database_url() -> str:
 
 DATABASE_URL = get_database_url()
 
-engine = create_engine(
-    DATABASE_URL,
-    echo=os.getenv("ENV", "development") == "development",  # Only echo SQL in development
-    pool_pre_ping=True,
-)
+def get_async_database_url(url: str) -> str:
+    """Point a postgresql:// URL at the asyncpg driver."""
+    return str(make_url(url).set(drivername="postgresql+asyncpg"))
+
+# Engines are created on first use, so importing this module (and every
+# route that depends on get_async_session) stays cheap at startup
+_engine: Optional[Engine] = None
+_async_engine: Optional[AsyncEngine] = None
+_async_session_maker: Optional[async_sessionmaker] = None
+
+def get_engine() -> Engine:
+    global _engine
+    if _engine is None:
+        _engine = create_engine(
+            DATABASE_URL,
+            echo=os.getenv("ENV", "development") == "development",  # Only echo SQL in development
+            pool_pre_ping=True,
+        )
+    return _engine
+
+def get_async_engine() -> AsyncEngine:
+    """The API's async engine, so queries don't block the event loop"""
+    global _async_engine
+    if _async_engine is None:
+        _async_engine = create_async_engine(
+            get_async_database_url(DATABASE_URL),
+            echo=os.getenv("ENV", "development") == "development",
+            pool_pre_ping=True,
+            pool_size=int(os.getenv("DB_POOL_SIZE", "10")),
+            max_overflow=int(os.getenv("DB_MAX_OVERFLOW", "20")),
+            pool_recycle=int(os.getenv("DB_POOL_RECYCLE", "1800")),  # Seconds
+            pool_timeout=int(os.getenv("DB_POOL_TIMEOUT", "30")),
+            connect_args={
+                # asyncpg prepares every statement; keep them cached per connection
+                "prepared_statement_cache_size": int(os.getenv("DB_STATEMENT_CACHE_SIZE", "500")),
+            },
+        )
+        instrument_engine(_async_engine.sync_engine)
+    return _async_engine
+
+def get_async_session_maker() -> async_sessionmaker:
+    global _async_session_maker
+    if _async_session_maker is None:
+        _async_session_maker = async_sessionmaker(
+            get_async_engine(),
+            class_=AsyncSession,
+            expire_on_commit=False,
+        )
+    return _async_session_maker
+
+async def dispose_engines() -> None:
+    """Close whichever engines were opened"""
+    if _async_engine is not None:
+        await _async_engine.dispose()
+    if _engine is not None:
+        _engine.dispose()
 
 def create_db_and_tables():
-    SQLModel.metadata.create_all(engine)
+    SQLModel.metadata.create_all(get_engine())
 
 def get_session() -> Session:
-    with Session(engine) as session:
+    with Session(get_engine()) as session:
+        yield session
+
+async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
+    async with get_async_session_maker()() as session:
         yield session 
\ No newline at end of file
@@ -1,23 +1,48 @@
-from typing import Optional
+import time
+from typing import Dict, Optional, Tuple
 from fastapi import Depends, HTTPException, status
-from sqlmodel import Session, select
-from app.core.database import get_session
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.core.config import settings
+from app.core.database import get_async_session
+from app.core.metrics import record_cache
 from app.core.auth import get_current_user
 from db.models.user import User
 
+# firebase_uid -> (detached User snapshot, expiry on the monotonic clock)
+_user_cache: Dict[str, Tuple[User, float]] = {}
+
+def invalidate_cached_user(firebase_uid: str) -> None:
+    """Forget a cached user after their row changes."""
+    _user_cache.pop(firebase_uid, None)
+
 async def get_current_db_user(
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     firebase_user: dict = Depends(get_current_user)
 ) -> User:
     """Get the current user from the database using firebase_uid."""
-    user = session.exec(
+    cached = _user_cache.get(firebase_user["uid"])
+    if cached and cached[1] > time.monotonic():
+        record_cache("db_user", True)
+        return cached[0]
+    record_cache("db_user", False)
+
+    user = (await session.exec(
         select(User).where(User.firebase_uid == firebase_user["uid"])
-    ).first()
+    )).first()
     
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User profile not found"
         )
+
+    # Cache a copy that isn't tied to this request's session
+    if firebase_user["uid"] not in _user_cache and len(_user_cache) >= settings.USER_CACHE_SIZE:
+        _user_cache.pop(next(iter(_user_cache)))
+    _user_cache[firebase_user["uid"]] = (
+        User.model_validate(user.model_dump()),
+        time.monotonic() + settings.USER_CACHE_TTL
+    )
     
-    return user 
\ No newline at end of file
+    return user
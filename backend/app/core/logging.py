@@ -1,25 +1,153 @@
+import atexit
+import copy
+import json
 import logging
+import os
+import queue
+import random
 import sys
+import threading
+import time
 from pathlib import Path
-from logging.handlers import RotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Dict, Optional, Tuple
 
 # Create logs directory if it doesn't exist
 log_dir = Path("logs")
 log_dir.mkdir(exist_ok=True)
 
+_exception_formatter = logging.Formatter()
+
+# LogRecord attributes that aren't user-supplied `extra` fields
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, with any `extra` fields as top-level keys."""
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "module": record.module,
+            "line": record.lineno,
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES:
+                entry[key] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc_info"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+class SnapshotQueueHandler(QueueHandler):
+    """
+    QueueHandler that renders only the message text before enqueueing.
+
+    Log arguments are often live objects (ORM rows, dicts) that can change, or
+    be read concurrently, by the time the listener thread gets to them, so the
+    message and any traceback are rendered here. Records rejected by level or
+    filter never get this far. Timestamps, JSON encoding and I/O still happen
+    on the listener.
+    """
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = _exception_formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+class SamplingFilter(logging.Filter):
+    """
+    Per-logger sampling and rate limiting for records below WARNING.
+
+    LOG_SAMPLE_RATES ("koden.tasks=0.1,koden.analyzer=0.5") keeps a fraction
+    of a logger's records, matched by logger name prefix. LOG_RATE_LIMIT, off
+    by default, caps how often the same message template is logged per
+    LOG_RATE_WINDOW seconds; the next record through reports how many were
+    suppressed.
+    Warnings and errors always pass.
+    """
+    def __init__(self, sample_rates: Dict[str, float], rate_limit: int, rate_window: float):
+        super().__init__()
+        # Longest prefix first so the most specific rate wins
+        self.sample_rates = sorted(sample_rates.items(), key=lambda item: -len(item[0]))
+        self.rate_limit = rate_limit
+        self.rate_window = rate_window
+        # (logger, template) -> (window start, count, suppressed)
+        self._windows: Dict[Tuple[str, str], Tuple[float, int, int]] = {}
+        self._lock = threading.Lock()
+
+    def _sample_rate(self, name: str) -> float:
+        for prefix, rate in self.sample_rates:
+            if name == prefix or name.startswith(prefix + "."):
+                return rate
+        return 1.0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self._sample_rate(record.name)
+        if rate < 1.0 and random.random() >= rate:
+            return False
+        if not self.rate_limit:
+            return True
+
+        key = (record.name, str(record.msg))
+        now = time.monotonic()
+        with self._lock:
+            started, count, suppressed = self._windows.get(key, (now, 0, 0))
+            if now - started >= self.rate_window:
+                started, count = now, 0
+            if count >= self.rate_limit:
+                self._windows[key] = (started, count, suppressed + 1)
+                return False
+            self._windows[key] = (started, count + 1, 0)
+        if suppressed:
+            record.suppressed = suppressed
+        return True
+
+def _parse_sample_rates(value: str) -> Dict[str, float]:
+    rates = {}
+    for entry in filter(None, (part.strip() for part in value.split(","))):
+        name, rate = entry.split("=")
+        rates[name.strip()] = float(rate)
+    return rates
+
+_listener: Optional[QueueListener] = None
+
+def _start_listener(queue_handler: QueueHandler, handlers) -> None:
+    """Give the handler a fresh queue and a listener thread draining it."""
+    global _listener
+    queue_handler.queue = queue.SimpleQueue()
+    _listener = QueueListener(queue_handler.queue, *handlers, respect_handler_level=True)
+    _listener.start()
+
+def _stop_listener() -> None:
+    """Flush queued records; safe to call more than once."""
+    if _listener is not None and _listener._thread is not None:
+        _listener.stop()
+
 # Configure logging
 def setup_logging():
-    # Create formatters
-    console_formatter = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-    )
-    file_formatter = logging.Formatter(
+    """
+    Attach a non-blocking handler pipeline to the "koden" logger.
+
+    Callers only enqueue records; a listener thread formats them and writes
+    them to stdout and the rotating log file. LOG_LEVEL, LOG_FORMAT (json or
+    text), LOG_SAMPLE_RATES, LOG_RATE_LIMIT and LOG_RATE_WINDOW tune it.
+    """
+    json_formatter = JsonFormatter()
+    text_formatter = logging.Formatter(
         '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
     )
 
-    # Create handlers
+    # Create handlers; these only ever run on the listener thread
     console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setFormatter(console_formatter)
+    console_handler.setFormatter(json_formatter if os.getenv("LOG_FORMAT", "text") == "json" else text_formatter)
     console_handler.setLevel(logging.INFO)
 
     file_handler = RotatingFileHandler(
@@ -27,16 +155,34 @@ def setup_logging():
         maxBytes=10485760,  # 10MB
         backupCount=5
     )
-    file_handler.setFormatter(file_formatter)
+    file_handler.setFormatter(json_formatter)
     file_handler.setLevel(logging.DEBUG)
+    handlers = (console_handler, file_handler)
+
+    queue_handler = SnapshotQueueHandler(queue.SimpleQueue())
+    queue_handler.addFilter(SamplingFilter(
+        _parse_sample_rates(os.getenv("LOG_SAMPLE_RATES", "")),
+        rate_limit=int(os.getenv("LOG_RATE_LIMIT", "0")),
+        rate_window=float(os.getenv("LOG_RATE_WINDOW", "10"))
+    ))
+    _start_listener(queue_handler, handlers)
 
     # Create logger
     logger = logging.getLogger("koden")
-    logger.setLevel(logging.DEBUG)
-    logger.addHandler(console_handler)
-    logger.addHandler(file_handler)
+    logger.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+    logger.addHandler(queue_handler)
+    logger.propagate = False
+
+    # Forked children (Celery prefork, gunicorn) don't inherit the listener thread,
+    # and the parent's queue may have been mid-operation at fork time
+    os.register_at_fork(after_in_child=lambda: _start_listener(queue_handler, handlers))
+    atexit.register(_stop_listener)
 
     return logger
 
+def get_logger(name: str) -> logging.Logger:
+    """A child of the koden logger, so LOG_SAMPLE_RATES can target it by name."""
+    return logger.getChild(name)
+
 # Create logger instance
-logger = setup_logging() 
\ No newline at end of file
+logger = setup_logging()
@@ -0,0 +1,161 @@
+import os
+import time
+from contextlib import contextmanager
+from functools import wraps
+import aiohttp
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    REGISTRY,
+    generate_latest,
+    multiprocess
+)
+
+# Buckets from 5ms to 10 minutes; analyses of large repos run for minutes
+STAGE_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+
+ANALYSIS_STAGE_SECONDS = Histogram(
+    "koden_analysis_stage_seconds",
+    "Time spent in each stage of a repository analysis",
+    ["stage"],
+    buckets=STAGE_BUCKETS
+)
+ANALYSIS_FILES = Counter(
+    "koden_analysis_files_total",
+    "Files seen by the analyzer",
+    ["kind"]
+)
+ANALYSIS_BYTES = Counter(
+    "koden_analysis_bytes_total",
+    "Bytes read by the analyzer",
+    ["kind"]
+)
+ANALYSIS_SKIPPED_FILES = Counter(
+    "koden_analysis_skipped_files_total",
+    "Files left out of an analysis by a resource guard",
+    ["reason"]
+)
+
+CELERY_TASK_SECONDS = Histogram(
+    "koden_celery_task_seconds",
+    "Celery task run time",
+    ["task", "state"],
+    buckets=STAGE_BUCKETS
+)
+CELERY_QUEUE_WAIT_SECONDS = Histogram(
+    "koden_celery_queue_wait_seconds",
+    "Time a Celery task spent queued before a worker started it",
+    ["task", "queue"],
+    buckets=STAGE_BUCKETS
+)
+
+GITHUB_REQUEST_SECONDS = Histogram(
+    "koden_github_request_seconds",
+    "GitHub API request latency",
+    ["endpoint", "status"],
+    buckets=STAGE_BUCKETS
+)
+GITHUB_BYTES = Counter(
+    "koden_github_bytes_total",
+    "Bytes downloaded from GitHub",
+    ["endpoint"]
+)
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "koden_http_request_seconds",
+    "API request wall time by route",
+    ["method", "route", "status"],
+    buckets=STAGE_BUCKETS
+)
+
+CACHE_REQUESTS = Counter(
+    "koden_cache_requests_total",
+    "Cache lookups by cache and result (hit or miss)",
+    ["cache", "result"]
+)
+
+@contextmanager
+def stage_timer(stage: str):
+    """Observe the time spent in a block under koden_analysis_stage_seconds."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        ANALYSIS_STAGE_SECONDS.labels(stage).observe(time.perf_counter() - started)
+
+def timed_stage(stage: str):
+    """Decorator form of stage_timer."""
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            with stage_timer(stage):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def record_cache(cache: str, hit: bool) -> None:
+    """Count a cache lookup."""
+    CACHE_REQUESTS.labels(cache, "hit" if hit else "miss").inc()
+
+def github_endpoint(path: str) -> str:
+    """Collapse a GitHub API path to a low-cardinality label, e.g. repos/{owner}/{repo}/zipball."""
+    parts = path.strip("/").split("/")
+    if parts[0] == "repos" and len(parts) >= 3:
+        parts = ["repos", "{owner}", "{repo}"] + parts[3:4]
+    return "/".join(parts)
+
+def github_trace_config() -> aiohttp.TraceConfig:
+    """
+    aiohttp hooks that time every request a session makes to GitHub.
+
+    Latency is measured to the final response's headers; body bytes are
+    counted as they arrive. Both are labelled by the URL first requested,
+    since redirects (zipballs go to codeload.github.com) end on per-repo,
+    per-commit paths.
+    """
+    async def on_request_start(session, context, params):
+        # Fires again for every redirect hop; keep the first
+        if not hasattr(context, "endpoint"):
+            context.endpoint = github_endpoint(params.url.path)
+            context.started = time.perf_counter()
+
+    async def on_request_end(session, context, params):
+        GITHUB_REQUEST_SECONDS.labels(context.endpoint, params.response.status).observe(
+            time.perf_counter() - context.started
+        )
+
+    async def on_request_exception(session, context, params):
+        GITHUB_REQUEST_SECONDS.labels(context.endpoint, "error").observe(
+            time.perf_counter() - context.started
+        )
+
+    async def on_response_chunk_received(session, context, params):
+        GITHUB_BYTES.labels(context.endpoint).inc(len(params.chunk))
+
+    trace_config = aiohttp.TraceConfig()
+    trace_config.on_request_start.append(on_request_start)
+    trace_config.on_request_end.append(on_request_end)
+    trace_config.on_request_exception.append(on_request_exception)
+    trace_config.on_response_chunk_received.append(on_response_chunk_received)
+    return trace_config
+
+def metrics_registry() -> CollectorRegistry:
+    """
+    Registry to export from.
+
+    With PROMETHEUS_MULTIPROC_DIR set (gunicorn/uvicorn workers, Celery prefork
+    children), metrics are aggregated across every process writing to it.
+    """
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return registry
+    return REGISTRY
+
+def render_metrics() -> bytes:
+    """Current metrics in the Prometheus text format."""
+    return generate_latest(metrics_registry())
+
+METRICS_CONTENT_TYPE = CONTENT_TYPE_LATEST
@@ -0,0 +1,84 @@
+import base64
+from datetime import datetime
+from typing import Any, List, Optional, Sequence, Tuple
+import redis.asyncio as redis
+from fastapi import HTTPException, status
+from sqlalchemy import tuple_, text
+from sqlmodel import select, func
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.core.config import settings
+from app.core.logging import logger
+from app.core.redis import get_redis
+
+def encode_cursor(created_at: datetime, id: int) -> str:
+    """Encode a row's (created_at, id) sort key as an opaque cursor."""
+    return base64.urlsafe_b64encode(f"{created_at.isoformat()}|{id}".encode()).decode()
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Decode a cursor produced by encode_cursor."""
+    try:
+        created_at, id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(created_at), int(id)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+def keyset_page(statement, model, cursor: Optional[str], limit: int):
+    """
+    Order a select newest first on (created_at, id) and seek past the cursor.
+
+    Fetches one extra row so page_results can tell whether another page exists.
+    Unlike OFFSET, the database only ever reads limit + 1 rows from the index.
+    """
+    if cursor:
+        created_at, id = decode_cursor(cursor)
+        statement = statement.where(tuple_(model.created_at, model.id) < tuple_(created_at, id))
+    return statement.order_by(model.created_at.desc(), model.id.desc()).limit(limit + 1)
+
+def page_results(rows: Sequence[Any], limit: int) -> Tuple[List[Any], Optional[str]]:
+    """Split the rows of a keyset_page query into the page and the next cursor."""
+    items = list(rows[:limit])
+    next_cursor = None
+    if len(rows) > limit:
+        next_cursor = encode_cursor(items[-1].created_at, items[-1].id)
+    return items, next_cursor
+
+async def cached_count(session: AsyncSession, key: str, statement) -> int:
+    """Run a COUNT query, caching the result in Redis for COUNT_CACHE_TTL seconds."""
+    redis_key = f"count:{key}"
+    try:
+        cached = await get_redis().get(redis_key)
+        if cached is not None:
+            return int(cached)
+    except redis.RedisError as e:
+        logger.warning(f"Count cache unavailable: {str(e)}")
+
+    total = (await session.exec(statement)).one()
+    try:
+        await get_redis().set(redis_key, total, ex=settings.COUNT_CACHE_TTL)
+    except redis.RedisError as e:
+        logger.warning(f"Failed to cache count {key}: {str(e)}")
+    return total
+
+async def invalidate_count(key: str) -> None:
+    """Drop a cached count after rows were added or removed."""
+    try:
+        await get_redis().delete(f"count:{key}")
+    except redis.RedisError as e:
+        logger.warning(f"Failed to invalidate count {key}: {str(e)}")
+
+async def estimated_count(session: AsyncSession, model) -> int:
+    """
+    Approximate row count of a whole table from the planner statistics.
+
+    Falls back to an exact COUNT if the table hasn't been analyzed yet.
+    """
+    estimate = (await session.execute(
+        text("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:table)"),
+        {"table": f'"{model.__tablename__}"'}
+    )).scalar()
+    if estimate is not None and estimate >= 0:
+        return estimate
+    return (await session.exec(select(func.count()).select_from(model))).one()
@@ -0,0 +1,152 @@
+import cProfile
+import hmac
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Dict, Iterator, Optional
+from app.core.config import settings
+from app.core.logging import logger
+
+# Header that turns profiling on for a request; its value must match PROFILING_TOKEN
+PROFILE_HEADER = "X-Koden-Profile"
+
+PSTATS_ARTIFACT = "profile.pstats"
+COLLAPSED_ARTIFACT = "stacks.collapsed"
+ALLOCATIONS_ARTIFACT = "allocations.txt"
+ARTIFACTS = (PSTATS_ARTIFACT, COLLAPSED_ARTIFACT, ALLOCATIONS_ARTIFACT)
+
+# cProfile and tracemalloc are process-wide, so only one profile runs at a time
+_profile_lock = threading.Lock()
+_current_profile: ContextVar[Optional["Profile"]] = ContextVar("current_profile", default=None)
+
+def profiling_authorized(token: Optional[str]) -> bool:
+    """Whether a profile header value matches PROFILING_TOKEN (an empty token disables profiling)."""
+    if not settings.PROFILING_TOKEN or not token:
+        return False
+    return hmac.compare_digest(token.encode(), settings.PROFILING_TOKEN.encode())
+
+def current_profile() -> Optional["Profile"]:
+    """The profile the current request or task is running under, if any."""
+    return _current_profile.get()
+
+def profile_directory(profile_id: str) -> Path:
+    return Path(settings.PROFILE_ARTIFACT_DIR) / profile_id
+
+class StackSampler(threading.Thread):
+    """Samples one thread's Python stack at a fixed interval into collapsed-stack counts."""
+    def __init__(self, thread_id: int, interval: float):
+        super().__init__(name="koden-stack-sampler", daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self._stopped = threading.Event()
+
+    def run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self.join()
+
+class Profile:
+    """
+    cProfile, a stack sampler and tracemalloc running over one analysis or request.
+
+    All three attach to the thread that starts the profile (tracemalloc to the
+    whole process), not to the request. In the API that thread is the event
+    loop, so while a profile is active it captures all work on the loop,
+    including any other requests served concurrently.
+
+    Artifacts are written to PROFILE_ARTIFACT_DIR/<id>/:
+    - profile.pstats: load with pstats or snakeviz
+    - stacks.collapsed: feed to flamegraph.pl or speedscope
+    - allocations.txt: top allocation sites still live at the end
+    """
+    def __init__(self, label: str):
+        self.id = f"{time.strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        self.label = label
+        self.directory = profile_directory(self.id)
+        self._profiler = cProfile.Profile()
+        self._sampler = StackSampler(threading.get_ident(), settings.PROFILE_SAMPLE_INTERVAL)
+        self._owns_tracemalloc = False
+        self._started = 0.0
+        self.duration = 0.0
+
+    def start(self) -> None:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(settings.PROFILE_TRACEMALLOC_FRAMES)
+            self._owns_tracemalloc = True
+        self._started = time.perf_counter()
+        self._sampler.start()
+        self._profiler.enable()
+
+    def stop(self) -> None:
+        self._profiler.disable()
+        self._sampler.stop()
+        self.duration = time.perf_counter() - self._started
+        snapshot = tracemalloc.take_snapshot()
+        if self._owns_tracemalloc:
+            tracemalloc.stop()
+        self._write(snapshot)
+
+    def _write(self, snapshot: tracemalloc.Snapshot) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._profiler.dump_stats(self.directory / PSTATS_ARTIFACT)
+
+        with open(self.directory / COLLAPSED_ARTIFACT, "w") as f:
+            for stack, count in self._sampler.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+        top = snapshot.statistics("lineno")[:settings.PROFILE_TOP_ALLOCATIONS]
+        with open(self.directory / ALLOCATIONS_ARTIFACT, "w") as f:
+            f.write(f"# {self.label}: top {len(top)} allocation sites, {self.duration:.2f}s profiled\n")
+            for stat in top:
+                f.write(f"{stat}\n")
+
+    def links(self) -> Dict[str, str]:
+        """API paths the artifacts can be downloaded from."""
+        return {name: f"/api/profiles/{self.id}/{name}" for name in ARTIFACTS}
+
+    def metadata(self) -> Dict:
+        """What to record in analysis metadata so the artifacts can be found later."""
+        return {"id": self.id, "label": self.label, "artifacts": self.links()}
+
+@contextmanager
+def profiled(label: str) -> Iterator[Optional[Profile]]:
+    """
+    Profile the enclosed block.
+
+    Yields None (and runs the block unprofiled) if another profile is already
+    running in this process.
+    """
+    if not _profile_lock.acquire(blocking=False):
+        logger.warning("Skipping profile of %s: another profile is running", label)
+        yield None
+        return
+
+    profile = Profile(label)
+    token = _current_profile.set(profile)
+    try:
+        profile.start()
+        try:
+            yield profile
+        finally:
+            profile.stop()
+            logger.info("Profiled %s in %.2fs, artifacts in %s", label, profile.duration, profile.directory)
+    finally:
+        _current_profile.reset(token)
+        _profile_lock.release()
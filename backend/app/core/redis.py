@@ -0,0 +1,24 @@
+import asyncio
+import weakref
+import redis.asyncio as redis
+from app.core.config import settings
+from app.core.timing import timed
+
+# redis.asyncio clients are bound to the event loop they were created on, and
+# Celery tasks run their async work on a fresh loop each time
+_clients = weakref.WeakKeyDictionary()
+
+class TimedRedis(redis.Redis):
+    """Redis client that attributes command time to the current request."""
+    async def execute_command(self, *args, **options):
+        with timed("redis"):
+            return await super().execute_command(*args, **options)
+
+def get_redis() -> redis.Redis:
+    """Get the shared Redis client for the running event loop."""
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None:
+        client = TimedRedis.from_url(settings.REDIS_URL)
+        _clients[loop] = client
+    return client
@@ -0,0 +1,34 @@
+from typing import Any
+import brotli
+import msgpack
+import orjson
+from fastapi import Request, Response
+from app.core.config import settings
+
+MSGPACK_MEDIA_TYPES = ("application/msgpack", "application/x-msgpack", "application/vnd.msgpack")
+
+def wants_msgpack(request: Request) -> bool:
+    """Whether the client asked for MessagePack in its Accept header."""
+    accept = request.headers.get("accept", "")
+    return any(media_type in accept for media_type in MSGPACK_MEDIA_TYPES)
+
+def negotiated_response(request: Request, content: Any) -> Response:
+    """
+    Encode content as MessagePack or JSON depending on the Accept header.
+
+    Bodies are brotli-compressed when the client accepts it; everything else
+    is left to the GZip middleware.
+    """
+    if wants_msgpack(request):
+        body = msgpack.packb(content, use_bin_type=True)
+        media_type = "application/msgpack"
+    else:
+        body = orjson.dumps(content)
+        media_type = "application/json"
+
+    headers = {"Vary": "Accept, Accept-Encoding"}
+    accept_encoding = request.headers.get("accept-encoding", "")
+    if "br" in accept_encoding and len(body) >= settings.RESPONSE_COMPRESSION_MIN_SIZE:
+        body = brotli.compress(body, quality=settings.RESPONSE_BROTLI_QUALITY)
+        headers["Content-Encoding"] = "br"
+    return Response(content=body, media_type=media_type, headers=headers)
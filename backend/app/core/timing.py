@@ -0,0 +1,51 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from typing import TYPE_CHECKING, Dict, Optional, Tuple
+
+if TYPE_CHECKING:
+    from sqlalchemy.engine import Engine
+
+# Stages timed separately from the handler, in Server-Timing order
+STAGES = ("auth", "db", "redis")
+
+# stage -> [total seconds, count] for the request being handled
+_request_timings: ContextVar[Optional[Dict[str, list]]] = ContextVar("request_timings", default=None)
+
+def start_request() -> Tuple[Dict[str, list], Token]:
+    """Start collecting timings for a request; pass the token to finish_request."""
+    timings: Dict[str, list] = {}
+    return timings, _request_timings.set(timings)
+
+def finish_request(token: Token) -> None:
+    _request_timings.reset(token)
+
+def record_timing(stage: str, seconds: float) -> None:
+    """Add time spent in a stage to the current request, if there is one."""
+    timings = _request_timings.get()
+    if timings is not None:
+        entry = timings.setdefault(stage, [0.0, 0])
+        entry[0] += seconds
+        entry[1] += 1
+
+@contextmanager
+def timed(stage: str):
+    """Time a block as part of the current request's stage breakdown."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_timing(stage, time.perf_counter() - started)
+
+def instrument_engine(engine: "Engine") -> None:
+    """Attribute query time on an engine to the db stage (pass async_engine.sync_engine)."""
+    # Imported here so workers, which reach this module through app.core.redis, don't load SQLAlchemy
+    from sqlalchemy import event
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        record_timing("db", time.perf_counter() - conn.info["query_started"].pop())
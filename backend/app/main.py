@@ -1,8 +1,15 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from app.core.config import settings
 from app.api.router import router
 from app.api.github import router as github_router
 from app.core.logging import logger
+from app.core.metrics import METRICS_CONTENT_TYPE, render_metrics
+from app.core.database import dispose_engines
+from app.middleware.profiling import ProfilingMiddleware
+from app.middleware.timing import TimingMiddleware
+from app.services.github_service import github_service
 
 app = FastAPI(title="Koden Backend", version="0.1.0")
 
@@ -15,12 +22,30 @@ app.add_middleware(
     allow_headers=["*"],  # Allows all headers
 )
 
+# Large analysis payloads compress well; brotli-encoded responses pass through untouched
+app.add_middleware(GZipMiddleware, minimum_size=settings.RESPONSE_COMPRESSION_MIN_SIZE)
+
+# Opt-in per request with an X-Koden-Profile header
+app.add_middleware(ProfilingMiddleware)
+
+# Outermost, so the timings cover everything below it
+app.add_middleware(TimingMiddleware)
+
 @app.on_event("startup")
 async def startup_event():
+    # The DB engine, GitHub session and Firebase app are all created on first
+    # use, so a fresh pod starts accepting requests as soon as imports finish
     logger.info("Starting up Koden Backend")
 
 @app.on_event("shutdown")
 async def shutdown_event():
     logger.info("Shutting down Koden Backend")
+    await github_service.close()
+    await dispose_engines()
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus metrics for this API process."""
+    return Response(content=render_metrics(), media_type=METRICS_CONTENT_TYPE)
 
 app.include_router(router, prefix="/api")
\ No newline at end of file
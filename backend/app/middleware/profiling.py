@@ -0,0 +1,33 @@
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core.profiling import PROFILE_HEADER, profiled, profiling_authorized
+
+class ProfilingMiddleware:
+    """
+    Profile a request when it carries a valid X-Koden-Profile header.
+
+    The profile id is returned in the X-Koden-Profile-Id response header, and
+    handlers can pick the running profile up with current_profile(). The
+    profile covers everything the event loop runs while it is active, not just
+    this request, so profile on a quiet instance when attribution matters.
+    """
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            # Downloading artifacts carries the same header; don't profile that
+            or scope["path"].startswith("/api/profiles/")
+            or not profiling_authorized(Headers(scope=scope).get(PROFILE_HEADER))
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        with profiled(f"{scope['method']} {scope['path']}") as profile:
+            async def send_with_profile_id(message: Message) -> None:
+                if message["type"] == "http.response.start" and profile is not None:
+                    MutableHeaders(scope=message).append("X-Koden-Profile-Id", profile.id)
+                await send(message)
+
+            await self.app(scope, receive, send_with_profile_id)
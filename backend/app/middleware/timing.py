@@ -0,0 +1,81 @@
+import time
+from typing import Dict
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core.config import settings
+from app.core.logging import logger
+from app.core.metrics import HTTP_REQUEST_SECONDS
+from app.core.timing import STAGES, finish_request, start_request
+
+class TimingMiddleware:
+    """
+    Break each request's wall time down into auth, DB, Redis and handler time.
+
+    The breakdown is sent back as a Server-Timing header and requests slower
+    than SLOW_REQUEST_THRESHOLD_MS are logged with it. Written as plain ASGI
+    middleware so the header can be added without buffering the response.
+    """
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings, token = start_request()
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if settings.SERVER_TIMING_HEADER:
+                    headers = MutableHeaders(scope=message)
+                    headers.append("Server-Timing", self._server_timing(timings, time.perf_counter() - started))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            finish_request(token)
+            elapsed = time.perf_counter() - started
+            HTTP_REQUEST_SECONDS.labels(scope["method"], self._route(scope), status_code).observe(elapsed)
+            if elapsed * 1000 >= settings.SLOW_REQUEST_THRESHOLD_MS:
+                self._log_slow_request(scope, status_code, timings, elapsed)
+
+    @staticmethod
+    def _route(scope: Scope) -> str:
+        """Route template (e.g. /api/tasks/{task_id}/status) so path parameters don't explode label counts."""
+        route = scope.get("route")
+        return getattr(route, "path", "unmatched")
+
+    @staticmethod
+    def _breakdown(timings: Dict[str, list], elapsed: float) -> Dict[str, float]:
+        """Stage durations in milliseconds; handler is whatever the stages don't account for."""
+        breakdown = {stage: timings[stage][0] * 1000 for stage in STAGES if stage in timings}
+        breakdown["handler"] = max(0.0, elapsed * 1000 - sum(breakdown.values()))
+        breakdown["total"] = elapsed * 1000
+        return breakdown
+
+    def _server_timing(self, timings: Dict[str, list], elapsed: float) -> str:
+        metrics = []
+        for stage, duration in self._breakdown(timings, elapsed).items():
+            metric = f"{stage};dur={duration:.1f}"
+            if stage in timings:
+                metric += f';desc="{timings[stage][1]} calls"'
+            metrics.append(metric)
+        return ", ".join(metrics)
+
+    def _log_slow_request(self, scope: Scope, status_code: int, timings: Dict[str, list], elapsed: float) -> None:
+        record = {
+            "event": "slow_request",
+            "method": scope["method"],
+            "route": self._route(scope),
+            "path": scope["path"],
+            "status": status_code,
+            "duration_ms": {stage: round(duration, 1) for stage, duration in self._breakdown(timings, elapsed).items()},
+            "calls": {stage: timings[stage][1] for stage in STAGES if stage in timings}
+        }
+        logger.warning("Slow request %s %s", record["method"], record["route"], extra={"slow_request": record})
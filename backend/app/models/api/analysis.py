@@ -1,4 +1,5 @@
-from typing import List, Optional, Set
+from typing import Dict, List, Optional, Set
+from datetime import datetime
 from pydantic import BaseModel, Field
 from fastapi import UploadFile
 from ..domain.analysis import RepositoryAnalysis
@@ -13,6 +14,10 @@ class AnalysisRequest(BaseModel):
 class AnalysisResponse(BaseModel):
     """Response model for repository analysis."""
     analysis: RepositoryAnalysis
+    analysis_id: Optional[int] = Field(
+        default=None,
+        description="ID of the stored analysis"
+    )
     message: str = Field(
         default="Analysis completed successfully",
         description="Status message for the analysis"
@@ -54,4 +59,55 @@ class AnalysisResponse(BaseModel):
                 },
                 "message": "Analysis completed successfully"
             }
-        } 
\ No newline at end of file
+        } 
+
+class AnalysisSummary(BaseModel):
+    """Summary of a stored analysis, without the dependency graph."""
+    id: int
+    repo_id: Optional[int] = None
+    total_files: int
+    total_dependencies: int
+    circular_dependencies_count: int
+    orphaned_files_count: int
+    average_coupling: float
+    payload_size: int = Field(description="Uncompressed size of the full analysis in bytes")
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+class AnalysisSummaryListResponse(BaseModel):
+    """Model for list of stored analyses with cursor pagination."""
+    analyses: List[AnalysisSummary]
+    limit: int
+    next_cursor: Optional[str] = None
+
+class GraphNeighborsResponse(BaseModel):
+    """Direct dependencies and dependents of a file."""
+    file: str
+    dependencies: List[str]
+    dependents: List[str]
+
+class GraphTraversalResponse(BaseModel):
+    """Files reachable from a file, with their distance."""
+    file: str
+    direction: str = Field(description="'dependencies' or 'dependents'")
+    depth: int
+    files: Dict[str, int]
+
+class GraphPathResponse(BaseModel):
+    """Shortest import chain between two files."""
+    source: str
+    target: str
+    path: Optional[List[str]] = Field(None, description="None if target isn't reachable from source")
+
+class GraphSubgraphResponse(BaseModel):
+    """Dependencies among the files under a directory."""
+    directory: str
+    dependencies: Dict[str, List[str]]
+
+class GraphCyclesResponse(BaseModel):
+    """Cycles a file takes part in."""
+    file: str
+    component: List[str] = Field(description="Files mutually reachable with this one")
+    cycles: List[List[str]]
@@ -1,6 +1,7 @@
 from typing import Optional, List
 from pydantic import BaseModel, HttpUrl
 from datetime import datetime
+from db.models.tasks import RepoDownloadTask
 
 class RepoBase(BaseModel):
     """Base repo model with common attributes."""
@@ -28,9 +29,13 @@ class RepoResponse(RepoBase):
     class Config:
         from_attributes = True  # Allows ORM model to be converted to Pydantic model
 
+class RepoDetailResponse(RepoResponse):
+    """Model for a single repo, with its download tasks when requested."""
+    download_tasks: Optional[List[RepoDownloadTask]] = None
+
 class RepoListResponse(BaseModel):
-    """Model for list of repos with pagination."""
+    """Model for list of repos with cursor pagination."""
     repos: List[RepoResponse]
     total: int
-    skip: int
-    limit: int 
\ No newline at end of file
+    limit: int
+    next_cursor: Optional[str] = None 
\ No newline at end of file
@@ -0,0 +1,10 @@
+from typing import List, Optional
+from pydantic import BaseModel
+from db.models.tasks import RepoDownloadTask
+
+class RepoDownloadTaskListResponse(BaseModel):
+    """Model for list of download tasks with cursor pagination."""
+    tasks: List[RepoDownloadTask]
+    total: int
+    limit: int
+    next_cursor: Optional[str] = None
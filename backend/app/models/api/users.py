@@ -26,6 +26,6 @@ class UserResponse(UserBase):
 class UserListResponse(BaseModel):
     """Model for list of users response."""
     users: list[UserResponse]
-    total: int
-    skip: int
+    total: int = Field(description="Approximate number of users")
     limit: int
+    next_cursor: Optional[str] = None
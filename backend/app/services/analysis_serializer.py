@@ -0,0 +1,123 @@
+from typing import Any, Dict, Optional
+from fastapi.responses import ORJSONResponse
+from app.core.metrics import stage_timer
+from app.models.domain.analysis import CouplingMetrics, RepositoryAnalysis
+
+def _dump_coupling_scores(
+    scores: Dict[str, CouplingMetrics],
+    shared: Dict[str, Dict[str, Any]]
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Dump per-file coupling metrics, reusing a dict already produced for the same file.
+
+    high_coupling_hotspots holds the same CouplingMetrics objects as
+    coupling_scores, so each one is only converted once. This saves
+    serialization work only: both sections still carry the full metrics in
+    the JSON, so the payload size is unchanged.
+    """
+    dumped = {}
+    for file, metrics in scores.items():
+        cached = shared.get(file)
+        if cached is None or cached["_source"] is not metrics and cached["_source"] != metrics:
+            cached = {"_source": metrics, "value": metrics.model_dump()}
+            shared[file] = cached
+        dumped[file] = cached["value"]
+    return dumped
+
+def analysis_to_primitive(analysis: RepositoryAnalysis) -> Dict[str, Any]:
+    """
+    Convert an analysis to JSON-ready primitives without re-validating it.
+
+    The big plain containers (files, dependencies) are passed through as-is
+    instead of being copied by model_dump, and shared metric objects are
+    dumped once (they are still written out in full wherever they appear).
+    """
+    insights = analysis.insights
+    shared: Dict[str, Dict[str, Any]] = {}
+    coupling_scores = _dump_coupling_scores(insights.coupling_scores, shared)
+    dumped_insights = insights.model_dump(exclude={"coupling_scores", "high_coupling_hotspots"})
+    dumped_insights["coupling_scores"] = coupling_scores
+    dumped_insights["high_coupling_hotspots"] = _dump_coupling_scores(insights.high_coupling_hotspots, shared)
+    return {
+        "files": analysis.files,
+        "dependencies": analysis.dependencies,
+        "insights": dumped_insights,
+        "metadata": analysis.metadata
+    }
+
+def analysis_json_response(
+    analysis: RepositoryAnalysis,
+    analysis_id: Optional[int] = None,
+    message: Optional[str] = None
+) -> ORJSONResponse:
+    """
+    Serialize an analysis straight to JSON with orjson.
+
+    Returning a Response skips FastAPI's response_model validation, which for
+    large repos means re-validating tens of thousands of nested models. Pass
+    analysis_id/message to get the AnalysisResponse envelope, otherwise the
+    bare RepositoryAnalysis is returned.
+    """
+    with stage_timer("serialize"):
+        content = analysis_to_primitive(analysis)
+        if message is not None:
+            content = {
+                "analysis": content,
+                "analysis_id": analysis_id,
+                "message": message
+            }
+        return ORJSONResponse(content=content)
+
+COMPACT_FORMAT = "koden.compact.v1"
+COUPLING_COLUMNS = ("outbound", "inbound", "total", "depth", "fan_in", "fan_out")
+
+def analysis_to_compact(analysis: RepositoryAnalysis) -> Dict[str, Any]:
+    """
+    Encode an analysis as a path table plus integer, columnar arrays.
+
+    Every path is written once in `paths`; files, edges and metrics refer to
+    it by index. Edges are two parallel arrays (source[i] -> target[i]) and
+    coupling metrics are one array per field, which both shrinks the payload
+    and compresses far better than repeated objects.
+    """
+    paths = list(analysis.files)
+    ids = {path: i for i, path in enumerate(paths)}
+
+    def intern(path: str) -> int:
+        if path not in ids:
+            ids[path] = len(paths)
+            paths.append(path)
+        return ids[path]
+
+    sources, targets = [], []
+    for source, deps in analysis.dependencies.items():
+        source_id = intern(source)
+        for target in deps:
+            sources.append(source_id)
+            targets.append(intern(target))
+
+    insights = analysis.insights
+    coupling_files = [intern(file) for file in insights.coupling_scores]
+    coupling = {"file": coupling_files}
+    for column in COUPLING_COLUMNS:
+        coupling[column] = [getattr(metrics, column) for metrics in insights.coupling_scores.values()]
+
+    return {
+        "format": COMPACT_FORMAT,
+        "paths": paths,
+        "file_count": len(analysis.files),
+        "edges": {"source": sources, "target": targets},
+        "coupling": coupling,
+        "high_coupling_hotspots": [intern(file) for file in insights.high_coupling_hotspots],
+        "orphaned_files": [intern(file) for file in insights.orphaned_files],
+        "circular_dependencies": [
+            {
+                "files": [intern(file) for file in cycle.files],
+                "severity": cycle.severity,
+                "suggested_fixes": cycle.suggested_fixes
+            }
+            for cycle in insights.circular_dependencies
+        ],
+        "quality_metrics": insights.quality_metrics.model_dump(),
+        "metadata": analysis.metadata
+    }
@@ -0,0 +1,147 @@
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+import msgpack
+import zstandard
+from fastapi import HTTPException, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import defer
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.core.config import settings
+from app.core.logging import logger
+from app.core.metrics import record_cache, timed_stage
+from app.core.pagination import keyset_page, page_results
+from app.models.domain.analysis import RepositoryAnalysis
+from app.services.graph_index import DependencyGraphIndex
+from db.models.analysis import AnalysisResult
+
+PAYLOAD_FORMAT = "msgpack+zstd"
+
+@timed_stage("encode_payload")
+def encode_analysis(analysis: RepositoryAnalysis) -> Tuple[bytes, int]:
+    """Pack an analysis as zstd-compressed MessagePack; returns the blob and its uncompressed size."""
+    packed = msgpack.packb(analysis.model_dump(mode="json"), use_bin_type=True)
+    compressed = zstandard.ZstdCompressor(level=settings.ANALYSIS_ZSTD_LEVEL).compress(packed)
+    return compressed, len(packed)
+
+def decode_analysis(payload: bytes, payload_format: str) -> RepositoryAnalysis:
+    """Inverse of encode_analysis."""
+    if payload_format != PAYLOAD_FORMAT:
+        raise ValueError(f"Unsupported analysis payload format: {payload_format}")
+    packed = zstandard.ZstdDecompressor().decompress(payload)
+    return RepositoryAnalysis.model_validate(msgpack.unpackb(packed, raw=False))
+
+@timed_stage("encode_graph_index")
+def encode_graph_index(analysis: RepositoryAnalysis) -> bytes:
+    """Build the graph query index for an analysis and pack it like the payload."""
+    packed = msgpack.packb(DependencyGraphIndex.build(analysis).to_dict(), use_bin_type=True)
+    return zstandard.ZstdCompressor(level=settings.ANALYSIS_ZSTD_LEVEL).compress(packed)
+
+def decode_graph_index(graph_payload: bytes) -> DependencyGraphIndex:
+    """Inverse of encode_graph_index."""
+    packed = zstandard.ZstdDecompressor().decompress(graph_payload)
+    return DependencyGraphIndex.from_dict(msgpack.unpackb(packed, raw=False))
+
+# analysis_id -> decoded index, most recently used last. Stored analyses are
+# immutable, so entries never go stale.
+_graph_indexes: "OrderedDict[int, DependencyGraphIndex]" = OrderedDict()
+
+class AnalysisStore:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def save(self, analysis: RepositoryAnalysis, user_id: int, repo_id: Optional[int] = None) -> AnalysisResult:
+        """Persist an analysis with its summary metrics broken out into columns."""
+        # Packing a large graph is CPU-bound, keep it off the event loop
+        payload, payload_size = await run_in_threadpool(encode_analysis, analysis)
+        graph_payload = await run_in_threadpool(encode_graph_index, analysis)
+        metrics = analysis.insights.quality_metrics
+        result = AnalysisResult(
+            user_id=user_id,
+            repo_id=repo_id,
+            total_files=metrics.total_files,
+            total_dependencies=metrics.total_dependencies,
+            circular_dependencies_count=metrics.circular_dependencies_count,
+            orphaned_files_count=metrics.orphaned_files_count,
+            average_coupling=metrics.average_coupling,
+            payload=payload,
+            payload_format=PAYLOAD_FORMAT,
+            payload_size=payload_size,
+            graph_payload=graph_payload
+        )
+        self.db.add(result)
+        await self.db.commit()
+        await self.db.refresh(result, attribute_names=["id", "created_at"])
+        logger.info(f"Stored analysis {result.id} ({payload_size} bytes packed to {len(payload)})")
+        return result
+
+    async def list_results(
+        self,
+        user_id: int,
+        repo_id: Optional[int] = None,
+        cursor: Optional[str] = None,
+        limit: int = 100
+    ) -> Tuple[List[AnalysisResult], Optional[str]]:
+        """List a user's analysis summaries, newest first, without loading the payloads."""
+        statement = (
+            select(AnalysisResult)
+            .where(AnalysisResult.user_id == user_id)
+            .options(defer(AnalysisResult.payload), defer(AnalysisResult.graph_payload))
+        )
+        if repo_id is not None:
+            statement = statement.where(AnalysisResult.repo_id == repo_id)
+        result = await self.db.exec(keyset_page(statement, AnalysisResult, cursor, limit))
+        return page_results(result.all(), limit)
+
+    async def get_result(self, analysis_id: int, user_id: int, with_payload: bool = False) -> AnalysisResult:
+        """
+        Get a stored analysis belonging to the user.
+
+        Raises:
+            HTTPException: 404 if it doesn't exist, 403 if it belongs to someone else
+        """
+        statement = select(AnalysisResult).where(AnalysisResult.id == analysis_id)
+        if not with_payload:
+            statement = statement.options(defer(AnalysisResult.payload), defer(AnalysisResult.graph_payload))
+        result = (await self.db.exec(statement)).first()
+        if not result:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Analysis not found"
+            )
+        if result.user_id != user_id:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Not authorized to access this analysis"
+            )
+        return result
+
+    async def load_analysis(self, analysis_id: int, user_id: int) -> RepositoryAnalysis:
+        """Load and decode the full analysis."""
+        result = await self.get_result(analysis_id, user_id, with_payload=True)
+        return await run_in_threadpool(decode_analysis, result.payload, result.payload_format)
+
+    async def load_graph_index(self, analysis_id: int, user_id: int) -> DependencyGraphIndex:
+        """Load the graph query index for an analysis, decoding it at most once per process."""
+        # Authorize against the row even when the index is already cached
+        result = await self.get_result(analysis_id, user_id)
+        index = _graph_indexes.get(analysis_id)
+        record_cache("graph_index", index is not None)
+        if index is not None:
+            _graph_indexes.move_to_end(analysis_id)
+            return index
+
+        graph_payload = (await self.db.exec(
+            select(AnalysisResult.graph_payload).where(AnalysisResult.id == analysis_id)
+        )).one()
+        if graph_payload is not None:
+            index = await run_in_threadpool(decode_graph_index, graph_payload)
+        else:
+            # Stored before graph indexes existed
+            analysis = await self.load_analysis(result.id, user_id)
+            index = await run_in_threadpool(DependencyGraphIndex.build, analysis)
+
+        _graph_indexes[analysis_id] = index
+        if len(_graph_indexes) > settings.GRAPH_INDEX_CACHE_SIZE:
+            _graph_indexes.popitem(last=False)
+        return index
@@ -1,9 +1,11 @@
+import logging
 import zipfile
 import os
 import shutil
 from pathlib import Path
 from fastapi import UploadFile, HTTPException
-from app.core.logging import logger
+from app.core.logging import get_logger
+from app.core.metrics import ANALYSIS_BYTES, ANALYSIS_FILES, stage_timer
 from typing import List, Set, Dict
 from app.models.domain.analysis import (
     RepositoryAnalysis,
@@ -12,8 +14,11 @@ from app.models.domain.analysis import (
     CouplingMetrics,
     CircularDependency
 )
+from .archive_guard import ArchiveLimitError, extract_archive
 from .dependency_parser import analyze_dependencies
 
+logger = get_logger("analyzer")
+
 # Default ignore patterns
 DEFAULT_IGNORE_PATTERNS = {
     '.venv',
@@ -83,50 +88,56 @@ async def analyze_repository(zip_file: UploadFile, ignore_patterns: Set[str] = N
 
     tmp_dir = Path("/tmp/koden-upload")
     try:
-        logger.info(f"Processing zip file: {zip_file.filename}")
+        logger.info("Processing zip file: %s", zip_file.filename)
         
         # Clean up any existing temporary directory
         shutil.rmtree(tmp_dir, ignore_errors=True)
         tmp_dir.mkdir(parents=True, exist_ok=True)
-        logger.debug(f"Created temporary directory: {tmp_dir}")
+        logger.debug("Created temporary directory: %s", tmp_dir)
 
         # Save the uploaded file
         zip_path = tmp_dir / zip_file.filename
-        content = await zip_file.read()
+        with stage_timer("upload"):
+            content = await zip_file.read()
+        ANALYSIS_BYTES.labels("archive").inc(len(content))
         if not content:
             logger.error("Empty file provided")
             raise HTTPException(status_code=400, detail="Empty file provided")
             
         with open(zip_path, "wb") as f:
             f.write(content)
-        logger.debug(f"Saved zip file to: {zip_path}")
+        logger.debug("Saved zip file to: %s", zip_path)
 
         # Verify it's a valid zip file
         if not zipfile.is_zipfile(zip_path):
-            logger.error(f"Invalid zip file: {zip_file.filename}")
+            logger.error("Invalid zip file: %s", zip_file.filename)
             raise HTTPException(status_code=400, detail="Invalid zip file")
 
-        # Extract the contents
+        # Extract the contents, within the archive limits
         extract_path = tmp_dir / "unzipped"
-        with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-            zip_ref.extractall(extract_path)
-        logger.debug(f"Extracted zip file to: {extract_path}")
+        with stage_timer("extract"), zipfile.ZipFile(zip_path, 'r') as zip_ref:
+            skipped_files = extract_archive(zip_ref, extract_path)
+        logger.debug("Extracted zip file to: %s", extract_path)
 
         # Get file structure
         file_structure = []
         python_files = []
-        for root, _, files in os.walk(extract_path):
-            for name in files:
-                rel_path = os.path.relpath(os.path.join(root, name), extract_path)
-                if not should_ignore(rel_path, ignore_patterns):
-                    file_structure.append(rel_path)
-                    if rel_path.endswith('.py'):
-                        python_files.append(rel_path)
+        with stage_timer("walk"):
+            for root, _, files in os.walk(extract_path):
+                for name in files:
+                    rel_path = os.path.relpath(os.path.join(root, name), extract_path)
+                    if not should_ignore(rel_path, ignore_patterns):
+                        file_structure.append(rel_path)
+                        if rel_path.endswith('.py'):
+                            python_files.append(rel_path)
+        ANALYSIS_FILES.labels("all").inc(len(file_structure))
+        ANALYSIS_FILES.labels("python").inc(len(python_files))
 
         # Analyze dependencies
         logger.info("Analyzing Python dependencies...")
         analysis = analyze_dependencies(extract_path, python_files)
-        logger.info(f"Found {len(analysis['dependency_graph'])} Python files with dependencies")
+        logger.info("Found %d Python files with dependencies", len(analysis['dependency_graph']))
+        skipped_files.update(analysis['skipped_files'])
         
         # Convert raw analysis into Pydantic models
         coupling_scores = {
@@ -144,7 +155,8 @@ async def analyze_repository(zip_file: UploadFile, ignore_patterns: Set[str] = N
         ]
         
         quality_metrics = calculate_quality_metrics(
-            total_files=len(python_files),
+            # Files skipped over the parse time budget aren't scored
+            total_files=len(coupling_scores),
             dependency_graph=analysis['dependency_graph'],
             circular_deps=analysis['insights']['circular_dependencies'],
             orphaned_files=analysis['insights']['orphaned_files'],
@@ -161,24 +173,39 @@ async def analyze_repository(zip_file: UploadFile, ignore_patterns: Set[str] = N
         
         # Log insights
         if circular_deps:
-            logger.warning(f"Found {len(circular_deps)} circular dependencies")
+            logger.warning("Found %d circular dependencies", len(circular_deps))
         if insights.orphaned_files:
-            logger.info(f"Found {len(insights.orphaned_files)} orphaned files")
-        logger.info("Top coupling hotspots:")
-        for file, scores in insights.high_coupling_hotspots.items():
-            logger.info(f"  {file}: {scores.total} total edges ({scores.inbound} inbound, {scores.outbound} outbound)")
+            logger.info("Found %d orphaned files", len(insights.orphaned_files))
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "Top coupling hotspots: %s",
+                {file: scores.total for file, scores in insights.high_coupling_hotspots.items()}
+            )
+
+        metadata = {}
+        if skipped_files:
+            # Left out by the resource guards, so the results are partial
+            metadata["skipped_files"] = [
+                {"path": path, "reason": reason} for path, reason in sorted(skipped_files.items())
+            ]
 
         return RepositoryAnalysis(
             files=file_structure,
             dependencies=analysis['dependency_graph'],
-            insights=insights
+            insights=insights,
+            metadata=metadata
         )
 
+    except HTTPException:
+        raise
+    except ArchiveLimitError as e:
+        logger.warning("Rejected archive %s: %s", zip_file.filename, e)
+        raise HTTPException(status_code=413, detail=str(e))
     except zipfile.BadZipFile:
-        logger.error(f"Invalid zip file format: {zip_file.filename}")
+        logger.error("Invalid zip file format: %s", zip_file.filename)
         raise HTTPException(status_code=400, detail="Invalid zip file format")
     except Exception as e:
-        logger.error(f"Error processing zip file: {str(e)}", exc_info=True)
+        logger.error("Error processing zip file: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail=f"Error processing zip file: {str(e)}")
     finally:
         # Cleanup
@@ -0,0 +1,61 @@
+import zipfile
+from pathlib import Path, PurePosixPath
+from typing import Dict, List, Tuple
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.core.metrics import ANALYSIS_SKIPPED_FILES
+
+logger = get_logger("analyzer.archive")
+
+class ArchiveLimitError(ValueError):
+    """The archive as a whole is over a limit, so none of it is extracted."""
+
+def plan_extraction(zip_ref: zipfile.ZipFile) -> Tuple[List[zipfile.ZipInfo], Dict[str, str]]:
+    """
+    Check an archive's central directory and choose which members to extract.
+
+    Too many entries, or too many uncompressed bytes in total, rejects the
+    whole archive. Single files that are nested too deep or too large are
+    skipped, and returned with the reason.
+    """
+    members = zip_ref.infolist()
+    if len(members) > settings.ARCHIVE_MAX_MEMBERS:
+        raise ArchiveLimitError(
+            f"Archive has {len(members)} entries, the limit is {settings.ARCHIVE_MAX_MEMBERS}"
+        )
+    total_bytes = sum(member.file_size for member in members)
+    if total_bytes > settings.ARCHIVE_MAX_UNCOMPRESSED_BYTES:
+        raise ArchiveLimitError(
+            f"Archive expands to {total_bytes} bytes, the limit is {settings.ARCHIVE_MAX_UNCOMPRESSED_BYTES}"
+        )
+
+    selected = []
+    skipped = {}
+    for member in members:
+        if member.is_dir():
+            continue
+        if len(PurePosixPath(member.filename).parts) > settings.ARCHIVE_MAX_PATH_DEPTH:
+            skipped[member.filename] = "path_depth"
+        elif member.file_size > settings.ARCHIVE_MAX_FILE_BYTES:
+            skipped[member.filename] = "file_size"
+        else:
+            selected.append(member)
+    return selected, skipped
+
+def extract_archive(zip_ref: zipfile.ZipFile, destination: Path) -> Dict[str, str]:
+    """
+    Extract the members that pass plan_extraction into destination.
+
+    Returns the skipped member names and why. Sizes come from the central
+    directory, and zipfile stops reading a member at its declared size (a
+    member that lies fails its CRC check), so the bytes written are bounded.
+    """
+    members, skipped = plan_extraction(zip_ref)
+    for member in members:
+        zip_ref.extract(member, destination)
+
+    for reason in skipped.values():
+        ANALYSIS_SKIPPED_FILES.labels(reason).inc()
+    if skipped:
+        logger.warning("Skipped %d archive members over the extraction limits", len(skipped))
+    return skipped
@@ -0,0 +1,322 @@
+import asyncio
+import functools
+import os
+import socket
+import time
+import uuid
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional, Tuple, Union
+import redis.asyncio as redis
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.core.redis import get_redis
+
+logger = get_logger("artifacts")
+
+# Atomically drop an archive from the index unless a live lease holds it. A job
+# takes its lease before looking the archive up, so either the lease is seen
+# here and the eviction is refused, or the index entry is already gone when
+# the job looks and it downloads a fresh copy. Returns the bytes freed, or -1
+# if the archive is held or another evictor already removed it.
+EVICT_IF_IDLE_SCRIPT = """
+local key = ARGV[1]
+local now = tonumber(ARGV[2])
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now)
+if redis.call('ZCARD', KEYS[1]) > 0 then
+    return -1
+end
+if redis.call('ZREM', KEYS[2], key) == 0 then
+    return -1
+end
+local size = tonumber(redis.call('HGET', KEYS[3], key)) or 0
+redis.call('HDEL', KEYS[3], key)
+redis.call('DECRBY', KEYS[4], size)
+return size
+"""
+
+async def _run_blocking(func: Callable[..., Any], *args: Any) -> Any:
+    """Run a blocking backend call on the loop's default executor."""
+    return await asyncio.get_running_loop().run_in_executor(None, functools.partial(func, *args))
+
+def artifact_key(owner: str, repo: str, sha: str) -> str:
+    """Store key for a repository archive at one commit."""
+    return f"{owner}/{repo}@{sha}"
+
+def object_name(key: str) -> str:
+    """owner/repo@sha -> owner/repo/sha.zip"""
+    return key.replace("@", "/") + ".zip"
+
+class LocalArtifactBackend:
+    """Archives as files under a directory on this host."""
+    def __init__(self, root: Path):
+        self.root = root.resolve()
+        # Each host has its own disk, so each gets its own index
+        self.namespace = f"local:{socket.gethostname()}:{self.root}"
+
+    def location(self, name: str) -> str:
+        return str(self.root / name)
+
+    def put(self, name: str, data: bytes) -> None:
+        path = self.root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Readers never see a partial file
+        tmp_path = path.with_name(f"{path.name}.{uuid.uuid4().hex}.tmp")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+
+    def get(self, name: str) -> bytes:
+        return (self.root / name).read_bytes()
+
+    def exists(self, name: str) -> bool:
+        return (self.root / name).is_file()
+
+    def delete(self, name: str) -> None:
+        try:
+            (self.root / name).unlink()
+        except FileNotFoundError:
+            pass
+
+    def list(self) -> Iterator[Tuple[str, int, float]]:
+        """(name, size, modified time) for every stored object, including partial writes."""
+        if not self.root.exists():
+            return
+        for path in self.root.rglob("*"):
+            if path.is_file():
+                stat = path.stat()
+                yield path.relative_to(self.root).as_posix(), stat.st_size, stat.st_mtime
+
+class S3ArtifactBackend:
+    """Archives as objects in an S3-compatible bucket, shared by every host."""
+    def __init__(self, bucket: str, endpoint_url: Optional[str] = None):
+        try:
+            import boto3
+            from botocore.exceptions import ClientError
+        except ImportError:
+            raise RuntimeError("ARTIFACT_STORE_BACKEND=s3 needs boto3, install it with `pdm install -G s3`")
+        self.bucket = bucket
+        self.namespace = f"s3:{endpoint_url or 'aws'}:{bucket}"
+        self._client_error = ClientError
+        self.client = boto3.client(
+            "s3",
+            endpoint_url=endpoint_url,
+            aws_access_key_id=settings.ARTIFACT_S3_ACCESS_KEY,
+            aws_secret_access_key=settings.ARTIFACT_S3_SECRET_KEY,
+            region_name=settings.ARTIFACT_S3_REGION
+        )
+
+    def location(self, name: str) -> str:
+        return f"s3://{self.bucket}/{name}"
+
+    def put(self, name: str, data: bytes) -> None:
+        self.client.put_object(Bucket=self.bucket, Key=name, Body=data)
+
+    def get(self, name: str) -> bytes:
+        return self.client.get_object(Bucket=self.bucket, Key=name)["Body"].read()
+
+    def exists(self, name: str) -> bool:
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=name)
+            return True
+        except self._client_error as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return False
+            raise
+
+    def delete(self, name: str) -> None:
+        self.client.delete_object(Bucket=self.bucket, Key=name)
+
+    def list(self) -> Iterator[Tuple[str, int, float]]:
+        paginator = self.client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=self.bucket):
+            for item in page.get("Contents", []):
+                yield item["Key"], item["Size"], item["LastModified"].timestamp()
+
+ArtifactBackend = Union[LocalArtifactBackend, S3ArtifactBackend]
+
+class ArtifactStore:
+    """
+    Content store for downloaded repository archives, keyed by owner/repo@sha.
+
+    Blobs live in the backend. A Redis index per backend namespace tracks
+    their sizes, last access times and leases:
+
+    - Once the total passes ARTIFACT_STORE_MAX_BYTES, the least recently used
+      archives are evicted.
+    - An archive held by an in-flight job is never evicted. A hold is a lease
+      that expires after ARTIFACT_STORE_LEASE_SECONDS, so a crashed worker
+      can't pin an archive forever.
+
+    Backend calls block on disk or S3, so the async methods run them in the
+    default executor to keep the event loop free.
+    """
+    def __init__(self):
+        self._backend: Optional[ArtifactBackend] = None
+
+    @property
+    def backend(self) -> ArtifactBackend:
+        # Built on first use so importing this module doesn't import boto3
+        if self._backend is None:
+            if settings.ARTIFACT_STORE_BACKEND == "s3":
+                self._backend = S3ArtifactBackend(settings.ARTIFACT_S3_BUCKET, settings.ARTIFACT_S3_ENDPOINT_URL)
+            elif settings.ARTIFACT_STORE_BACKEND == "local":
+                self._backend = LocalArtifactBackend(Path(settings.ARTIFACT_STORE_DIR))
+            else:
+                raise RuntimeError(f"Unknown ARTIFACT_STORE_BACKEND: {settings.ARTIFACT_STORE_BACKEND}")
+        return self._backend
+
+    def _index_key(self, suffix: str) -> str:
+        return f"artifacts:{self.backend.namespace}:{suffix}"
+
+    def _lease_key(self, key: str) -> str:
+        return self._index_key(f"leases:{key}")
+
+    @asynccontextmanager
+    async def hold(self, key: str) -> AsyncIterator[None]:
+        """Keep an archive from being evicted while a job uses it."""
+        holder = uuid.uuid4().hex
+        lease_key = self._lease_key(key)
+        client = get_redis()
+        try:
+            await client.zadd(lease_key, {holder: time.time() + settings.ARTIFACT_STORE_LEASE_SECONDS})
+            await client.expire(lease_key, settings.ARTIFACT_STORE_LEASE_SECONDS)
+        except redis.RedisError as e:
+            logger.warning("Could not take a lease on %s: %s", key, e)
+        try:
+            yield
+        finally:
+            try:
+                await client.zrem(lease_key, holder)
+            except redis.RedisError as e:
+                # The lease expires on its own
+                logger.warning("Could not release the lease on %s: %s", key, e)
+
+    async def get_location(self, key: str) -> Optional[str]:
+        """Where a stored archive is, marking it recently used, or None if it isn't stored."""
+        client = get_redis()
+        try:
+            if await client.zscore(self._index_key("lru"), key) is None:
+                return None
+            if not await _run_blocking(self.backend.exists, object_name(key)):
+                # Deleted behind the index's back; the sweeper drops the entry
+                return None
+            await client.zadd(self._index_key("lru"), {key: time.time()})
+        except redis.RedisError as e:
+            logger.warning("Artifact index unavailable, not reusing %s: %s", key, e)
+            return None
+        return self.backend.location(object_name(key))
+
+    async def read(self, key: str) -> bytes:
+        return await _run_blocking(self.backend.get, object_name(key))
+
+    async def put(self, key: str, data: bytes) -> str:
+        """Store an archive, evict past the size cap, and return its location."""
+        name = object_name(key)
+        await _run_blocking(self.backend.put, name, data)
+        client = get_redis()
+        try:
+            await client.zadd(self._index_key("lru"), {key: time.time()})
+            if await client.hsetnx(self._index_key("sizes"), key, len(data)):
+                await client.incrby(self._index_key("total"), len(data))
+            await self.evict()
+        except redis.RedisError as e:
+            # Unindexed blobs are collected by the sweeper once their lease would have expired
+            logger.warning("Could not index %s: %s", key, e)
+        return self.backend.location(name)
+
+    async def _evict_if_idle(self, key: str) -> Optional[int]:
+        """Evict an archive unless a job holds it; returns the bytes freed, or None if it was kept."""
+        freed = int(await get_redis().eval(
+            EVICT_IF_IDLE_SCRIPT,
+            4,
+            self._lease_key(key),
+            self._index_key("lru"),
+            self._index_key("sizes"),
+            self._index_key("total"),
+            key,
+            time.time()
+        ))
+        if freed < 0:
+            return None
+        await _run_blocking(self.backend.delete, object_name(key))
+        return freed
+
+    async def _remove(self, key: str) -> int:
+        """Drop the index entry of an archive whose blob is already gone; returns the bytes freed."""
+        client = get_redis()
+        # Only one concurrent caller wins the ZREM, so the total is decremented once
+        if not await client.zrem(self._index_key("lru"), key):
+            return 0
+        size = int(await client.hget(self._index_key("sizes"), key) or 0)
+        await client.hdel(self._index_key("sizes"), key)
+        await client.decrby(self._index_key("total"), size)
+        return size
+
+    async def evict(self) -> List[str]:
+        """Evict least recently used archives not in use until the total fits the cap."""
+        client = get_redis()
+        total = int(await client.get(self._index_key("total")) or 0)
+        evicted = []
+        if total <= settings.ARTIFACT_STORE_MAX_BYTES:
+            return evicted
+        for raw_key in await client.zrange(self._index_key("lru"), 0, -1):
+            key = raw_key.decode()
+            freed = await self._evict_if_idle(key)
+            if freed is None:
+                continue
+            total -= freed
+            evicted.append(key)
+            if total <= settings.ARTIFACT_STORE_MAX_BYTES:
+                break
+        if evicted:
+            logger.info("Evicted %d archives, %d bytes stored", len(evicted), total)
+        if total > settings.ARTIFACT_STORE_MAX_BYTES:
+            logger.warning("Artifact store over its cap at %d bytes, remaining archives are in use", total)
+        return evicted
+
+    async def sweep(self) -> Dict[str, int]:
+        """
+        Reconcile the index with the backend, then evict.
+
+        Drops index entries whose blob is gone. Deletes blobs the index doesn't
+        know about once they're older than a lease, which covers partial writes
+        and puts whose indexing failed. Recomputes the stored total from the
+        per-archive sizes.
+        """
+        client = get_redis()
+        indexed = {raw_key.decode() for raw_key in await client.zrange(self._index_key("lru"), 0, -1)}
+        names = {object_name(key): key for key in indexed}
+        cutoff = time.time() - settings.ARTIFACT_STORE_LEASE_SECONDS
+
+        stored = set()
+        orphans = 0
+        listing = await _run_blocking(lambda: list(self.backend.list()))
+        for name, size, modified in listing:
+            if name in names:
+                stored.add(names[name])
+            elif modified < cutoff:
+                await _run_blocking(self.backend.delete, name)
+                orphans += 1
+
+        missing = indexed - stored
+        for key in missing:
+            await self._remove(key)
+
+        sizes = await client.hgetall(self._index_key("sizes"))
+        await client.set(self._index_key("total"), sum(int(size) for size in sizes.values()))
+        evicted = await self.evict()
+        return {"orphans_deleted": orphans, "missing_dropped": len(missing), "evicted": len(evicted)}
+
+    async def sweep_if_due(self) -> Optional[Dict[str, int]]:
+        """Sweep, unless another worker sharing this namespace has this interval."""
+        due = await get_redis().set(
+            self._index_key("sweep_lock"),
+            1,
+            nx=True,
+            ex=max(settings.ARTIFACT_SWEEP_INTERVAL - 1, 1)
+        )
+        if not due:
+            return None
+        return await self.sweep()
+
+artifact_store = ArtifactStore()
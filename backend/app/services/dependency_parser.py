@@ -1,13 +1,27 @@
 import ast
+import time
 from pathlib import Path
-from typing import Dict, List, Set, Tuple
+from typing import Dict, List, Optional, Set, Tuple
 from collections import defaultdict
-from app.core.logging import logger
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.core.metrics import ANALYSIS_BYTES, ANALYSIS_SKIPPED_FILES, stage_timer, timed_stage
 from app.models.domain.analysis import ComplexityMetrics
 
+logger = get_logger("analyzer.parser")
+
+class ParseBudgetExceeded(Exception):
+    """A file took longer than ANALYSIS_PARSE_TIME_BUDGET to analyze."""
+
+# Nodes visited between clock reads when a parse deadline is set
+DEADLINE_CHECK_INTERVAL = 1024
+
 class ComplexityVisitor(ast.NodeVisitor):
     """AST visitor for calculating code complexity metrics."""
-    def __init__(self):
+    def __init__(self, deadline: Optional[float] = None):
+        # perf_counter() time after which the visit is abandoned
+        self.deadline = deadline
+        self._nodes_until_check = DEADLINE_CHECK_INTERVAL
         self.loc = 0
         self.function_count = 0
         self.class_count = 0
@@ -17,14 +31,31 @@ class ComplexityVisitor(ast.NodeVisitor):
         self.comment_lines = 0
         self.code_lines = 0
 
+    def check_deadline(self):
+        """Count a node, reading the clock only once every DEADLINE_CHECK_INTERVAL nodes."""
+        if self.deadline is None:
+            return
+        self._nodes_until_check -= 1
+        if self._nodes_until_check > 0:
+            return
+        self._nodes_until_check = DEADLINE_CHECK_INTERVAL
+        if time.perf_counter() > self.deadline:
+            raise ParseBudgetExceeded()
+
+    def visit(self, node):
+        self.check_deadline()
+        return super().visit(node)
+
     def visit_FunctionDef(self, node):
         self.function_count += 1
         self.cyclomatic_complexity += 1  # Base complexity for function
         self.current_nesting += 1
         self.max_nesting_depth = max(self.max_nesting_depth, self.current_nesting)
         
-        # Visit all nodes in the function
+        # Visit all nodes in the function; nested functions are walked again
+        # by their own visit, so these count against the deadline too
         for child in ast.walk(node):
+            self.check_deadline()
             if isinstance(child, (ast.If, ast.While, ast.For, ast.Try, ast.ExceptHandler)):
                 self.cyclomatic_complexity += 1
         
@@ -54,11 +85,21 @@ class ComplexityVisitor(ast.NodeVisitor):
         self.cyclomatic_complexity += 1
         self.generic_visit(node)
 
-def calculate_complexity(content: str) -> ComplexityMetrics:
-    """Calculate complexity metrics for a Python file."""
+def calculate_complexity(
+    content: str,
+    tree: Optional[ast.AST] = None,
+    deadline: Optional[float] = None
+) -> ComplexityMetrics:
+    """
+    Calculate complexity metrics for a Python file.
+
+    Pass the already-parsed tree to avoid parsing twice. Raises
+    ParseBudgetExceeded if the visit runs past deadline.
+    """
     try:
-        tree = ast.parse(content)
-        visitor = ComplexityVisitor()
+        if tree is None:
+            tree = ast.parse(content)
+        visitor = ComplexityVisitor(deadline)
         visitor.visit(tree)
         
         # Calculate LOC and comment ratio
@@ -74,8 +115,10 @@ def calculate_complexity(content: str) -> ComplexityMetrics:
             cyclomatic_complexity=visitor.cyclomatic_complexity / max(visitor.function_count, 1),
             comment_ratio=comment_lines / max(code_lines, 1)
         )
+    except ParseBudgetExceeded:
+        raise
     except Exception as e:
-        logger.error(f"Error calculating complexity: {str(e)}", exc_info=True)
+        logger.error("Error calculating complexity: %s", e, exc_info=True)
         return ComplexityMetrics(
             loc=0,
             function_count=0,
@@ -102,6 +145,31 @@ def calculate_risk_score(complexity: ComplexityMetrics, coupling: Dict) -> float
     # Combine scores with weights
     return (complexity_score * 0.6 + coupling_score * 0.4) * 100  # Scale to 0-100
 
+def find_imports(tree: ast.AST) -> Set[str]:
+    """Module names imported anywhere in a parsed file."""
+    imports = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            for name in node.names:
+                imports.add(name.name)
+        elif isinstance(node, ast.ImportFrom):
+            if node.module:
+                imports.add(node.module)
+    return imports
+
+def resolve_imports(imports: Set[str], python_files: List[str]) -> List[str]:
+    """Map imported module names to the repo files that define them."""
+    dependencies = []
+    for imp in imports:
+        # Try to find the corresponding Python file
+        for py_file in python_files:
+            if py_file.endswith(f"{imp.replace('.', '/')}.py"):
+                dependencies.append(py_file)
+            elif py_file.endswith(f"{imp.replace('.', '/')}/__init__.py"):
+                dependencies.append(py_file)
+    return dependencies
+
+@timed_stage("analyze_dependencies")
 def analyze_dependencies(base_path: Path, python_files: List[str]) -> Dict:
     """
     Parse Python files and analyze dependencies to find architectural insights.
@@ -111,53 +179,53 @@ def analyze_dependencies(base_path: Path, python_files: List[str]) -> Dict:
         python_files: List of Python file paths relative to base_path
         
     Returns:
-        Dictionary containing dependency graph and derived signals
+        Dictionary containing dependency graph and derived signals, plus the
+        files skipped for running over ANALYSIS_PARSE_TIME_BUDGET
     """
     dependency_graph = {}
     inbound_edges = defaultdict(set)
     complexity_metrics = {}
+    skipped_files = {}
     
     # First pass: build the dependency graph and calculate complexity
-    for file_path in python_files:
-        try:
-            full_path = base_path / file_path
-            with open(full_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            # Calculate complexity metrics
-            complexity_metrics[file_path] = calculate_complexity(content)
-            
-            # Parse the file
-            tree = ast.parse(content)
-            
-            # Find all imports
-            imports = set()
-            for node in ast.walk(tree):
-                if isinstance(node, ast.Import):
-                    for name in node.names:
-                        imports.add(name.name)
-                elif isinstance(node, ast.ImportFrom):
-                    if node.module:
-                        imports.add(node.module)
+    with stage_timer("parse"):
+        for file_path in python_files:
+            try:
+                full_path = base_path / file_path
+                with open(full_path, 'r', encoding='utf-8') as f:
+                    content = f.read()
+                ANALYSIS_BYTES.labels("source").inc(len(content))
+
+                # ast.parse can't be interrupted, but its input is capped by
+                # ARCHIVE_MAX_FILE_BYTES; the Python-level passes check the deadline
+                deadline = time.perf_counter() + settings.ANALYSIS_PARSE_TIME_BUDGET
+                tree = ast.parse(content)
+                complexity = calculate_complexity(content, tree, deadline)
+                imports = find_imports(tree)
+                if time.perf_counter() > deadline:
+                    raise ParseBudgetExceeded()
+                complexity_metrics[file_path] = complexity
             
-            # Convert imports to file paths
-            dependencies = []
-            for imp in imports:
-                # Try to find the corresponding Python file
-                for py_file in python_files:
-                    if py_file.endswith(f"{imp.replace('.', '/')}.py"):
-                        dependencies.append(py_file)
-                        inbound_edges[py_file].add(file_path)
-                    elif py_file.endswith(f"{imp.replace('.', '/')}/__init__.py"):
-                        dependencies.append(py_file)
-                        inbound_edges[py_file].add(file_path)
+                # Convert imports to file paths
+                dependencies = resolve_imports(imports, python_files)
+                for dependency in dependencies:
+                    inbound_edges[dependency].add(file_path)
             
-            if dependencies:
-                dependency_graph[file_path] = sorted(dependencies)
+                if dependencies:
+                    dependency_graph[file_path] = sorted(dependencies)
                 
-        except Exception as e:
-            logger.error(f"Error parsing {file_path}: {str(e)}", exc_info=True)
-            continue
+            except ParseBudgetExceeded:
+                logger.warning("Skipped %s, over the parse time budget", file_path)
+                skipped_files[file_path] = "parse_time"
+                ANALYSIS_SKIPPED_FILES.labels("parse_time").inc()
+                continue
+            except Exception as e:
+                logger.error("Error parsing %s: %s", file_path, e, exc_info=True)
+                continue
+
+    # Files skipped over the time budget have unknown imports, so they'd show
+    # up as false orphans and low-coupling files; leave them out of the insights
+    analyzed_files = [file_path for file_path in python_files if file_path not in skipped_files]
 
     # Find circular dependencies
     circular_deps = find_circular_dependencies(dependency_graph)
@@ -165,27 +233,28 @@ def analyze_dependencies(base_path: Path, python_files: List[str]) -> Dict:
     # Calculate coupling metrics for each file
     coupling_scores = {}
     risk_scores = {}
-    for file_path in python_files:
-        outbound = len(dependency_graph.get(file_path, []))
-        inbound = len(inbound_edges[file_path])
-        depth = calculate_dependency_depth(dependency_graph, file_path)
+    with stage_timer("coupling"):
+        for file_path in analyzed_files:
+            outbound = len(dependency_graph.get(file_path, []))
+            inbound = len(inbound_edges[file_path])
+            depth = calculate_dependency_depth(dependency_graph, file_path)
         
-        coupling = {
-            "outbound": outbound,
-            "inbound": inbound,
-            "total": outbound + inbound,
-            "depth": depth,
-            "fan_in": inbound,
-            "fan_out": outbound
-        }
-        coupling_scores[file_path] = coupling
+            coupling = {
+                "outbound": outbound,
+                "inbound": inbound,
+                "total": outbound + inbound,
+                "depth": depth,
+                "fan_in": inbound,
+                "fan_out": outbound
+            }
+            coupling_scores[file_path] = coupling
         
-        # Calculate risk score if we have complexity metrics
-        if file_path in complexity_metrics:
-            risk_scores[file_path] = calculate_risk_score(
-                complexity_metrics[file_path],
-                coupling
-            )
+            # Calculate risk score if we have complexity metrics
+            if file_path in complexity_metrics:
+                risk_scores[file_path] = calculate_risk_score(
+                    complexity_metrics[file_path],
+                    coupling
+                )
     
     # Find high risk files (complexity + coupling)
     high_risk_files = {
@@ -200,7 +269,7 @@ def analyze_dependencies(base_path: Path, python_files: List[str]) -> Dict:
     
     # Find orphaned files
     orphaned_files = []
-    for file_path in python_files:
+    for file_path in analyzed_files:
         if (file_path not in dependency_graph and 
             not inbound_edges[file_path] and 
             file_path.endswith('.py')):
@@ -233,7 +302,8 @@ def analyze_dependencies(base_path: Path, python_files: List[str]) -> Dict:
             "high_risk_files": high_risk_files,
             "orphaned_files": orphaned_files,
             "coupling_scores": coupling_scores
-        }
+        },
+        "skipped_files": skipped_files
     }
 
 def calculate_dependency_depth(graph: Dict[str, List[str]], start_file: str) -> int:
@@ -250,6 +320,7 @@ def calculate_dependency_depth(graph: Dict[str, List[str]], start_file: str) ->
     
     return dfs(start_file, set(), 0)
 
+@timed_stage("find_circular_dependencies")
 def find_circular_dependencies(graph: Dict[str, List[str]]) -> List[List[str]]:
     """Find circular dependencies in the graph using DFS."""
     def dfs(node: str, visited: Set[str], path: List[str], circles: List[List[str]]):
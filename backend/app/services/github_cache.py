@@ -0,0 +1,65 @@
+import hashlib
+import json
+from typing import Any, Dict, Mapping, Optional
+import redis.asyncio as redis
+from app.core.config import settings
+from app.core.logging import logger
+from app.core.redis import get_redis
+from app.services.rate_limiter import token_fingerprint
+
+# Response headers we need to rebuild a result from the cache
+CACHED_HEADERS = ("Link",)
+
+class GitHubResponseCache:
+    """
+    ETag cache for GitHub GET responses, stored in Redis per token and URL.
+
+    Cached entries are always revalidated with If-None-Match rather than served
+    blindly, so results stay fresh; a 304 costs no rate-limit quota and skips
+    downloading and decoding the body.
+    """
+    @staticmethod
+    def _key(github_access_token: str, url: str, params: Optional[Mapping[str, Any]]) -> str:
+        query = json.dumps(sorted((params or {}).items()), default=str)
+        digest = hashlib.sha256(f"{url}?{query}".encode()).hexdigest()[:32]
+        return f"github:http:{token_fingerprint(github_access_token)}:{digest}"
+
+    async def get(self, github_access_token: str, url: str, params: Optional[Mapping[str, Any]] = None) -> Optional[Dict]:
+        """Get the cached entry (etag, body, headers) for a request, if any."""
+        try:
+            entry = await get_redis().hgetall(self._key(github_access_token, url, params))
+        except redis.RedisError as e:
+            logger.warning(f"GitHub response cache unavailable: {str(e)}")
+            return None
+        if not entry:
+            return None
+        return {
+            "etag": entry[b"etag"].decode(),
+            "body": json.loads(entry[b"body"]),
+            "headers": json.loads(entry[b"headers"])
+        }
+
+    async def set(
+        self,
+        github_access_token: str,
+        url: str,
+        params: Optional[Mapping[str, Any]],
+        etag: str,
+        body: Any,
+        headers: Mapping[str, str]
+    ) -> None:
+        """Store a 200 response under its ETag."""
+        key = self._key(github_access_token, url, params)
+        kept_headers = {name: headers[name] for name in CACHED_HEADERS if name in headers}
+        try:
+            client = get_redis()
+            await client.hset(key, mapping={
+                "etag": etag,
+                "body": json.dumps(body),
+                "headers": json.dumps(kept_headers)
+            })
+            await client.expire(key, settings.GITHUB_RESPONSE_CACHE_TTL)
+        except redis.RedisError as e:
+            logger.warning(f"Failed to cache GitHub response: {str(e)}")
+
+github_cache = GitHubResponseCache()
@@ -1,16 +1,59 @@
-from typing import List, Dict, Optional
+from typing import Any, List, Dict, Mapping, Optional, Tuple
 import aiohttp
 import base64
 import os
+import time
+import redis.asyncio as redis
 from fastapi import HTTPException
 from app.core.config import settings
+from app.core.auth import verify_id_token
 from app.core.logging import logger
-from firebase_admin import auth
+from app.core.metrics import github_trace_config, record_cache
+from app.core.redis import get_redis
+from app.services.rate_limiter import rate_limiter, token_fingerprint, GitHubRateLimitError
+from app.services.github_cache import github_cache
 from urllib.parse import urlparse, parse_qs
 
 class GitHubService:
     def __init__(self):
-        self.base_url = "https://api.github.com"
+        self.base_url = settings.GITHUB_API_URL
+        self._session: Optional[aiohttp.ClientSession] = None
+        # Token fingerprint -> (login, expiry on the monotonic clock)
+        self._usernames: Dict[str, Tuple[str, float]] = {}
+
+    async def start(self) -> None:
+        """Open the pooled HTTP session shared by every GitHub call"""
+        self.get_session()
+
+    async def close(self) -> None:
+        """Close the pooled HTTP session"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+            logger.info("Closed pooled GitHub HTTP session")
+        self._session = None
+
+    def get_session(self) -> aiohttp.ClientSession:
+        """Get the pooled session, opening it on first use"""
+        if self._session is None or self._session.closed:
+            # Keep connections to api.github.com alive between calls so each
+            # request skips the TCP and TLS handshakes
+            connector = aiohttp.TCPConnector(
+                limit=settings.GITHUB_HTTP_POOL_SIZE,
+                limit_per_host=settings.GITHUB_HTTP_LIMIT_PER_HOST,
+                ttl_dns_cache=settings.GITHUB_HTTP_DNS_CACHE_TTL,
+                keepalive_timeout=settings.GITHUB_HTTP_KEEPALIVE_TIMEOUT,
+                enable_cleanup_closed=True
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                trace_configs=[github_trace_config()],
+                timeout=aiohttp.ClientTimeout(
+                    total=settings.GITHUB_HTTP_TIMEOUT,
+                    connect=settings.GITHUB_HTTP_CONNECT_TIMEOUT
+                )
+            )
+            logger.info("Opened pooled GitHub HTTP session")
+        return self._session
 
     async def get_user_repositories(
             self, 
@@ -24,133 +67,233 @@ class GitHubService:
             raise HTTPException(status_code=401, detail="No GitHub access token found")
 
         try:
-            async with aiohttp.ClientSession() as session:
-                if search_query:
-                    # First get the username
-                    username = await self._get_username(github_access_token)
-                    
-                    # Use GitHub's search API for searching repositories
-                    async with session.get(
-                        f"{self.base_url}/search/repositories",
-                        headers={
-                            "Authorization": f"token {github_access_token}",
-                            "Accept": "application/vnd.github.v3+json"
-                        },
-                        params={
-                            "q": f"user:{username} {search_query} in:name,description",
-                            "page": page,
-                            "per_page": per_page,
-                            "sort": "updated",
-                            "order": "desc"
-                        }
-                    ) as response:
-                        if response.status != 200:
-                            error_data = await response.json()
-                            logger.error(f"GitHub search error: {error_data}")
-                            raise HTTPException(
-                                status_code=response.status,
-                                detail=f"GitHub search failed: {error_data.get('message', 'Unknown error')}"
-                            )
-                        
-                        search_result = await response.json()
-                        repositories = search_result.get("items", [])
-                        total_count = search_result.get("total_count", 0)
-                else:
-                    # Use regular repositories API for listing all repositories
-                    async with session.get(
-                        f"{self.base_url}/user/repos",
-                        headers={
-                            "Authorization": f"token {github_access_token}",
-                            "Accept": "application/vnd.github.v3+json"
-                        },
-                        params={
-                            "page": page,
-                            "per_page": per_page,
-                            "sort": "updated",
-                            "direction": "desc"
-                        }
-                    ) as response:
-                        if response.status != 200:
-                            raise HTTPException(status_code=400, detail="Failed to fetch repositories")
-
-                        repositories = await response.json()
-                        
-                        # Get total count from Link header
-                        link_header = response.headers.get("Link", "")
-                        total_count = 0
-                        if link_header:
-                            for link in link_header.split(","):
-                                if 'rel="last"' in link:
-                                    url = link.split(";")[0].strip("<>")
-                                    parsed_url = urlparse(url)
-                                    query_params = parse_qs(parsed_url.query)
-                                    last_page = int(query_params.get("page", ["1"])[0])
-                                    total_count = last_page * per_page
-
-                # Extract relevant fields only
-                trimmed_repos = [
-                    {
-                        "name": repo["name"],
-                        "html_url": repo["html_url"],
-                        "description": repo["description"],
-                        "language": repo["language"],
-                        "stargazers_count": repo["stargazers_count"],
-                        "forks_count": repo["forks_count"],
-                        "updated_at": repo["updated_at"]
+            if search_query:
+                # First get the username
+                username = await self._get_username(github_access_token)
+
+                # Use GitHub's search API for searching repositories
+                status, search_result, _ = await self._conditional_get(
+                    github_access_token,
+                    f"{self.base_url}/search/repositories",
+                    params={
+                        "q": f"user:{username} {search_query} in:name,description",
+                        "page": page,
+                        "per_page": per_page,
+                        "sort": "updated",
+                        "order": "desc"
                     }
-                    for repo in repositories
-                ]
-
-                return {
-                    "repositories": trimmed_repos,
-                    "total_count": total_count,
-                    "page": page,
-                    "per_page": per_page,
-                    "total_pages": (total_count + per_page - 1) // per_page if total_count > 0 else 1
+                )
+                if status != 200:
+                    logger.error(f"GitHub search error: {search_result}")
+                    raise HTTPException(
+                        status_code=status,
+                        detail=f"GitHub search failed: {search_result.get('message', 'Unknown error')}"
+                    )
+
+                repositories = search_result.get("items", [])
+                total_count = search_result.get("total_count", 0)
+            else:
+                # Use regular repositories API for listing all repositories
+                status, repositories, headers = await self._conditional_get(
+                    github_access_token,
+                    f"{self.base_url}/user/repos",
+                    params={
+                        "page": page,
+                        "per_page": per_page,
+                        "sort": "updated",
+                        "direction": "desc"
+                    }
+                )
+                if status != 200:
+                    raise HTTPException(status_code=400, detail="Failed to fetch repositories")
+
+                # Get total count from Link header
+                link_header = headers.get("Link", "")
+                total_count = 0
+                if link_header:
+                    for link in link_header.split(","):
+                        if 'rel="last"' in link:
+                            url = link.split(";")[0].strip("<>")
+                            parsed_url = urlparse(url)
+                            query_params = parse_qs(parsed_url.query)
+                            last_page = int(query_params.get("page", ["1"])[0])
+                            total_count = last_page * per_page
+
+            # Extract relevant fields only
+            trimmed_repos = [
+                {
+                    "name": repo["name"],
+                    "html_url": repo["html_url"],
+                    "description": repo["description"],
+                    "language": repo["language"],
+                    "stargazers_count": repo["stargazers_count"],
+                    "forks_count": repo["forks_count"],
+                    "updated_at": repo["updated_at"]
                 }
+                for repo in repositories
+            ]
+
+            return {
+                "repositories": trimmed_repos,
+                "total_count": total_count,
+                "page": page,
+                "per_page": per_page,
+                "total_pages": (total_count + per_page - 1) // per_page if total_count > 0 else 1
+            }
+        except GitHubRateLimitError as e:
+            raise HTTPException(
+                status_code=429,
+                detail="GitHub rate limit reached, please retry shortly",
+                headers={"Retry-After": str(int(e.retry_after) + 1)}
+            )
         except Exception as e:
             logger.error(f"Error fetching GitHub repos: {str(e)}")
             raise HTTPException(status_code=500, detail="Internal Server Error")
 
+    async def _conditional_get(
+            self,
+            github_access_token: str,
+            url: str,
+            params: Optional[Dict] = None
+        ) -> Tuple[int, Any, Mapping[str, str]]:
+        """GET a JSON endpoint, revalidating any cached copy with If-None-Match"""
+        headers = {
+            "Authorization": f"token {github_access_token}",
+            "Accept": "application/vnd.github.v3+json"
+        }
+        cached = await github_cache.get(github_access_token, url, params)
+        if cached:
+            headers["If-None-Match"] = cached["etag"]
+
+        await rate_limiter.acquire(github_access_token)
+        async with self.get_session().get(url, headers=headers, params=params) as response:
+            await rate_limiter.record(github_access_token, response.status, response.headers)
+            record_cache("github_response", response.status == 304 and cached is not None)
+            if response.status == 304 and cached:
+                return 200, cached["body"], cached["headers"]
+
+            body = await response.json()
+            etag = response.headers.get("ETag")
+            if response.status == 200 and etag:
+                await github_cache.set(github_access_token, url, params, etag, body, response.headers)
+            return response.status, body, response.headers
+
     async def _get_username(self, github_access_token: str) -> str:
-        """Get GitHub username from access token"""
+        """Get GitHub username from access token, cached per token"""
+        fingerprint = token_fingerprint(github_access_token)
+        cached = self._usernames.get(fingerprint)
+        if cached and cached[1] > time.monotonic():
+            record_cache("github_username", True)
+            return cached[0]
+
+        redis_key = f"github:login:{fingerprint}"
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(
-                    f"{self.base_url}/user",
-                    headers={
-                        "Authorization": f"token {github_access_token}",
-                        "Accept": "application/vnd.github.v3+json"
-                    }
-                ) as response:
-                    if response.status != 200:
-                        raise HTTPException(status_code=400, detail="Failed to fetch user info")
-                    user_data = await response.json()
-                    return user_data["login"]
+            login = await get_redis().get(redis_key)
+        except redis.RedisError as e:
+            logger.warning(f"Username cache unavailable: {str(e)}")
+            login = None
+        record_cache("github_username_redis", login is not None)
+        if login:
+            record_cache("github_username", True)
+            self._remember_username(fingerprint, login.decode())
+            return login.decode()
+        record_cache("github_username", False)
+
+        try:
+            await rate_limiter.acquire(github_access_token)
+            session = self.get_session()
+            async with session.get(
+                f"{self.base_url}/user",
+                headers={
+                    "Authorization": f"token {github_access_token}",
+                    "Accept": "application/vnd.github.v3+json"
+                }
+            ) as response:
+                await rate_limiter.record(github_access_token, response.status, response.headers)
+                if response.status != 200:
+                    raise HTTPException(status_code=400, detail="Failed to fetch user info")
+                user_data = await response.json()
+                login = user_data["login"]
+        except GitHubRateLimitError:
+            raise
         except Exception as e:
             logger.error(f"Error fetching GitHub user: {str(e)}")
             raise HTTPException(status_code=500, detail="Internal Server Error")
 
+        self._remember_username(fingerprint, login)
+        try:
+            await get_redis().set(redis_key, login, ex=settings.GITHUB_USERNAME_CACHE_TTL)
+        except redis.RedisError as e:
+            logger.warning(f"Failed to cache GitHub username: {str(e)}")
+        return login
+
+    def _remember_username(self, fingerprint: str, login: str) -> None:
+        """Keep a login in the in-process cache, dropping the oldest entry when full"""
+        if fingerprint not in self._usernames and len(self._usernames) >= settings.GITHUB_USERNAME_CACHE_SIZE:
+            self._usernames.pop(next(iter(self._usernames)))
+        self._usernames[fingerprint] = (login, time.monotonic() + settings.GITHUB_USERNAME_CACHE_TTL)
+
+    async def prefetch_username(self, github_access_token: str) -> None:
+        """Warm the username cache so the first search is a single GitHub round trip"""
+        try:
+            await self._get_username(github_access_token)
+        except Exception as e:
+            logger.warning(f"Failed to prefetch GitHub username: {str(e)}")
+
+    async def get_repository_metadata(self, github_access_token: str, owner: str, repo: str) -> Optional[Dict]:
+        """Get repository metadata (including its size in KB), or None if it can't be fetched"""
+        try:
+            await rate_limiter.acquire(github_access_token)
+            session = self.get_session()
+            async with session.get(
+                f"{self.base_url}/repos/{owner}/{repo}",
+                headers={
+                    "Authorization": f"token {github_access_token}",
+                    "Accept": "application/vnd.github.v3+json"
+                }
+            ) as response:
+                await rate_limiter.record(github_access_token, response.status, response.headers)
+                if response.status != 200:
+                    logger.warning(f"Failed to fetch metadata for {owner}/{repo}: {response.status}")
+                    return None
+                return await response.json()
+        except (aiohttp.ClientError, GitHubRateLimitError) as e:
+            # Routing falls back to the default queue without the size
+            logger.warning(f"Error fetching metadata for {owner}/{repo}: {str(e)}")
+            return None
+
     async def get_repository_zip(self, firebase_token: str, owner: str, repo: str, ref: str) -> bytes:
         """Download repository as zip file using Firebase token"""
+        from firebase_admin import auth
+
         try:
             # Verify Firebase token and get GitHub access token
-            decoded_token = auth.verify_id_token(firebase_token)
+            decoded_token = verify_id_token(firebase_token)
             github_token = decoded_token.get('github_access_token')
             
             if not github_token:
                 raise HTTPException(status_code=401, detail="No GitHub access token found")
 
-            async with aiohttp.ClientSession() as session:
-                async with session.get(
-                    f"{self.base_url}/repos/{owner}/{repo}/zipball/{ref}",
-                    headers={
-                        "Authorization": f"token {github_token}",
-                        "Accept": "application/vnd.github.v3+json"
-                    }
-                ) as response:
-                    if response.status != 200:
-                        raise HTTPException(status_code=400, detail="Failed to download repository")
-                    return await response.read()
+            await rate_limiter.acquire(github_token)
+            session = self.get_session()
+            async with session.get(
+                f"{self.base_url}/repos/{owner}/{repo}/zipball/{ref}",
+                headers={
+                    "Authorization": f"token {github_token}",
+                    "Accept": "application/vnd.github.v3+json"
+                }
+            ) as response:
+                await rate_limiter.record(github_token, response.status, response.headers)
+                if response.status != 200:
+                    raise HTTPException(status_code=400, detail="Failed to download repository")
+                return await response.read()
         except auth.InvalidIdTokenError:
-            raise HTTPException(status_code=401, detail="Invalid Firebase token") 
\ No newline at end of file
+            raise HTTPException(status_code=401, detail="Invalid Firebase token")
+        except GitHubRateLimitError as e:
+            raise HTTPException(
+                status_code=429,
+                detail="GitHub rate limit reached, please retry shortly",
+                headers={"Retry-After": str(int(e.retry_after) + 1)}
+            ) 
+
+github_service = GitHubService()
@@ -0,0 +1,184 @@
+from collections import deque
+from typing import Dict, Iterable, List, Optional
+from app.models.domain.analysis import RepositoryAnalysis
+
+class DependencyGraphIndex:
+    """
+    Adjacency and reverse-adjacency index over a stored dependency graph.
+
+    Paths are interned to integer ids so the index packs compactly, and the
+    strongly connected components are precomputed so cycle lookups are a
+    dictionary access.
+    """
+    def __init__(
+        self,
+        paths: List[str],
+        forward: List[List[int]],
+        reverse: List[List[int]],
+        components: List[int],
+        cycles: List[List[int]]
+    ):
+        self.paths = paths
+        self.ids = {path: i for i, path in enumerate(paths)}
+        self.forward = forward
+        self.reverse = reverse
+        self.components = components
+        self.cycles = cycles
+
+    @classmethod
+    def build(cls, analysis: RepositoryAnalysis) -> "DependencyGraphIndex":
+        """Build the index from a full analysis."""
+        nodes = set(analysis.insights.coupling_scores)
+        for source, targets in analysis.dependencies.items():
+            nodes.add(source)
+            nodes.update(targets)
+        paths = sorted(nodes)
+        ids = {path: i for i, path in enumerate(paths)}
+
+        forward: List[List[int]] = [[] for _ in paths]
+        reverse: List[List[int]] = [[] for _ in paths]
+        for source, targets in analysis.dependencies.items():
+            for target in set(targets):
+                forward[ids[source]].append(ids[target])
+                reverse[ids[target]].append(ids[source])
+        for edges in forward + reverse:
+            edges.sort()
+
+        cycles = [
+            [ids[path] for path in cycle.files if path in ids]
+            for cycle in analysis.insights.circular_dependencies
+        ]
+        return cls(paths, forward, reverse, strongly_connected_components(forward), cycles)
+
+    def to_dict(self) -> Dict:
+        return {
+            "paths": self.paths,
+            "forward": self.forward,
+            "reverse": self.reverse,
+            "components": self.components,
+            "cycles": self.cycles
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "DependencyGraphIndex":
+        return cls(data["paths"], data["forward"], data["reverse"], data["components"], data["cycles"])
+
+    def __contains__(self, path: str) -> bool:
+        return path in self.ids
+
+    def _names(self, ids: Iterable[int]) -> List[str]:
+        return [self.paths[i] for i in ids]
+
+    def dependencies(self, path: str) -> List[str]:
+        """Files the given file imports."""
+        return self._names(self.forward[self.ids[path]])
+
+    def dependents(self, path: str) -> List[str]:
+        """Files that import the given file."""
+        return self._names(self.reverse[self.ids[path]])
+
+    def traverse(self, path: str, reverse: bool = False, max_depth: int = 1) -> Dict[str, int]:
+        """
+        Breadth-first walk from a file.
+
+        Returns:
+            Each reachable file (excluding the start) mapped to its distance
+        """
+        adjacency = self.reverse if reverse else self.forward
+        start = self.ids[path]
+        distances = {start: 0}
+        queue = deque([start])
+        while queue:
+            node = queue.popleft()
+            if distances[node] >= max_depth:
+                continue
+            for neighbor in adjacency[node]:
+                if neighbor not in distances:
+                    distances[neighbor] = distances[node] + 1
+                    queue.append(neighbor)
+        del distances[start]
+        return {self.paths[node]: distance for node, distance in distances.items()}
+
+    def shortest_path(self, source: str, target: str) -> Optional[List[str]]:
+        """Shortest import chain from source to target, or None if target isn't reachable."""
+        start, goal = self.ids[source], self.ids[target]
+        previous = {start: start}
+        queue = deque([start])
+        while queue:
+            node = queue.popleft()
+            if node == goal:
+                chain = [node]
+                while chain[-1] != start:
+                    chain.append(previous[chain[-1]])
+                return self._names(reversed(chain))
+            for neighbor in self.forward[node]:
+                if neighbor not in previous:
+                    previous[neighbor] = node
+                    queue.append(neighbor)
+        return None
+
+    def subgraph(self, directory: str) -> Dict[str, List[str]]:
+        """Dependencies among the files under a directory."""
+        prefix = directory.rstrip("/") + "/" if directory else ""
+        members = {i for i, path in enumerate(self.paths) if path.startswith(prefix)}
+        return {
+            self.paths[i]: self._names(target for target in self.forward[i] if target in members)
+            for i in sorted(members)
+        }
+
+    def component(self, path: str) -> List[str]:
+        """Files that are mutually reachable with the given file (including it)."""
+        component = self.components[self.ids[path]]
+        return [p for i, p in enumerate(self.paths) if self.components[i] == component]
+
+    def cycles_containing(self, path: str) -> List[List[str]]:
+        """Detected cycles that pass through the given file."""
+        node = self.ids[path]
+        return [self._names(cycle) for cycle in self.cycles if node in cycle]
+
+def strongly_connected_components(forward: List[List[int]]) -> List[int]:
+    """Label each node with its strongly connected component (iterative Tarjan)."""
+    index_of = [-1] * len(forward)
+    lowlink = [0] * len(forward)
+    on_stack = [False] * len(forward)
+    components = [-1] * len(forward)
+    stack: List[int] = []
+    next_index = 0
+    next_component = 0
+
+    for root in range(len(forward)):
+        if index_of[root] != -1:
+            continue
+        work = [(root, 0)]
+        while work:
+            node, edge = work.pop()
+            if edge == 0:
+                index_of[node] = lowlink[node] = next_index
+                next_index += 1
+                stack.append(node)
+                on_stack[node] = True
+            # Resume scanning this node's edges where we left off
+            recurse = False
+            for i in range(edge, len(forward[node])):
+                neighbor = forward[node][i]
+                if index_of[neighbor] == -1:
+                    work.append((node, i + 1))
+                    work.append((neighbor, 0))
+                    recurse = True
+                    break
+                if on_stack[neighbor]:
+                    lowlink[node] = min(lowlink[node], index_of[neighbor])
+            if recurse:
+                continue
+            if lowlink[node] == index_of[node]:
+                while True:
+                    member = stack.pop()
+                    on_stack[member] = False
+                    components[member] = next_component
+                    if member == node:
+                        break
+                next_component += 1
+            if work:
+                parent = work[-1][0]
+                lowlink[parent] = min(lowlink[parent], lowlink[node])
+    return components
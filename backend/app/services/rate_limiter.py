@@ -0,0 +1,157 @@
+import asyncio
+import hashlib
+import random
+import time
+from typing import Mapping, Optional
+import redis.asyncio as redis
+from app.core.config import settings
+from app.core.logging import logger
+from app.core.redis import get_redis
+
+# Atomically refill and take one token. The bucket is allowed to go negative so
+# concurrent callers queue up behind each other instead of all waking at once.
+# Returns the number of seconds the caller should wait before sending. A caller
+# whose wait would exceed max_wait reschedules instead of waiting, so it takes
+# nothing and doesn't push later callers further back.
+TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local max_wait = tonumber(ARGV[4])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(now - ts, 0) * rate)
+local wait = 0
+if tokens < 1 then
+    wait = (1 - tokens) / rate
+end
+if wait <= max_wait then
+    tokens = tokens - 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 60)
+return tostring(wait)
+"""
+
+class GitHubRateLimitError(Exception):
+    """Raised when a GitHub token has to wait longer than we're willing to block."""
+    def __init__(self, retry_after: float):
+        super().__init__(f"GitHub rate limit reached, retry after {retry_after:.1f}s")
+        self.retry_after = retry_after
+
+def token_fingerprint(github_access_token: str) -> str:
+    """Stable, non-reversible identifier for a GitHub token."""
+    return hashlib.sha256(github_access_token.encode()).hexdigest()[:32]
+
+def backoff_with_jitter(attempt: int, base: float = 1.0, cap: float = 300.0) -> float:
+    """Exponential backoff with full jitter."""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+class GitHubRateLimiter:
+    """
+    Shared, Redis-backed request scheduler for GitHub tokens.
+
+    Every process talking to GitHub with the same token shares one token bucket.
+    The bucket's refill rate follows the quota GitHub reports in its
+    X-RateLimit-* headers, so the remaining requests are spread over the time
+    until the window resets instead of being burned in a burst.
+    """
+    @staticmethod
+    def _state_key(fingerprint: str) -> str:
+        return f"github:ratelimit:{fingerprint}"
+
+    @staticmethod
+    def _bucket_key(fingerprint: str) -> str:
+        return f"github:bucket:{fingerprint}"
+
+    async def acquire(self, github_access_token: str) -> None:
+        """
+        Wait until a request may be sent with this token.
+
+        Raises:
+            GitHubRateLimitError: If the wait would exceed GITHUB_RATE_LIMIT_MAX_WAIT,
+                so the caller can reschedule the work instead of blocking.
+        """
+        fingerprint = token_fingerprint(github_access_token)
+        now = time.time()
+        try:
+            client = get_redis()
+            state = await client.hgetall(self._state_key(fingerprint))
+            state = {k.decode(): float(v) for k, v in state.items()}
+
+            wait = 0.0
+            rate = settings.GITHUB_RATE_LIMIT_MAX_RATE
+            blocked_until = state.get("blocked_until", 0.0)
+            reset = state.get("reset", 0.0)
+            if blocked_until > now:
+                wait = blocked_until - now
+            elif "remaining" in state and reset > now:
+                usable = state["remaining"] - settings.GITHUB_RATE_LIMIT_RESERVE
+                if usable <= 0:
+                    wait = reset - now
+                else:
+                    # Spread what's left of the quota over the rest of the window
+                    rate = min(rate, usable / (reset - now))
+
+            if wait <= 0:
+                wait = float(await client.eval(
+                    TOKEN_BUCKET_SCRIPT,
+                    1,
+                    self._bucket_key(fingerprint),
+                    max(rate, 0.01),
+                    settings.GITHUB_RATE_LIMIT_BURST,
+                    now,
+                    settings.GITHUB_RATE_LIMIT_MAX_WAIT
+                ))
+        except redis.RedisError as e:
+            # Fail open: GitHub's own 403s are still handled by record()
+            logger.warning(f"Rate limiter unavailable, sending request unthrottled: {str(e)}")
+            return
+
+        if wait > settings.GITHUB_RATE_LIMIT_MAX_WAIT:
+            raise GitHubRateLimitError(wait)
+        if wait > 0:
+            await asyncio.sleep(wait + random.uniform(0, min(wait, 1.0)))
+
+    async def record(self, github_access_token: str, status: int, headers: Mapping[str, str]) -> Optional[float]:
+        """
+        Update the shared state from a GitHub response.
+
+        Returns:
+            Seconds to wait before retrying if the response was a rate-limit rejection, else None
+        """
+        now = time.time()
+        state = {}
+        remaining = headers.get("X-RateLimit-Remaining")
+        reset = headers.get("X-RateLimit-Reset")
+        if remaining is not None and reset is not None:
+            state["remaining"] = int(remaining)
+            state["reset"] = int(reset)
+
+        retry_after = None
+        if status in (403, 429):
+            if headers.get("Retry-After"):
+                # Secondary rate limit
+                retry_after = float(headers["Retry-After"])
+            elif remaining == "0" and reset is not None:
+                retry_after = max(int(reset) - now, 1.0)
+            elif status == 429:
+                # GitHub asks for at least a minute when no hint is given
+                retry_after = 60.0
+        if retry_after is not None:
+            state["blocked_until"] = now + retry_after
+            logger.warning(f"GitHub rate limit hit, blocking token for {retry_after:.0f}s")
+
+        if state:
+            try:
+                key = self._state_key(token_fingerprint(github_access_token))
+                client = get_redis()
+                await client.hset(key, mapping=state)
+                await client.expire(key, 3600)
+            except redis.RedisError as e:
+                logger.warning(f"Failed to record GitHub rate limit state: {str(e)}")
+
+        return retry_after
+
+rate_limiter = GitHubRateLimiter()
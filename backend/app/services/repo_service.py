@@ -0,0 +1,49 @@
+from sqlalchemy.orm import selectinload
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from fastapi import HTTPException, status
+from db.models.repos import Repo
+from db.models.user import User
+
+class RepoService:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_authorized_repo(
+        self,
+        repo_id: int,
+        firebase_uid: str,
+        action: str = "access",
+        with_download_tasks: bool = False
+    ) -> Repo:
+        """
+        Fetch a repo and check it belongs to the caller in a single query.
+
+        Joins the owner instead of loading the caller's User row first, and
+        optionally eager-loads download_tasks in one extra batched query.
+
+        Raises:
+            HTTPException: 404 if the repo doesn't exist, 403 if it belongs to someone else
+        """
+        statement = (
+            select(Repo, (User.firebase_uid == firebase_uid).label("is_owner"))
+            .join(User, Repo.user_id == User.id)
+            .where(Repo.id == repo_id)
+        )
+        if with_download_tasks:
+            statement = statement.options(selectinload(Repo.download_tasks))
+
+        row = (await self.db.exec(statement)).first()
+        if not row:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Repo not found"
+            )
+
+        repo, is_owner = row
+        if not is_owner:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail=f"Not authorized to {action} this repo"
+            )
+        return repo
@@ -1,14 +1,16 @@
-from typing import Optional, List
-from sqlmodel import Session, select
+from typing import Optional, List, Tuple
+from sqlmodel import select, func
+from sqlmodel.ext.asyncio.session import AsyncSession
 from db.models.tasks import Task, RepoDownloadTask, TaskStatus
 from db.models.repos import Repo
 from app.core.logging import logger
+from app.core.pagination import keyset_page, page_results, cached_count, invalidate_count
 
 class TaskService:
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
 
-    def create_download_task(self, repo_id: int, task_id: str, status: str = "pending", output_path: Optional[str] = None, error_message: Optional[str] = None) -> RepoDownloadTask:
+    async def create_download_task(self, repo_id: int, task_id: str, status: str = "pending", output_path: Optional[str] = None, error_message: Optional[str] = None) -> RepoDownloadTask:
         """Create a new repository download task."""
         task = RepoDownloadTask(
             repo_id=repo_id,
@@ -18,25 +20,50 @@ class TaskService:
             error_message=error_message
         )
         self.db.add(task)
-        self.db.commit()
-        self.db.refresh(task)
+        await self.db.commit()
+        await self.db.refresh(task)
+        await invalidate_count(f"download_tasks:{repo_id}")
         return task
 
-    def get_task(self, task_id: str) -> Optional[RepoDownloadTask]:
+    async def get_task(self, task_id: str) -> Optional[RepoDownloadTask]:
         """Get a task by its Celery task ID."""
-        return self.db.exec(
+        result = await self.db.exec(
             select(RepoDownloadTask).where(RepoDownloadTask.task_id == task_id)
-        ).first()
+        )
+        return result.first()
+
+    async def get_repo_download_tasks(
+        self,
+        repo_id: int,
+        cursor: Optional[str] = None,
+        limit: int = 100
+    ) -> Tuple[List[RepoDownloadTask], Optional[str]]:
+        """Get a page of download tasks for a repository, newest first, and the next cursor."""
+        result = await self.db.exec(
+            keyset_page(
+                select(RepoDownloadTask).where(RepoDownloadTask.repo_id == repo_id),
+                RepoDownloadTask,
+                cursor,
+                limit
+            )
+        )
+        return page_results(result.all(), limit)
+
+    async def count_repo_download_tasks(self, repo_id: int) -> int:
+        """Count download tasks for a repository (cached)."""
+        return await cached_count(
+            self.db,
+            f"download_tasks:{repo_id}",
+            select(func.count()).select_from(RepoDownloadTask).where(RepoDownloadTask.repo_id == repo_id)
+        )
 
-    def get_repo_download_tasks(self, repo_id: int) -> List[RepoDownloadTask]:
-        """Get all download tasks for a repository."""
-        return self.db.exec(
-            select(RepoDownloadTask)
-            .where(RepoDownloadTask.repo_id == repo_id)
-            .order_by(RepoDownloadTask.created_at.desc())
-        ).all()
+    async def delete_task(self, task: RepoDownloadTask) -> None:
+        """Delete a download task record."""
+        await self.db.delete(task)
+        await self.db.commit()
+        await invalidate_count(f"download_tasks:{task.repo_id}")
 
-    def update_task_status(
+    async def update_task_status(
         self, 
         task_id: str, 
         status: str, 
@@ -44,15 +71,15 @@ class TaskService:
         error_message: Optional[str] = None
     ) -> Optional[RepoDownloadTask]:
         """Update a task's status and optional output/error information."""
-        task = self.get_task(task_id)
+        task = await self.get_task(task_id)
         if task:
             task.status = status
             if output_path:
                 task.output_path = output_path
             if error_message:
                 task.error_message = error_message
-            self.db.commit()
-            self.db.refresh(task)
+            await self.db.commit()
+            await self.db.refresh(task)
             logger.info(f"Updated task {task_id} status to {status}")
             return task
         return None
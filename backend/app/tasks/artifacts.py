@@ -0,0 +1,38 @@
+import asyncio
+import threading
+from celery.signals import worker_ready, worker_shutdown
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.services.artifact_store import artifact_store
+
+logger = get_logger("tasks.artifacts")
+
+# Set on worker shutdown to end the sweep loop
+_stop_sweeping = threading.Event()
+
+def _sweep_loop() -> None:
+    while True:
+        try:
+            result = asyncio.run(artifact_store.sweep_if_due())
+            if result is not None:
+                logger.info("Swept artifact store %s: %s", artifact_store.backend.namespace, result)
+        except Exception as e:
+            logger.warning("Artifact sweep failed: %s", e)
+        if _stop_sweeping.wait(settings.ARTIFACT_SWEEP_INTERVAL):
+            return
+
+@worker_ready.connect
+def start_artifact_sweeper(**kwargs):
+    """
+    Sweep the artifact store from every worker's main process.
+
+    A local store is one directory per host, so each host has to sweep its
+    own. Workers sharing a namespace (the same host for local, everyone for
+    S3) take turns through a Redis lock, so it's swept about once per
+    ARTIFACT_SWEEP_INTERVAL whatever the number of workers.
+    """
+    threading.Thread(target=_sweep_loop, name="artifact-sweeper", daemon=True).start()
+
+@worker_shutdown.connect
+def stop_artifact_sweeper(**kwargs):
+    _stop_sweeping.set()
@@ -1,15 +1,28 @@
-import os
-import tempfile
 import zipfile
 from pathlib import Path
 from typing import Optional
 import aiohttp
 import asyncio
 from app.celery_app import celery_app
-from app.core.logging import logger
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.core.metrics import github_trace_config
+from app.core.profiling import profiled
+from app.services.artifact_store import artifact_key, artifact_store
+from app.services.rate_limiter import rate_limiter, GitHubRateLimitError, backoff_with_jitter
+
+logger = get_logger("tasks.github")
 
 @celery_app.task(name="download_github_repo", bind=True, max_retries=3)
-def download_github_repo(self, owner: str, repo: str, ref: str, access_token: str, output_path: Optional[str] = None) -> str:
+def download_github_repo(
+    self,
+    owner: str,
+    repo: str,
+    ref: str,
+    access_token: str,
+    output_path: Optional[str] = None,
+    profile: bool = False
+) -> str:
     """
     Download a GitHub repository and save it as a zip file.
     
@@ -18,58 +31,111 @@ def download_github_repo(self, owner: str, repo: str, ref: str, access_token: st
         repo: Repository name
         ref: Branch/tag/commit reference
         access_token: GitHub access token
-        output_path: Optional path to save the zip file. If not provided, a temporary file will be created.
+        output_path: Optional path to also save the zip file to. If not provided, the
+            archive's location in the artifact store is returned.
+        profile: Run the download under the profiler, writing artifacts to PROFILE_ARTIFACT_DIR
     
     Returns:
-        str: Path to the downloaded zip file
+        str: Path (or s3:// URL) of the downloaded zip file. A store location is
+        only held while the task runs and can be evicted afterwards; consumers
+        that find it gone should run this task again for owner/repo@sha, which
+        is a cheap store hit whenever the archive is still there.
     """
-    logger.info(f"Starting download task {self.request.id} for {owner}/{repo}@{ref}")
+    if profile:
+        with profiled(f"download_github_repo {owner}/{repo}@{ref}"):
+            return _download_github_repo(self, owner, repo, ref, access_token, output_path)
+    return _download_github_repo(self, owner, repo, ref, access_token, output_path)
+
+def _download_github_repo(task, owner: str, repo: str, ref: str, access_token: str, output_path: Optional[str]) -> str:
+    logger.info("Starting download task %s for %s/%s@%s", task.request.id, owner, repo, ref)
     try:
-        # Create a temporary directory if no output path is provided
-        if not output_path:
-            temp_dir = tempfile.mkdtemp()
-            output_path = os.path.join(temp_dir, f"{owner}-{repo}-{ref}.zip")
-        
         # Create a new event loop for this task
         loop = asyncio.new_event_loop()
         asyncio.set_event_loop(loop)
         
         try:
-            # Run the async download in the new event loop
-            zip_data = loop.run_until_complete(_download_repo_async(owner, repo, ref, access_token))
-            
-            # Save the zip data to file
-            with open(output_path, 'wb') as f:
-                f.write(zip_data)
-            
-            logger.info(f"Successfully downloaded repository {owner}/{repo}@{ref}")
-            return output_path
-            
+            return loop.run_until_complete(_fetch_archive(owner, repo, ref, access_token, output_path))
         finally:
             # Clean up the event loop
             loop.close()
         
+    except GitHubRateLimitError as e:
+        # Reschedule for when the token has quota again. Each retry counts against
+        # max_retries, hence the separate, higher GITHUB_RATE_LIMIT_MAX_RETRIES
+        countdown = e.retry_after + backoff_with_jitter(0, base=5.0)
+        logger.warning("Rescheduling download of %s/%s in %.0fs: %s", owner, repo, countdown, e)
+        raise task.retry(exc=e, countdown=countdown, max_retries=settings.GITHUB_RATE_LIMIT_MAX_RETRIES)
     except aiohttp.ClientError as e:
-        logger.error(f"Network error downloading repository: {str(e)}")
-        # Retry on network errors
-        self.retry(exc=e, countdown=5)
+        logger.error("Network error downloading repository: %s", e)
+        # Retry on network errors, spreading retries so a burst doesn't come back in lockstep
+        raise task.retry(exc=e, countdown=5 + backoff_with_jitter(task.request.retries, base=5.0))
     except Exception as e:
-        logger.error(f"Error downloading repository: {str(e)}")
+        logger.error("Error downloading repository: %s", e)
         raise
 
-async def _download_repo_async(owner: str, repo: str, ref: str, access_token: str) -> bytes:
-    """Async helper function to download the repository zip"""
-    url = f"https://api.github.com/repos/{owner}/{repo}/zipball/{ref}"
+async def _fetch_archive(owner: str, repo: str, ref: str, access_token: str, output_path: Optional[str]) -> str:
+    """Get the archive for ref from the artifact store, downloading it on a miss."""
+    async with aiohttp.ClientSession(trace_configs=[github_trace_config()]) as session:
+        sha = await _resolve_sha(session, owner, repo, ref, access_token)
+        key = artifact_key(owner, repo, sha)
+        async with artifact_store.hold(key):
+            zip_data = None
+            location = await artifact_store.get_location(key)
+            if location is None:
+                zip_data = await _download_repo_async(session, owner, repo, sha, access_token)
+                location = await artifact_store.put(key, zip_data)
+                logger.info("Successfully downloaded repository %s", key)
+            else:
+                logger.info("Reusing stored archive for %s", key)
+
+            if output_path:
+                if zip_data is None:
+                    zip_data = await artifact_store.read(key)
+                await asyncio.get_running_loop().run_in_executor(None, Path(output_path).write_bytes, zip_data)
+                return output_path
+            return location
+
+async def _github_get(session: aiohttp.ClientSession, url: str, access_token: str, accept: str) -> bytes:
+    """Rate-limited GET against the GitHub API"""
     headers = {
         "Authorization": f"token {access_token}",
-        "Accept": "application/vnd.github.v3+json"
+        "Accept": accept
     }
     
-    logger.info(f"Downloading from URL: {url}")
-    async with aiohttp.ClientSession() as session:
-        async with session.get(url, headers=headers) as response:
-            if response.status != 200:
-                error_text = await response.text()
-                logger.error(f"GitHub API error: {error_text}")
-                raise Exception(f"Failed to download repository: {error_text}")
-            return await response.read() 
\ No newline at end of file
+    logger.debug("Requesting URL: %s", url)
+    await rate_limiter.acquire(access_token)
+    async with session.get(url, headers=headers) as response:
+        retry_after = await rate_limiter.record(access_token, response.status, response.headers)
+        if retry_after is not None:
+            raise GitHubRateLimitError(retry_after)
+        if response.status != 200:
+            error_text = await response.text()
+            logger.error("GitHub API error: %s", error_text)
+            raise Exception(f"Failed to download repository: {error_text}")
+        return await response.read()
+
+async def _resolve_sha(session: aiohttp.ClientSession, owner: str, repo: str, ref: str, access_token: str) -> str:
+    """
+    The commit a branch, tag or sha points at, so archives are stored per commit.
+
+    Always asks GitHub, even for a full sha. Stored archives are shared
+    between users, so this authenticated call is what checks the caller's
+    token can see the repo before a cached archive is handed out.
+    """
+    # The sha media type returns just the 40 character hash
+    sha = await _github_get(
+        session,
+        f"{settings.GITHUB_API_URL}/repos/{owner}/{repo}/commits/{ref}",
+        access_token,
+        "application/vnd.github.sha"
+    )
+    return sha.decode().strip()
+
+async def _download_repo_async(session: aiohttp.ClientSession, owner: str, repo: str, sha: str, access_token: str) -> bytes:
+    """Async helper function to download the repository zip"""
+    return await _github_get(
+        session,
+        f"{settings.GITHUB_API_URL}/repos/{owner}/{repo}/zipball/{sha}",
+        access_token,
+        "application/vnd.github.v3+json"
+    )
@@ -0,0 +1,54 @@
+import os
+import time
+from typing import Dict
+from celery.signals import (
+    before_task_publish,
+    task_postrun,
+    task_prerun,
+    worker_process_shutdown,
+    worker_ready
+)
+from prometheus_client import multiprocess, start_http_server
+from app.core.config import settings
+from app.core.logging import logger
+from app.core.metrics import CELERY_QUEUE_WAIT_SECONDS, CELERY_TASK_SECONDS, metrics_registry
+
+# task_id -> start time on the perf counter, for tasks running in this process
+_task_started: Dict[str, float] = {}
+
+@before_task_publish.connect
+def stamp_published_at(headers=None, **kwargs):
+    """Record when a task was enqueued so the worker can measure queue wait."""
+    if headers is not None:
+        headers["published_at"] = time.time()
+
+@task_prerun.connect
+def start_task_timer(task_id=None, task=None, **kwargs):
+    _task_started[task_id] = time.perf_counter()
+    published_at = task.request.get("published_at")
+    if published_at is not None:
+        queue = (task.request.delivery_info or {}).get("routing_key", "unknown")
+        CELERY_QUEUE_WAIT_SECONDS.labels(task.name, queue).observe(max(0.0, time.time() - published_at))
+
+@task_postrun.connect
+def stop_task_timer(task_id=None, task=None, state=None, **kwargs):
+    started = _task_started.pop(task_id, None)
+    if started is not None:
+        CELERY_TASK_SECONDS.labels(task.name, state or "UNKNOWN").observe(time.perf_counter() - started)
+
+@worker_ready.connect
+def start_metrics_server(**kwargs):
+    """Serve /metrics from the worker's main process; WORKER_METRICS_PORT=0 disables it."""
+    if not settings.WORKER_METRICS_PORT:
+        return
+    try:
+        start_http_server(settings.WORKER_METRICS_PORT, registry=metrics_registry())
+        logger.info(f"Serving worker metrics on port {settings.WORKER_METRICS_PORT}")
+    except OSError as e:
+        # Usually another worker on this host already owns the port
+        logger.warning(f"Could not serve worker metrics on port {settings.WORKER_METRICS_PORT}: {str(e)}")
+
+@worker_process_shutdown.connect
+def mark_metrics_process_dead(pid=None, **kwargs):
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        multiprocess.mark_process_dead(pid)
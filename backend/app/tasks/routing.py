@@ -0,0 +1,41 @@
+from typing import Any, Dict, Optional
+from app.core.config import settings
+
+# Queue names, mirrored in celery_app.conf.task_queues
+INTERACTIVE_QUEUE = "interactive"
+SMALL_QUEUE = "small"
+LARGE_QUEUE = "large"
+
+def route_repo_download(size_kb: Optional[int], interactive: bool = False) -> Dict[str, Any]:
+    """
+    Pick the Celery queue and priority for a repository download.
+
+    Args:
+        size_kb: Repository size as reported by GitHub's repo metadata (in KB), None if unknown
+        interactive: Whether a user is actively waiting on the result
+
+    Returns:
+        Dict of queue, routing_key and priority to pass to apply_async
+    """
+    # Unknown sizes go to the small pool at default priority rather than
+    # being trusted with the interactive queue
+    if size_kb is None:
+        queue = SMALL_QUEUE
+        priority = settings.CELERY_MAX_PRIORITY // 2
+    elif size_kb > settings.CELERY_SMALL_MAX_REPO_KB:
+        queue = LARGE_QUEUE
+        priority = settings.CELERY_MAX_PRIORITY
+    elif interactive and size_kb <= settings.CELERY_INTERACTIVE_MAX_REPO_KB:
+        queue = INTERACTIVE_QUEUE
+        priority = 0
+    else:
+        # Smaller repos jump ahead of bigger ones within the small pool
+        queue = SMALL_QUEUE
+        fraction = size_kb / max(settings.CELERY_SMALL_MAX_REPO_KB, 1)
+        priority = 1 + int(fraction * (settings.CELERY_MAX_PRIORITY - 2))
+
+    return {
+        "queue": queue,
+        "routing_key": queue,
+        "priority": priority,
+    }
@@ -0,0 +1,191 @@
+"""
+End-to-end performance regression gate for analyze_repository.
+
+Runs the analyzer over a fixed corpus of repository zips. The corpus is
+generated deterministically with benchmarks.synthetic_repo, plus any real
+snapshots dropped into --corpus-dir. Each case runs in a fresh subprocess so
+peak RSS is measured per case. Wall time, peak RSS and serialized output size
+are compared against the committed baselines in
+benchmarks/baselines/analysis_regression.json. Exits non-zero when any metric
+is over its baseline by more than the tolerance, or when a case has no
+baseline (pass --allow-missing to only report those).
+
+Baselines are machine-specific. The committed file records the Python
+version, architecture, platform and CPU count it was measured on, and a run
+on a different machine says so. Record them on the machine that runs the gate:
+    pdm run python -m benchmarks.analysis_regression --update-baselines
+
+Usage:
+    pdm run python -m benchmarks.analysis_regression
+    pdm run python -m benchmarks.analysis_regression --cases small,medium --time-tolerance 0.3
+"""
+import argparse
+import asyncio
+import io
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import asdict
+from pathlib import Path
+from typing import Dict, List, Optional
+from benchmarks.synthetic_repo import RepoSpec, generate_repo, repo_zip_bytes
+
+BASELINES = Path(__file__).parent / "baselines" / "analysis_regression.json"
+
+# Generated cases; keep these fixed, or re-record the baselines when changing them
+CORPUS = {
+    "small": RepoSpec(files=200),
+    "medium": RepoSpec(files=2000),
+    "large": RepoSpec(files=5000, imports_per_file=8),
+    "deep": RepoSpec(files=2000, package_depth=8, nesting=8),
+    "cyclic": RepoSpec(files=2000, cycles=500),
+}
+
+METRICS = ("wall_seconds", "peak_rss_bytes", "output_bytes")
+
+def run_case(zip_path: Path) -> Dict:
+    """Analyze one archive in this process and measure it (called in the child)."""
+    # Imported here so the parent process stays light
+    from fastapi import UploadFile
+    from app.services.analysis_serializer import analysis_to_primitive
+    from app.services.analyzer import analyze_repository
+    import orjson
+
+    upload = UploadFile(file=io.BytesIO(zip_path.read_bytes()), filename=zip_path.name)
+    started = time.perf_counter()
+    analysis = asyncio.run(analyze_repository(upload))
+    wall_seconds = time.perf_counter() - started
+
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in KB on Linux and bytes on macOS
+    peak_rss_bytes = max_rss if sys.platform == "darwin" else max_rss * 1024
+    return {
+        "wall_seconds": round(wall_seconds, 3),
+        "peak_rss_bytes": peak_rss_bytes,
+        "output_bytes": len(orjson.dumps(analysis_to_primitive(analysis))),
+        "files": len(analysis.files)
+    }
+
+def measure_case(zip_path: Path, repeat: int) -> Dict:
+    """Run a case in fresh subprocesses and keep the best of each metric."""
+    runs = []
+    for _ in range(repeat):
+        completed = subprocess.run(
+            [sys.executable, "-m", "benchmarks.analysis_regression", "--run-case", str(zip_path)],
+            capture_output=True,
+            text=True,
+            check=True
+        )
+        runs.append(json.loads(completed.stdout.strip().splitlines()[-1]))
+    return {
+        **{metric: min(run[metric] for run in runs) for metric in METRICS},
+        "files": runs[0]["files"]
+    }
+
+def build_corpus(directory: Path, cases: List[str], corpus_dir: Optional[Path]) -> Dict[str, Path]:
+    """Write the generated zips and collect any vendored snapshots."""
+    archives = {}
+    for name in cases:
+        path = directory / f"{name}.zip"
+        path.write_bytes(repo_zip_bytes(generate_repo(CORPUS[name]), top_level=name))
+        archives[name] = path
+    if corpus_dir:
+        for path in sorted(corpus_dir.glob("*.zip")):
+            archives[f"snapshot:{path.stem}"] = path
+    return archives
+
+def compare(results: Dict[str, Dict], baselines: Dict[str, Dict], tolerances: Dict[str, float]) -> List[str]:
+    """Describe every metric that regressed past its tolerance."""
+    regressions = []
+    for name, result in results.items():
+        baseline = baselines.get(name)
+        if baseline is None:
+            continue
+        for metric in METRICS:
+            limit = baseline[metric] * (1 + tolerances[metric])
+            if result[metric] > limit:
+                regressions.append(
+                    f"{name}: {metric} {result[metric]} exceeds baseline {baseline[metric]} "
+                    f"by more than {tolerances[metric]:.0%}"
+                )
+    return regressions
+
+def machine_description() -> Dict:
+    """Where a run happened; baselines only mean something on the same kind of machine."""
+    return {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "platform": platform.platform(terse=True),
+        "cpus": os.cpu_count(),
+    }
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cases", default=",".join(CORPUS), help="Comma-separated generated cases to run")
+    parser.add_argument("--corpus-dir", type=Path, help="Directory of extra repository zips to include")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per case; the best of each metric is kept")
+    parser.add_argument("--time-tolerance", type=float, default=0.20)
+    parser.add_argument("--rss-tolerance", type=float, default=0.15)
+    parser.add_argument("--output-tolerance", type=float, default=0.05)
+    parser.add_argument("--baselines", type=Path, default=BASELINES)
+    parser.add_argument("--update-baselines", action="store_true", help="Record this run as the new baselines")
+    parser.add_argument(
+        "--allow-missing",
+        action="store_true",
+        help="Don't fail on cases without a baseline, e.g. a new corpus snapshot"
+    )
+    parser.add_argument("--run-case", type=Path, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_case:
+        print(json.dumps(run_case(args.run_case)))
+        return 0
+
+    cases = [name for name in args.cases.split(",") if name]
+    unknown = [name for name in cases if name not in CORPUS]
+    if unknown:
+        parser.error(f"Unknown cases: {', '.join(unknown)}")
+
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="koden-corpus-") as tmp:
+        for name, path in build_corpus(Path(tmp), cases, args.corpus_dir).items():
+            results[name] = measure_case(path, args.repeat)
+            print(f"{name}: {results[name]}", file=sys.stderr)
+
+    recorded = json.loads(args.baselines.read_text()) if args.baselines.exists() else {"cases": {}}
+    if args.update_baselines:
+        recorded = {
+            **machine_description(),
+            "specs": {name: asdict(CORPUS[name]) for name in cases},
+            "cases": {**recorded["cases"], **results},
+        }
+        args.baselines.parent.mkdir(parents=True, exist_ok=True)
+        args.baselines.write_text(json.dumps(recorded, indent=2) + "\n")
+        print(f"Recorded baselines for {', '.join(results)} in {args.baselines}", file=sys.stderr)
+        return 0
+
+    tolerances = {
+        "wall_seconds": args.time_tolerance,
+        "peak_rss_bytes": args.rss_tolerance,
+        "output_bytes": args.output_tolerance,
+    }
+    recorded_on = {field: recorded.get(field) for field in machine_description()}
+    if recorded_on != machine_description():
+        print(f"Baselines were recorded on {recorded_on}, this is {machine_description()}", file=sys.stderr)
+    missing = [name for name in results if name not in recorded["cases"]]
+    regressions = compare(results, recorded["cases"], tolerances)
+    print(json.dumps({"results": results, "missing_baselines": missing, "regressions": regressions}, indent=2))
+
+    for name in missing:
+        print(f"MISSING BASELINE {name}; record one with --update-baselines", file=sys.stderr)
+    for regression in regressions:
+        print(f"REGRESSION {regression}", file=sys.stderr)
+    return 1 if regressions or (missing and not args.allow_missing) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+"""
+Serialization benchmark for large analysis responses.
+
+Builds a synthetic RepositoryAnalysis and times FastAPI's default response
+path (validate against AnalysisResponse, then jsonable_encoder + json.dumps)
+against analysis_json_response, and compares the payload sizes of the full
+and compact encodings, raw and compressed.
+
+Usage:
+    pdm run python -m benchmarks.analysis_serialization --files 10000
+"""
+import argparse
+import gzip
+import json
+import random
+import time
+import brotli
+import msgpack
+import orjson
+from fastapi.encoders import jsonable_encoder
+from app.models.api.analysis import AnalysisResponse
+from app.models.domain.analysis import (
+    AnalysisInsights,
+    CodeQualityMetrics,
+    CouplingMetrics,
+    RepositoryAnalysis
+)
+from app.services.analysis_serializer import analysis_json_response, analysis_to_compact
+
+def synthetic_analysis(file_count: int, edges_per_file: int, seed: int = 0) -> RepositoryAnalysis:
+    """A RepositoryAnalysis shaped like the analyzer's output for a repo of file_count modules."""
+    rng = random.Random(seed)
+    files = [f"src/package_{i % 50}/module_{i}.py" for i in range(file_count)]
+    dependencies = {
+        file: sorted(rng.sample(files, edges_per_file))
+        for file in files
+    }
+    coupling_scores = {
+        file: CouplingMetrics(outbound=edges_per_file, inbound=edges_per_file, total=2 * edges_per_file, depth=3)
+        for file in files
+    }
+    insights = AnalysisInsights(
+        high_coupling_hotspots=coupling_scores,
+        coupling_scores=coupling_scores,
+        quality_metrics=CodeQualityMetrics(
+            total_files=file_count,
+            total_dependencies=file_count * edges_per_file,
+            circular_dependencies_count=0,
+            orphaned_files_count=0,
+            average_coupling=2.0 * edges_per_file
+        )
+    )
+    return RepositoryAnalysis(files=files, dependencies=dependencies, insights=insights)
+
+def time_it(fn, repeat: int) -> float:
+    """Best wall time of fn over repeat runs, in milliseconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+def default_path(analysis: RepositoryAnalysis) -> bytes:
+    response = AnalysisResponse.model_validate(
+        AnalysisResponse(analysis=analysis, analysis_id=1).model_dump()
+    )
+    return json.dumps(jsonable_encoder(response)).encode()
+
+def payload_sizes(body: bytes) -> dict:
+    """Raw, gzip and brotli sizes of a response body, in bytes."""
+    return {
+        "raw": len(body),
+        "gzip": len(gzip.compress(body, 6)),
+        "brotli": len(brotli.compress(body, quality=5))
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=10000)
+    parser.add_argument("--edges", type=int, default=5, help="Imports per file")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    analysis = synthetic_analysis(args.files, args.edges)
+    default_ms = time_it(lambda: default_path(analysis), args.repeat)
+    fast_ms = time_it(lambda: analysis_json_response(analysis, 1, "ok").body, args.repeat)
+    full_body = analysis_json_response(analysis).body
+    compact = analysis_to_compact(analysis)
+    print(json.dumps({
+        "files": args.files,
+        "edges_per_file": args.edges,
+        "default_ms": round(default_ms, 1),
+        "orjson_ms": round(fast_ms, 1),
+        "speedup": round(default_ms / fast_ms, 1),
+        "bytes": {
+            "full_json": payload_sizes(full_body),
+            "compact_json": payload_sizes(orjson.dumps(compact)),
+            "compact_msgpack": payload_sizes(msgpack.packb(compact, use_bin_type=True))
+        }
+    }, indent=2))
+
+if __name__ == "__main__":
+    main()
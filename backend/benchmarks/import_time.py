@@ -0,0 +1,139 @@
+"""
+Cold-start import budget for the API and the Celery worker.
+
+Imports each entry point in a fresh interpreter under `python -X importtime`.
+It parses the per-module timings from stderr and reports the total, plus the
+slowest modules by cumulative and self time. It also checks that modules
+meant to be lazy (Firebase, SQLAlchemy, FastAPI in the worker) aren't loaded
+at import. Exits non-zero when a target exceeds its budget or loads a
+forbidden module, so autoscaled pods keep starting quickly.
+
+Each target is imported --repeat times and the fastest run is kept. The first
+run also writes the bytecode cache.
+
+Usage:
+    pdm run python -m benchmarks.import_time
+    pdm run python -m benchmarks.import_time --api-budget-ms 1500 --worker-budget-ms 800 --top 30
+"""
+import argparse
+import json
+import subprocess
+import sys
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+
+@dataclass
+class Target:
+    # Modules the process imports on startup
+    modules: Tuple[str, ...]
+    # Top-level packages that must not be loaded by those imports
+    forbidden: Tuple[str, ...]
+
+TARGETS = {
+    # What uvicorn imports before serving the first request
+    "api": Target(modules=("app.main",), forbidden=("firebase_admin", "google.auth")),
+    # What `celery -A app.celery_app worker` imports, including the include= task modules
+    "worker": Target(
+        modules=("app.celery_app", "app.tasks.github", "app.tasks.artifacts"),
+        forbidden=("fastapi", "starlette", "sqlalchemy", "sqlmodel", "firebase_admin", "boto3")
+    ),
+}
+
+@dataclass
+class ImportTiming:
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+def parse_importtime(stderr: str) -> List[ImportTiming]:
+    """
+    Parse `-X importtime` output.
+
+    Lines look like "import time:       412 |       1287 |   json.decoder",
+    with nesting shown by two spaces of indent per level.
+    """
+    timings = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            # The header row
+            continue
+        name = fields[2].rstrip()
+        module = name.lstrip()
+        timings.append(ImportTiming(
+            module=module,
+            self_us=int(fields[0]),
+            cumulative_us=int(fields[1]),
+            depth=(len(name) - len(module) - 1) // 2
+        ))
+    return timings
+
+def import_once(target: Target) -> List[ImportTiming]:
+    statement = "; ".join(f"import {module}" for module in target.modules)
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True,
+        text=True
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"Importing {statement!r} failed:\n{completed.stderr[-2000:]}")
+    return parse_importtime(completed.stderr)
+
+def summarize(timings: List[ImportTiming], target: Target, top: int) -> Dict:
+    loaded = {timing.module for timing in timings}
+    forbidden = sorted(
+        module for module in loaded
+        if any(module == name or module.startswith(name + ".") for name in target.forbidden)
+    )
+    return {
+        # Top-level entries' cumulative times cover everything beneath them
+        "total_ms": round(sum(t.cumulative_us for t in timings if t.depth == 0) / 1000, 1),
+        "modules": len(timings),
+        "forbidden_loaded": forbidden,
+        "slowest_cumulative": [
+            {"module": t.module, "ms": round(t.cumulative_us / 1000, 1)}
+            for t in sorted(timings, key=lambda t: -t.cumulative_us)[:top]
+        ],
+        "slowest_self": [
+            {"module": t.module, "ms": round(t.self_us / 1000, 1)}
+            for t in sorted(timings, key=lambda t: -t.self_us)[:top]
+        ],
+    }
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--targets", default=",".join(TARGETS), help="Comma-separated targets to check")
+    parser.add_argument("--api-budget-ms", type=float, default=2000.0)
+    parser.add_argument("--worker-budget-ms", type=float, default=1000.0)
+    parser.add_argument("--repeat", type=int, default=3, help="Imports per target; the fastest is kept")
+    parser.add_argument("--top", type=int, default=20, help="Slowest modules to list")
+    args = parser.parse_args()
+
+    budgets = {"api": args.api_budget_ms, "worker": args.worker_budget_ms}
+    report = {}
+    failures = []
+    for name in (name for name in args.targets.split(",") if name):
+        if name not in TARGETS:
+            parser.error(f"Unknown target: {name}")
+        target = TARGETS[name]
+        runs = [summarize(import_once(target), target, args.top) for _ in range(args.repeat)]
+        result = min(runs, key=lambda run: run["total_ms"])
+        result["budget_ms"] = budgets[name]
+        report[name] = result
+
+        print(f"{name}: {result['total_ms']}ms over {result['modules']} modules", file=sys.stderr)
+        if result["total_ms"] > budgets[name]:
+            failures.append(f"{name}: imports took {result['total_ms']}ms, over the {budgets[name]:.0f}ms budget")
+        if result["forbidden_loaded"]:
+            failures.append(f"{name}: imported {', '.join(result['forbidden_loaded'])} at startup")
+
+    print(json.dumps(report, indent=2))
+    for failure in failures:
+        print(f"OVER BUDGET {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
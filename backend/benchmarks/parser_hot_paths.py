@@ -0,0 +1,155 @@
+"""
+Micro-benchmarks for the dependency parser's hot paths.
+
+Generates a synthetic repo per size with benchmarks.synthetic_repo and times
+calculate_complexity, import resolution, find_circular_dependencies,
+calculate_dependency_depth, should_ignore and the full analyze_dependencies.
+Each benchmark reports its best wall time over --repeat runs and its peak
+traced memory from one extra run under tracemalloc, as JSON.
+
+Several of these are quadratic today. A benchmark is skipped at a size
+when extrapolating from its largest measured size says it would exceed --budget
+seconds, and the skip is recorded in the report.
+
+Usage:
+    pdm run python -m benchmarks.parser_hot_paths --sizes 100,1000,10000,50000 --output parser.json
+"""
+import argparse
+import ast
+import json
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import asdict, replace
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+from app.services.analyzer import DEFAULT_IGNORE_PATTERNS, should_ignore
+from app.services.dependency_parser import (
+    analyze_dependencies,
+    calculate_complexity,
+    calculate_dependency_depth,
+    find_circular_dependencies,
+    find_imports,
+    resolve_imports
+)
+from benchmarks.synthetic_repo import RepoSpec, SyntheticRepo, add_spec_arguments, generate_repo, write_repo
+
+# How each benchmark's cost grows with the file count, for skip estimates
+GROWTH = {
+    "calculate_complexity": 1,
+    "resolve_imports": 2,
+    "find_circular_dependencies": 1,
+    "calculate_dependency_depth": 2,
+    "should_ignore": 1,
+    "analyze_dependencies": 2,
+}
+
+def measure(fn: Callable[[], object], repeat: int) -> Dict:
+    """Best wall time over repeat runs, then peak traced memory from one more run."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"seconds": round(best, 6), "peak_bytes": peak}
+
+def benchmarks_for(repo: SyntheticRepo, root: Path) -> Dict[str, Callable[[], object]]:
+    """The benchmarked calls for one generated repo, with their inputs prepared up front."""
+    python_files = repo.python_files
+    trees = {path: ast.parse(source) for path, source in repo.sources.items()}
+    imports = {path: find_imports(tree) for path, tree in trees.items()}
+    # Paths as os.walk would see them, plus some that should be ignored
+    walked = python_files + [f".venv/lib/site-packages/dep_{i}.py" for i in range(len(python_files) // 10)]
+
+    return {
+        "calculate_complexity": lambda: [calculate_complexity(source) for source in repo.sources.values()],
+        "resolve_imports": lambda: [resolve_imports(imports[path], python_files) for path in python_files],
+        "find_circular_dependencies": lambda: find_circular_dependencies(repo.graph),
+        "calculate_dependency_depth": lambda: [calculate_dependency_depth(repo.graph, path) for path in repo.modules],
+        "should_ignore": lambda: [should_ignore(path, DEFAULT_IGNORE_PATTERNS) for path in walked],
+        "analyze_dependencies": lambda: analyze_dependencies(root, python_files),
+    }
+
+def run_size(
+    spec: RepoSpec,
+    repeat: int,
+    budget: float,
+    last_measured: Dict[str, Optional[Tuple[int, float]]],
+    only: List[str]
+) -> Dict:
+    """
+    Run every benchmark at one size.
+
+    last_measured maps a benchmark to the (files, seconds) of its largest
+    measured run, or None once it has failed, and is updated in place.
+    Estimates extrapolate from it, so a benchmark skipped at one size stays
+    skipped at every larger one.
+    """
+    repo = generate_repo(spec)
+    result = {"spec": asdict(spec), "python_files": len(repo.python_files), "benchmarks": {}}
+    with tempfile.TemporaryDirectory(prefix="koden-bench-") as tmp:
+        root = write_repo(repo, Path(tmp))
+        for name, fn in benchmarks_for(repo, root).items():
+            if only and name not in only:
+                continue
+            if name in last_measured and last_measured[name] is None:
+                result["benchmarks"][name] = {"skipped": "failed at a smaller size"}
+                print(f"{spec.files} files, {name}: {result['benchmarks'][name]}", file=sys.stderr)
+                continue
+            estimate = None
+            if name in last_measured:
+                files, seconds = last_measured[name]
+                estimate = seconds * (spec.files / files) ** GROWTH[name]
+            if estimate is not None and estimate > budget:
+                result["benchmarks"][name] = {"skipped": f"estimated {estimate:.0f}s exceeds the {budget:.0f}s budget"}
+            else:
+                try:
+                    result["benchmarks"][name] = measure(fn, repeat)
+                    last_measured[name] = (spec.files, result["benchmarks"][name]["seconds"])
+                except RecursionError:
+                    # The recursive graph walks overflow the stack on long import chains
+                    result["benchmarks"][name] = {"error": "RecursionError"}
+                    last_measured[name] = None
+            print(f"{spec.files} files, {name}: {result['benchmarks'][name]}", file=sys.stderr)
+    return result
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="100,1000,10000,50000", help="Comma-separated file counts")
+    add_spec_arguments(parser)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--budget", type=float, default=300.0, help="Skip a benchmark expected to take longer (seconds)")
+    parser.add_argument("--only", default="", help="Comma-separated benchmark names to run")
+    parser.add_argument("--output", type=Path, help="Write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    base = RepoSpec(
+        imports_per_file=args.imports,
+        package_depth=args.depth,
+        cycles=args.cycles,
+        nesting=args.nesting,
+        seed=args.seed
+    )
+    only = [name for name in args.only.split(",") if name]
+    report = {"python": platform.python_version(), "machine": platform.machine(), "sizes": []}
+    last_measured = {}
+    for size in sorted(int(size) for size in args.sizes.split(",")):
+        report["sizes"].append(run_size(replace(base, files=size), args.repeat, args.budget, last_measured, only))
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(output)
+    else:
+        print(output)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""
+Deterministic synthetic Python repositories for benchmarking the analyzer.
+
+The same RepoSpec always produces byte-identical sources, so timings from
+different runs and machines are comparable.
+
+Usage:
+    pdm run python -m benchmarks.synthetic_repo --files 1000 --zip /tmp/repo.zip
+"""
+import argparse
+import io
+import random
+import zipfile
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Dict, List
+
+@dataclass(frozen=True)
+class RepoSpec:
+    files: int = 1000               # Python modules, not counting package __init__.py files
+    imports_per_file: int = 5       # Intra-repo imports per module
+    package_depth: int = 3          # Directories between the repo root and a module
+    packages_per_level: int = 8     # Fan-out of the package tree at each level
+    cycles: int = 10                # Import cycles to plant
+    nesting: int = 3                # Control-flow nesting depth inside functions
+    functions_per_file: int = 4
+    seed: int = 0
+
+    @property
+    def name(self) -> str:
+        return (
+            f"files{self.files}-imports{self.imports_per_file}-depth{self.package_depth}"
+            f"-cycles{self.cycles}-nesting{self.nesting}-seed{self.seed}"
+        )
+
+@dataclass
+class SyntheticRepo:
+    spec: RepoSpec
+    sources: Dict[str, str]         # Relative path -> source, including __init__.py files
+    modules: List[str]              # Relative paths of the generated modules
+    graph: Dict[str, List[str]]     # Module -> modules it imports, as the parser should resolve them
+
+    @property
+    def python_files(self) -> List[str]:
+        return sorted(self.sources)
+
+def _module_name(path: str) -> str:
+    return path[:-len(".py")].replace("/", ".")
+
+def _block(rng: random.Random, level: int, nesting: int, indent: str) -> List[str]:
+    """A control-flow block nested nesting - level more levels deep."""
+    if level == nesting:
+        return [f"{indent}total += value"]
+    inner = indent + "    "
+    body = [f"{inner}total += {level + 1}"] + _block(rng, level + 1, nesting, inner)
+    kind = rng.choice(("if", "for", "while", "try"))
+    if kind == "if":
+        return [f"{indent}if value > {level}:"] + body
+    if kind == "for":
+        return [f"{indent}for item_{level} in items:"] + body
+    if kind == "while":
+        return [f"{indent}while total < {level + 10}:"] + body + [f"{inner}break"]
+    return [f"{indent}try:"] + body + [f"{indent}except Exception:", f"{inner}total = -1"]
+
+def _function(rng: random.Random, index: int, nesting: int) -> List[str]:
+    return (
+        [f"def function_{index}(value, items):", "    total = 0"]
+        + _block(rng, 0, nesting, "    ")
+        + ["    return total"]
+    )
+
+def generate_repo(spec: RepoSpec) -> SyntheticRepo:
+    """Generate the sources for a spec."""
+    rng = random.Random(spec.seed)
+
+    modules = []
+    for i in range(spec.files):
+        parts = []
+        bucket = i
+        for _ in range(spec.package_depth):
+            parts.append(f"pkg_{bucket % spec.packages_per_level}")
+            bucket //= spec.packages_per_level
+        modules.append("/".join(parts + [f"module_{i}.py"]))
+
+    # Modules only import modules after them, so the graph is acyclic until
+    # cycles are planted on purpose
+    graph: Dict[str, List[str]] = {}
+    for i, module in enumerate(modules):
+        later = spec.files - i - 1
+        targets = rng.sample(range(i + 1, spec.files), min(spec.imports_per_file, later))
+        graph[module] = [modules[t] for t in targets]
+    for i in rng.sample(range(spec.files), min(spec.cycles, spec.files)):
+        if graph[modules[i]]:
+            target = graph[modules[i]][0]
+            if modules[i] not in graph[target]:
+                graph[target].append(modules[i])
+
+    sources: Dict[str, str] = {}
+    for module in modules:
+        directory = module.rsplit("/", 1)[0]
+        parts = directory.split("/")
+        for depth in range(1, len(parts) + 1):
+            sources.setdefault("/".join(parts[:depth] + ["__init__.py"]), "")
+
+        lines = [f'"""Synthetic module {module}."""']
+        for j, target in enumerate(sorted(graph[module])):
+            name = _module_name(target)
+            if j % 2:
+                lines.append(f"from {name} import function_0 as {name.rsplit('.', 1)[1]}_function")
+            else:
+                lines.append(f"import {name}")
+        lines.append("import os")
+        lines.append("")
+        for f in range(spec.functions_per_file):
+            lines.extend(_function(rng, f, spec.nesting))
+            lines.append("")
+        lines.append("class Model:")
+        lines.append("    # Keeps a little state around")
+        lines.append("    def method(self):")
+        lines.append("        return os.getcwd()")
+        sources[module] = "\n".join(lines) + "\n"
+
+    return SyntheticRepo(spec=spec, sources=sources, modules=modules, graph=graph)
+
+def write_repo(repo: SyntheticRepo, root: Path) -> Path:
+    """Write the sources under root and return it."""
+    for path, source in repo.sources.items():
+        target = root / path
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_text(source)
+    return root
+
+def repo_zip_bytes(repo: SyntheticRepo, top_level: str = "synthetic-repo") -> bytes:
+    """Zip the sources the way GitHub zipballs are laid out (one top-level directory)."""
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        for path in sorted(repo.sources):
+            # Fixed timestamps keep the archive byte-identical between runs
+            info = zipfile.ZipInfo(f"{top_level}/{path}", date_time=(2024, 1, 1, 0, 0, 0))
+            info.compress_type = zipfile.ZIP_DEFLATED
+            archive.writestr(info, repo.sources[path])
+    return buffer.getvalue()
+
+def spec_from_args(args: argparse.Namespace) -> RepoSpec:
+    return RepoSpec(
+        files=args.files,
+        imports_per_file=args.imports,
+        package_depth=args.depth,
+        cycles=args.cycles,
+        nesting=args.nesting,
+        seed=args.seed
+    )
+
+def add_spec_arguments(parser: argparse.ArgumentParser) -> None:
+    defaults = RepoSpec()
+    parser.add_argument("--imports", type=int, default=defaults.imports_per_file, help="Intra-repo imports per file")
+    parser.add_argument("--depth", type=int, default=defaults.package_depth, help="Package nesting depth")
+    parser.add_argument("--cycles", type=int, default=defaults.cycles, help="Import cycles to plant")
+    parser.add_argument("--nesting", type=int, default=defaults.nesting, help="Control-flow nesting in functions")
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=RepoSpec().files)
+    add_spec_arguments(parser)
+    parser.add_argument("--zip", type=Path, help="Write a zipball here")
+    parser.add_argument("--out", type=Path, help="Write the sources under this directory")
+    args = parser.parse_args()
+
+    repo = generate_repo(spec_from_args(args))
+    if args.zip:
+        args.zip.write_bytes(repo_zip_bytes(repo))
+    if args.out:
+        write_repo(repo, args.out)
+    print(asdict(repo.spec))
+
+if __name__ == "__main__":
+    main()
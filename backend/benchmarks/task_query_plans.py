@@ -0,0 +1,128 @@
+"""
+Query plan benchmark for repo download task lookups.
+
+Seeds a scratch schema with a large repo_download_tasks table, then runs
+EXPLAIN ANALYZE on the queries TaskService issues for status polls and task
+listings, first without and then with the indexes from migration b7e41c9d2a63.
+Prints the plans' node types and timings as JSON and exits non-zero if the
+indexed plans still scan or sort the whole table.
+
+Usage (needs the Postgres from docker-compose):
+    pdm run python -m benchmarks.task_query_plans --rows 1000000 --repos 1000
+"""
+import argparse
+import json
+import sys
+import time
+from typing import Dict, List
+from sqlalchemy import create_engine, text
+from sqlalchemy.dialects import postgresql
+from sqlmodel import SQLModel, select
+from app.core.database import DATABASE_URL
+from db.models.user import User
+from db.models.repos import Repo
+from db.models.tasks import RepoDownloadTask
+
+SCHEMA = "koden_bench"
+
+def node_types(plan: Dict) -> List[str]:
+    """Flatten the node types of an EXPLAIN (FORMAT JSON) plan."""
+    types = [plan["Node Type"]]
+    for child in plan.get("Plans", []):
+        types.extend(node_types(child))
+    return types
+
+def explain(conn, statement) -> Dict:
+    """EXPLAIN ANALYZE a SQLAlchemy statement with its parameters inlined."""
+    sql = str(statement.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+    result = conn.execute(text(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql}")).scalar()
+    plan = result[0]
+    return {
+        "nodes": node_types(plan["Plan"]),
+        "planning_ms": plan["Planning Time"],
+        "execution_ms": plan["Execution Time"],
+    }
+
+def seed(conn, rows: int, repos: int) -> None:
+    """Create the tables in the scratch schema and fill them with synthetic rows."""
+    tables = [User.__table__, Repo.__table__, RepoDownloadTask.__table__]
+    SQLModel.metadata.create_all(conn, tables=tables)
+    conn.execute(text("""
+        INSERT INTO "user" (id, email, name, firebase_uid, created_at)
+        VALUES (1, 'bench@example.com', 'bench', 'bench-uid', now())
+    """))
+    conn.execute(text("""
+        INSERT INTO repo (id, name, github_url, branch, user_id, created_at, updated_at)
+        SELECT i, 'repo-' || i, 'https://github.com/bench/repo-' || i, 'main', 1, now(), now()
+        FROM generate_series(1, :repos) AS i
+    """), {"repos": repos})
+    conn.execute(text("""
+        INSERT INTO repo_download_tasks (task_id, status, repo_id, created_at, updated_at)
+        SELECT md5(i::text), 'completed', 1 + i % :repos,
+               now() - make_interval(secs => i), now() - make_interval(secs => i)
+        FROM generate_series(1, :rows) AS i
+    """), {"rows": rows, "repos": repos})
+
+def run_queries(conn, task_id: str, repo_id: int) -> Dict:
+    """Plan the task lookups TaskService runs."""
+    conn.execute(text("ANALYZE repo_download_tasks"))
+    return {
+        "get_task": explain(
+            conn,
+            select(RepoDownloadTask).where(RepoDownloadTask.task_id == task_id)
+        ),
+        "get_repo_download_tasks": explain(
+            conn,
+            select(RepoDownloadTask)
+            .where(RepoDownloadTask.repo_id == repo_id)
+            .order_by(RepoDownloadTask.created_at.desc())
+        ),
+    }
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Number of task rows to seed")
+    parser.add_argument("--repos", type=int, default=1000, help="Number of repos the tasks are spread over")
+    args = parser.parse_args()
+
+    engine = create_engine(DATABASE_URL)
+    report = {"rows": args.rows, "repos": args.repos}
+    with engine.connect() as conn:
+        conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+        conn.execute(text(f"SET search_path TO {SCHEMA}"))
+        try:
+            started = time.perf_counter()
+            seed(conn, args.rows, args.repos)
+            report["seed_seconds"] = round(time.perf_counter() - started, 2)
+
+            # Plan the lookups as they were before the migration
+            indexes = list(RepoDownloadTask.__table__.indexes)
+            for index in indexes:
+                index.drop(conn)
+            probe_task_id = conn.execute(text("SELECT md5((:rows / 2)::text)"), {"rows": args.rows}).scalar()
+            report["without_indexes"] = run_queries(conn, probe_task_id, args.repos // 2)
+
+            for index in indexes:
+                index.create(conn)
+            report["with_indexes"] = run_queries(conn, probe_task_id, args.repos // 2)
+        finally:
+            conn.rollback()
+            conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+            conn.commit()
+
+    print(json.dumps(report, indent=2))
+
+    indexed = report["with_indexes"]
+    problems = [
+        f"{name} still uses {node}"
+        for name, plan in indexed.items()
+        for node in plan["nodes"]
+        if node in ("Seq Scan", "Sort")
+    ]
+    for problem in problems:
+        print(problem, file=sys.stderr)
+    return 1 if problems else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
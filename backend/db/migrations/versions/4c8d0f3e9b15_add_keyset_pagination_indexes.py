@@ -0,0 +1,39 @@
+"""Add keyset pagination indexes.
+
+Revision ID: 4c8d0f3e9b15
+Revises: b7e41c9d2a63
+Create Date: 2026-10-19 11:02:17.640931
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4c8d0f3e9b15'
+down_revision: Union[str, None] = 'b7e41c9d2a63'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_repo_user_id_created_at_id',
+        'repo',
+        ['user_id', sa.text('created_at DESC'), sa.text('id DESC')],
+        unique=False
+    )
+    op.create_index(
+        'ix_user_created_at_id',
+        'user',
+        [sa.text('created_at DESC'), sa.text('id DESC')],
+        unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_user_created_at_id', table_name='user')
+    op.drop_index('ix_repo_user_id_created_at_id', table_name='repo')
@@ -0,0 +1,28 @@
+"""Add analysis graph index.
+
+Revision ID: 6a1b3e8f47d2
+Revises: d2f95a71c0e8
+Create Date: 2026-10-19 12:21:56.902114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6a1b3e8f47d2'
+down_revision: Union[str, None] = 'd2f95a71c0e8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('analysis_results', sa.Column('graph_payload', sa.LargeBinary(), nullable=True))
+    op.execute("ALTER TABLE analysis_results ALTER COLUMN graph_payload SET STORAGE EXTERNAL")
+
+
+def downgrade() -> None:
+    op.drop_column('analysis_results', 'graph_payload')
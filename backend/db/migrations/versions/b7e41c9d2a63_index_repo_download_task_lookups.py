@@ -0,0 +1,41 @@
+"""Index repo download task lookups.
+
+Revision ID: b7e41c9d2a63
+Revises: 29046abc1ea8
+Create Date: 2026-10-19 10:12:44.318207
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e41c9d2a63'
+down_revision: Union[str, None] = '29046abc1ea8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Status polls could previously insert a second row for the same Celery
+    # task; keep the newest one so the unique index can be built
+    op.execute("""
+        DELETE FROM repo_download_tasks a
+        USING repo_download_tasks b
+        WHERE a.task_id = b.task_id AND a.id < b.id
+    """)
+    op.create_index(op.f('ix_repo_download_tasks_task_id'), 'repo_download_tasks', ['task_id'], unique=True)
+    op.create_index(
+        'ix_repo_download_tasks_repo_id_created_at',
+        'repo_download_tasks',
+        ['repo_id', sa.text('created_at DESC')],
+        unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_repo_download_tasks_repo_id_created_at', table_name='repo_download_tasks')
+    op.drop_index(op.f('ix_repo_download_tasks_task_id'), table_name='repo_download_tasks')
@@ -0,0 +1,59 @@
+"""Add analysis results table.
+
+Revision ID: d2f95a71c0e8
+Revises: 4c8d0f3e9b15
+Create Date: 2026-10-19 11:48:03.115402
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2f95a71c0e8'
+down_revision: Union[str, None] = '4c8d0f3e9b15'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('analysis_results',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('repo_id', sa.Integer(), nullable=True),
+    sa.Column('total_files', sa.Integer(), nullable=False),
+    sa.Column('total_dependencies', sa.Integer(), nullable=False),
+    sa.Column('circular_dependencies_count', sa.Integer(), nullable=False),
+    sa.Column('orphaned_files_count', sa.Integer(), nullable=False),
+    sa.Column('average_coupling', sa.Float(), nullable=False),
+    sa.Column('payload', sa.LargeBinary(), nullable=False),
+    sa.Column('payload_format', sqlmodel.sql.sqltypes.AutoString(length=32), nullable=False),
+    sa.Column('payload_size', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['repo_id'], ['repo.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    # The payload is compressed already, so skip Postgres' own TOAST compression
+    op.execute("ALTER TABLE analysis_results ALTER COLUMN payload SET STORAGE EXTERNAL")
+    op.create_index(
+        'ix_analysis_results_repo_id_created_at_id',
+        'analysis_results',
+        ['repo_id', sa.text('created_at DESC'), sa.text('id DESC')],
+        unique=False
+    )
+    op.create_index(
+        'ix_analysis_results_user_id_created_at_id',
+        'analysis_results',
+        ['user_id', sa.text('created_at DESC'), sa.text('id DESC')],
+        unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_analysis_results_user_id_created_at_id', table_name='analysis_results')
+    op.drop_index('ix_analysis_results_repo_id_created_at_id', table_name='analysis_results')
+    op.drop_table('analysis_results')
@@ -1,5 +1,6 @@
 from .user import User
 from .repos import Repo
 from .tasks import Task, RepoDownloadTask
+from .analysis import AnalysisResult
 
-__all__ = ["User", "Repo", "Task", "RepoDownloadTask"]
\ No newline at end of file
+__all__ = ["User", "Repo", "Task", "RepoDownloadTask", "AnalysisResult"]
\ No newline at end of file
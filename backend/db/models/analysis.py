@@ -0,0 +1,41 @@
+from sqlmodel import SQLModel, Field, Relationship
+from typing import Optional
+from datetime import datetime
+from sqlalchemy import Column, Index, LargeBinary, text
+from .repos import Repo
+
+class AnalysisResult(SQLModel, table=True):
+    """
+    A stored repository analysis.
+
+    Summary metrics live in plain columns so dashboards can list analyses
+    cheaply; the full analysis (dependency graph, per-file metrics, insights)
+    is kept as one compressed blob and only decoded when it is requested.
+    """
+    __tablename__ = "analysis_results"
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    user_id: int = Field(foreign_key="user.id")
+    repo_id: Optional[int] = Field(default=None, foreign_key="repo.id", ondelete="CASCADE")
+    repo: Optional["Repo"] = Relationship(back_populates="analysis_results")
+
+    # CodeQualityMetrics
+    total_files: int
+    total_dependencies: int
+    circular_dependencies_count: int
+    orphaned_files_count: int
+    average_coupling: float
+
+    # Full RepositoryAnalysis, encoded by app.services.analysis_store
+    payload: bytes = Field(sa_column=Column(LargeBinary, nullable=False))
+    payload_format: str = Field(max_length=32)
+    payload_size: int  # Uncompressed size in bytes
+    # Precomputed adjacency/reverse-adjacency index for graph queries, same encoding
+    graph_payload: Optional[bytes] = Field(default=None, sa_column=Column(LargeBinary, nullable=True))
+
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_analysis_results_repo_id_created_at_id", "repo_id", text("created_at DESC"), text("id DESC")),
+        Index("ix_analysis_results_user_id_created_at_id", "user_id", text("created_at DESC"), text("id DESC")),
+    )
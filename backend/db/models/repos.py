@@ -2,6 +2,7 @@ from sqlmodel import SQLModel, Field, Relationship
 from typing import Optional, List
 from datetime import datetime
 from enum import Enum
+from sqlalchemy import Index, text
 
 class DownloadStatus(str, Enum):
     PENDING = "pending"
@@ -17,7 +18,19 @@ class Repo(SQLModel, table=True):
     branch: Optional[str] = "main"
     user_id: int = Field(foreign_key="user.id")
     user: "User" = Relationship(back_populates="repos")
-    # analysis_jobs: List["AnalysisJob"] = Relationship(back_populates="repo")
-    download_tasks: List["RepoDownloadTask"] = Relationship(back_populates="repo")
+    # Deleted by the database (ON DELETE CASCADE) so the blobs are never loaded
+    analysis_results: List["AnalysisResult"] = Relationship(
+        back_populates="repo",
+        sa_relationship_kwargs={"cascade": "all, delete-orphan", "passive_deletes": True}
+    )
+    download_tasks: List["RepoDownloadTask"] = Relationship(
+        back_populates="repo",
+        sa_relationship_kwargs={"cascade": "all, delete-orphan"}
+    )
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+    __table_args__ = (
+        # Keyset pagination of a user's repos, newest first
+        Index("ix_repo_user_id_created_at_id", "user_id", text("created_at DESC"), text("id DESC")),
+    )
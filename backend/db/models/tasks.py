@@ -1,7 +1,7 @@
 from sqlmodel import SQLModel, Field, Relationship
 from typing import Optional, Literal
 from datetime import datetime
-from sqlalchemy import String, CheckConstraint
+from sqlalchemy import String, CheckConstraint, Index, text
 from .repos import Repo
 
 # For type hints in Python code
@@ -36,7 +36,7 @@ class RepoDownloadTask(SQLModel, table=True):
     __tablename__ = "repo_download_tasks"
     
     id: Optional[int] = Field(default=None, primary_key=True)
-    task_id: str  # Celery task ID
+    task_id: str = Field(unique=True, index=True)  # Celery task ID
     status: str = Field(
         default="pending",
         sa_type=String(20),
@@ -45,6 +45,7 @@ class RepoDownloadTask(SQLModel, table=True):
             "server_default": "pending"
         }
     )
+    # Artifact store location, only a hint: the archive can be evicted once the task ends
     output_path: Optional[str] = None
     error_message: Optional[str] = None
     created_at: datetime = Field(default_factory=datetime.utcnow)
@@ -57,4 +58,10 @@ class RepoDownloadTask(SQLModel, table=True):
             "status IN ('pending', 'processing', 'completed', 'failed')",
             name="valid_repo_download_task_status"
         ),
+        # Serves "tasks for a repo, newest first" without a sort
+        Index(
+            "ix_repo_download_tasks_repo_id_created_at",
+            "repo_id",
+            text("created_at DESC")
+        ),
     ) 
\ No newline at end of file
@@ -1,5 +1,6 @@
 from typing import Optional, List
 from sqlmodel import Field, Relationship
+from sqlalchemy import Index, text
 from .base import TimestampModel
 from .repos import Repo
 class User(TimestampModel, table=True):
@@ -7,4 +8,9 @@ class User(TimestampModel, table=True):
     email: str = Field(unique=True, index=True)
     name: str
     firebase_uid: str = Field(unique=True, index=True) 
-    repos: List["Repo"] = Relationship(back_populates="user")
\ No newline at end of file
+    repos: List["Repo"] = Relationship(back_populates="user")
+
+    __table_args__ = (
+        # Keyset pagination of users, newest first
+        Index("ix_user_created_at_id", text("created_at DESC"), text("id DESC")),
+    )
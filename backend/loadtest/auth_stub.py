@@ -0,0 +1,28 @@
+"""
+Stand-in for Firebase ID token verification during load tests.
+
+Enable with AUTH_TOKEN_VERIFIER=loadtest.auth_stub:verify_token. Tokens look
+like "loadtest-<uid>" and decode to claims shaped like Firebase's, including
+the github_access_token custom claim the API reads.
+"""
+import time
+from typing import Any, Dict
+
+TOKEN_PREFIX = "loadtest-"
+
+def make_token(uid: str) -> str:
+    return f"{TOKEN_PREFIX}{uid}"
+
+def verify_token(token: str) -> Dict[str, Any]:
+    """Decode a load-test token, or raise ValueError like a bad Firebase token would."""
+    if not token.startswith(TOKEN_PREFIX):
+        raise ValueError("Not a load-test token")
+    uid = token[len(TOKEN_PREFIX):]
+    now = int(time.time())
+    return {
+        "uid": uid,
+        "email": f"{uid}@loadtest.invalid",
+        "iat": now,
+        "exp": now + 3600,
+        "github_access_token": f"gh-{uid}",
+    }
@@ -0,0 +1,202 @@
+"""
+Local stand-in for the GitHub REST API.
+
+Serves the endpoints Koden calls: /user, /user/repos, /search/repositories,
+/repos/{owner}/{repo}, /repos/{owner}/{repo}/commits/{ref},
+/repos/{owner}/{repo}/zipball/{ref} and /rate_limit.
+Latency, zipball size and the per-token rate limit are configurable. It
+sends GitHub's rate-limit headers, honours If-None-Match with 304s that
+don't count against the quota, and returns a 403 once a token's quota runs
+out, as GitHub does.
+
+Point the API and workers at it with GITHUB_API_URL=http://localhost:9100.
+
+Usage:
+    pdm run python -m loadtest.fake_github --latency-ms 80 --archive-files 2000 --rate-limit 5000
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+from aiohttp import web
+from benchmarks.synthetic_repo import RepoSpec, generate_repo, repo_zip_bytes
+
+@dataclass
+class Quota:
+    remaining: int
+    reset: int
+
+class FakeGitHub:
+    def __init__(
+        self,
+        latency_ms: float,
+        jitter_ms: float,
+        archive_files: int,
+        rate_limit: int,
+        rate_window: int,
+        repos_per_user: int
+    ):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.rate_limit = rate_limit
+        self.rate_window = rate_window
+        self.repos_per_user = repos_per_user
+        self.archive = repo_zip_bytes(generate_repo(RepoSpec(files=archive_files)), top_level="fake-repo")
+        self.quotas: Dict[str, Quota] = {}
+
+    def _quota(self, token: str) -> Quota:
+        now = int(time.time())
+        quota = self.quotas.get(token)
+        if quota is None or quota.reset <= now:
+            quota = Quota(remaining=self.rate_limit, reset=now + self.rate_window)
+            self.quotas[token] = quota
+        return quota
+
+    def _rate_headers(self, quota: Quota) -> Dict[str, str]:
+        return {
+            "X-RateLimit-Limit": str(self.rate_limit),
+            "X-RateLimit-Remaining": str(quota.remaining),
+            "X-RateLimit-Reset": str(quota.reset),
+            "X-RateLimit-Used": str(self.rate_limit - quota.remaining),
+            "X-RateLimit-Resource": "core",
+        }
+
+    @web.middleware
+    async def middleware(self, request: web.Request, handler) -> web.StreamResponse:
+        authorization = request.headers.get("Authorization", "")
+        if not authorization.startswith("token "):
+            return web.json_response({"message": "Requires authentication"}, status=401)
+        token = authorization[len("token "):]
+        request["login"] = token[len("gh-"):] if token.startswith("gh-") else token
+
+        delay = self.latency_ms + random.uniform(-self.jitter_ms, self.jitter_ms)
+        await asyncio.sleep(max(0.0, delay) / 1000)
+
+        quota = self._quota(token)
+        if request.path == "/rate_limit":
+            response = await handler(request)
+        elif quota.remaining <= 0:
+            return web.json_response(
+                {"message": "API rate limit exceeded"},
+                status=403,
+                headers=self._rate_headers(quota)
+            )
+        else:
+            response = await handler(request)
+            # Conditional requests answered with 304 are free on GitHub
+            if response.status != 304:
+                quota.remaining -= 1
+        response.headers.update(self._rate_headers(quota))
+        return response
+
+    def _repo(self, owner: str, index: int) -> Dict:
+        name = f"repo-{index}"
+        return {
+            "name": name,
+            "full_name": f"{owner}/{name}",
+            "html_url": f"https://github.com/{owner}/{name}",
+            "description": f"Load test repository {index}",
+            "language": "Python",
+            "stargazers_count": index,
+            "forks_count": 0,
+            "updated_at": "2024-01-01T00:00:00Z",
+            "default_branch": "main",
+            "size": len(self.archive) // 1024,
+        }
+
+    def _json(self, request: web.Request, body, headers: Optional[Dict[str, str]] = None) -> web.Response:
+        """A JSON response with an ETag, or a 304 if the client already has it."""
+        text = json.dumps(body)
+        etag = f'"{hashlib.md5(text.encode()).hexdigest()}"'
+        if request.headers.get("If-None-Match") == etag:
+            return web.Response(status=304, headers={"ETag": etag})
+        return web.Response(
+            text=text,
+            content_type="application/json",
+            headers={"ETag": etag, **(headers or {})}
+        )
+
+    def _page(self, request: web.Request, items: List[Dict]) -> List[Dict]:
+        page = int(request.query.get("page", 1))
+        per_page = int(request.query.get("per_page", 30))
+        return items[(page - 1) * per_page:page * per_page]
+
+    async def user(self, request: web.Request) -> web.Response:
+        return self._json(request, {"login": request["login"], "id": 1, "type": "User"})
+
+    async def user_repos(self, request: web.Request) -> web.Response:
+        repos = [self._repo(request["login"], i) for i in range(self.repos_per_user)]
+        per_page = int(request.query.get("per_page", 30))
+        last_page = max(1, (len(repos) + per_page - 1) // per_page)
+        link = f'<{request.url.with_query({"page": last_page, "per_page": per_page})}>; rel="last"'
+        return self._json(request, self._page(request, repos), {"Link": link})
+
+    async def search_repositories(self, request: web.Request) -> web.Response:
+        terms = [term for term in request.query.get("q", "").split() if ":" not in term]
+        repos = [
+            repo for repo in (self._repo(request["login"], i) for i in range(self.repos_per_user))
+            if all(term in repo["name"] or term in repo["description"] for term in terms)
+        ]
+        return self._json(request, {"total_count": len(repos), "items": self._page(request, repos)})
+
+    async def repository(self, request: web.Request) -> web.Response:
+        owner, name = request.match_info["owner"], request.match_info["repo"]
+        return self._json(request, {**self._repo(owner, 0), "name": name, "full_name": f"{owner}/{name}"})
+
+    async def commit_sha(self, request: web.Request) -> web.Response:
+        # Answers the application/vnd.github.sha media type; each ref gets a stable fake commit
+        ref = "{owner}/{repo}@{ref}".format(**request.match_info)
+        return web.Response(text=hashlib.sha1(ref.encode()).hexdigest())
+
+    async def zipball(self, request: web.Request) -> web.Response:
+        return web.Response(
+            body=self.archive,
+            content_type="application/zip",
+            headers={"Content-Disposition": f'attachment; filename={request.match_info["repo"]}.zip'}
+        )
+
+    async def rate_limit_status(self, request: web.Request) -> web.Response:
+        quota = self._quota(request.headers["Authorization"][len("token "):])
+        core = {"limit": self.rate_limit, "remaining": quota.remaining, "reset": quota.reset}
+        return web.json_response({"resources": {"core": core}, "rate": core})
+
+    def app(self) -> web.Application:
+        app = web.Application(middlewares=[self.middleware])
+        app.router.add_get("/user", self.user)
+        app.router.add_get("/user/repos", self.user_repos)
+        app.router.add_get("/search/repositories", self.search_repositories)
+        app.router.add_get("/repos/{owner}/{repo}", self.repository)
+        app.router.add_get("/repos/{owner}/{repo}/commits/{ref}", self.commit_sha)
+        app.router.add_get("/repos/{owner}/{repo}/zipball/{ref}", self.zipball)
+        app.router.add_get("/rate_limit", self.rate_limit_status)
+        return app
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="Added to every response")
+    parser.add_argument("--jitter-ms", type=float, default=20.0)
+    parser.add_argument("--archive-files", type=int, default=500, help="Python files in the served zipball")
+    parser.add_argument("--rate-limit", type=int, default=5000, help="Requests per token per window")
+    parser.add_argument("--rate-window", type=int, default=3600, help="Seconds")
+    parser.add_argument("--repos-per-user", type=int, default=50)
+    args = parser.parse_args()
+
+    fake = FakeGitHub(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        archive_files=args.archive_files,
+        rate_limit=args.rate_limit,
+        rate_window=args.rate_window,
+        repos_per_user=args.repos_per_user
+    )
+    print(f"Fake GitHub on http://{args.host}:{args.port}, zipballs are {len(fake.archive)} bytes")
+    web.run_app(fake.app(), host=args.host, port=args.port, print=None)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+"""
+Load-test scenarios against a running API.
+
+Each virtual user gets a stub token (see loadtest.auth_stub), creates its
+user row and a tracked repo, then loops over the scenario until --duration
+runs out. Latencies are recorded per operation and reported as throughput
+and percentiles in JSON.
+
+Scenarios:
+    browse     list GitHub repositories (plain and search) and tracked repos
+    repos      create, read, list and delete tracked repos
+    downloads  start repo downloads and poll their status until they finish
+    mixed      a weighted mix of the three
+
+Start the fake GitHub and point the API and workers at it first:
+    pdm run python -m loadtest.fake_github &
+    GITHUB_API_URL=http://localhost:9100 AUTH_TOKEN_VERIFIER=loadtest.auth_stub:verify_token pdm run dev
+
+Usage:
+    pdm run python -m loadtest.scenarios --scenario downloads --users 50 --duration 120
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+import uuid
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional
+import aiohttp
+from loadtest.auth_stub import make_token
+
+class Recorder:
+    """Latency samples and error counts per operation."""
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+
+    def record(self, operation: str, seconds: float, error: Optional[str] = None) -> None:
+        if error is None:
+            self.latencies[operation].append(seconds)
+        else:
+            self.errors[operation][error] += 1
+
+    def report(self, elapsed: float) -> Dict:
+        operations = {}
+        for operation in sorted(set(self.latencies) | set(self.errors)):
+            samples = sorted(self.latencies[operation])
+            errors = dict(self.errors[operation])
+            entry = {
+                "count": len(samples),
+                "errors": errors,
+                "throughput_per_second": round(len(samples) / elapsed, 2),
+            }
+            if samples:
+                entry["latency_ms"] = {
+                    name: round(percentile(samples, q) * 1000, 1)
+                    for name, q in (("p50", 0.50), ("p90", 0.90), ("p95", 0.95), ("p99", 0.99), ("max", 1.0))
+                }
+            operations[operation] = entry
+        return {"elapsed_seconds": round(elapsed, 1), "operations": operations}
+
+def percentile(samples: List[float], q: float) -> float:
+    """Nearest-rank percentile of sorted samples."""
+    return samples[min(len(samples) - 1, max(0, int(round(q * len(samples))) - 1))]
+
+class VirtualUser:
+    def __init__(self, session: aiohttp.ClientSession, api_url: str, uid: str, recorder: Recorder, poll_interval: float):
+        self.session = session
+        self.api_url = api_url.rstrip("/")
+        self.uid = uid
+        self.headers = {"Authorization": f"Bearer {make_token(uid)}"}
+        self.recorder = recorder
+        self.poll_interval = poll_interval
+        self.repo_id: Optional[int] = None
+
+    async def call(self, operation: str, method: str, path: str, ok=(200,), **kwargs) -> Optional[Dict]:
+        """Make a timed API call; returns the JSON body, or None on failure."""
+        started = time.perf_counter()
+        try:
+            async with self.session.request(method, f"{self.api_url}{path}", headers=self.headers, **kwargs) as response:
+                body = await response.read()
+                elapsed = time.perf_counter() - started
+                if response.status not in ok:
+                    self.recorder.record(operation, elapsed, str(response.status))
+                    return None
+                self.recorder.record(operation, elapsed)
+                return json.loads(body) if body else {}
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            self.recorder.record(operation, time.perf_counter() - started, type(e).__name__)
+            return None
+
+    async def setup(self) -> None:
+        """Create the user row and one tracked repo."""
+        await self.call("create_user", "POST", "/api/users/", ok=(201, 400), json={
+            "email": f"{self.uid}@loadtest.invalid",
+            "name": self.uid
+        })
+        repo = await self.call("create_repo", "POST", "/api/repos/", ok=(201,), json={
+            "name": "repo-0",
+            "github_url": f"https://github.com/{self.uid}/repo-0",
+            "branch": "main"
+        })
+        if repo is None:
+            listed = await self.call("list_repos", "GET", "/api/repos/")
+            repos = (listed or {}).get("repos", [])
+            repo = repos[0] if repos else None
+        self.repo_id = repo["id"] if repo else None
+
+    async def browse(self) -> None:
+        await self.call("github_repositories", "GET", "/api/github/repositories", params={"page": 1, "per_page": 10})
+        await self.call("github_search", "GET", "/api/github/repositories", params={"search": "repo"})
+        await self.call("list_repos", "GET", "/api/repos/")
+
+    async def repos(self) -> None:
+        name = f"repo-{uuid.uuid4().hex[:8]}"
+        repo = await self.call("create_repo", "POST", "/api/repos/", ok=(201,), json={
+            "name": name,
+            "github_url": f"https://github.com/{self.uid}/{name}",
+            "branch": "main"
+        })
+        await self.call("list_repos", "GET", "/api/repos/")
+        if repo:
+            await self.call("read_repo", "GET", f"/api/repos/{repo['id']}")
+            await self.call("delete_repo", "DELETE", f"/api/repos/{repo['id']}", ok=(200, 204))
+
+    async def downloads(self) -> None:
+        if self.repo_id is None:
+            return
+        started = time.perf_counter()
+        task = await self.call("start_download", "POST", f"/api/tasks/repos/{self.repo_id}/download")
+        if not task:
+            return
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            status = await self.call("poll_status", "GET", f"/api/tasks/{task['task_id']}/status")
+            if status is None:
+                return
+            if status["status"] in ("completed", "failed"):
+                error = None if status["status"] == "completed" else "failed"
+                self.recorder.record("download_end_to_end", time.perf_counter() - started, error)
+                return
+
+    async def mixed(self) -> None:
+        scenario = random.choices((self.browse, self.repos, self.downloads), weights=(6, 3, 1))[0]
+        await scenario()
+
+async def run(args: argparse.Namespace) -> Dict:
+    recorder = Recorder()
+    run_id = uuid.uuid4().hex[:6]
+    connector = aiohttp.TCPConnector(limit=args.users * 2)
+    timeout = aiohttp.ClientTimeout(total=args.timeout)
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+        users = [
+            VirtualUser(session, args.api_url, f"user{i}-{run_id}", recorder, args.poll_interval)
+            for i in range(args.users)
+        ]
+        await asyncio.gather(*(user.setup() for user in users))
+
+        started = time.perf_counter()
+        deadline = started + args.duration
+
+        async def loop(user: VirtualUser) -> None:
+            scenario = getattr(user, args.scenario)
+            while time.perf_counter() < deadline:
+                await scenario()
+                if args.think_time:
+                    await asyncio.sleep(random.expovariate(1 / args.think_time))
+
+        await asyncio.gather(*(loop(user) for user in users))
+        report = recorder.report(time.perf_counter() - started)
+    report.update({"scenario": args.scenario, "users": args.users})
+    return report
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--api-url", default="http://localhost:8000")
+    parser.add_argument("--scenario", choices=("browse", "repos", "downloads", "mixed"), default="mixed")
+    parser.add_argument("--users", type=int, default=20, help="Concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=60.0, help="Seconds to run after setup")
+    parser.add_argument("--think-time", type=float, default=0.0, help="Mean pause between iterations (seconds)")
+    parser.add_argument("--poll-interval", type=float, default=1.0, help="Seconds between status polls")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Per-request timeout (seconds)")
+    parser.add_argument("--output", type=Path, help="Write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    output = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(output)
+    else:
+        print(output)
+    errors = sum(sum(entry["errors"].values()) for entry in report["operations"].values())
+    print(f"{errors} failed operations", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -9,7 +9,7 @@ import { ProfileCompletionModal } from '@/components/modals/profile-completion-m
 import DashboardLayout from '@/components/templates/dashboard-layout'
 import { ConnectRepoModal } from '@/components/modals/ConnectRepoModal'
 import { RepoList } from '@/components/molecules/repo-list'
-import { Repo, RepoListResponse, RepoDownloadTask } from '@/types/repo'
+import { Repo, RepoListResponse, RepoDownloadTaskListResponse } from '@/types/repo'
 import { Button } from '@/components/atoms/button'
 import { useQuery } from '@tanstack/react-query'
 import { Skeleton } from '@/components/atoms/skeleton'
@@ -57,8 +57,8 @@ export default function AppPage() {
       // Fetch tasks for each repo
       const reposWithTasks = await Promise.all(
         data.repos.map(async (repo) => {
-          const tasks = await get<RepoDownloadTask[]>(`/tasks/repos/${repo.id}/download-tasks`)
-          return { ...repo, download_tasks: tasks }
+          const tasks = await get<RepoDownloadTaskListResponse>(`/tasks/repos/${repo.id}/download-tasks`)
+          return { ...repo, download_tasks: tasks.tasks }
         })
       )
       return reposWithTasks
@@ -23,10 +23,9 @@ export interface RepoUpdate {
 
 export interface RepoListResponse {
   repos: Repo[];
-  total_count: number;
-  page: number;
-  per_page: number;
-  total_pages: number;
+  total: number;
+  limit: number;
+  next_cursor?: string | null;
 }
 
 export interface RepoDownloadTask {
@@ -38,4 +37,11 @@ export interface RepoDownloadTask {
   created_at: string;
   updated_at: string;
   repo_id: number;
-} 
\ No newline at end of file
+} 
+
+export interface RepoDownloadTaskListResponse {
+  tasks: RepoDownloadTask[];
+  total: number;
+  limit: number;
+  next_cursor?: string | null;
+}